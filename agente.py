@@ -1,8 +1,10 @@
 # =====================================================
 # agente.py — Agente Robot (reglas R1..R8 + logging)
 # =====================================================
+from array import array
 from dataclasses import dataclass
-from typing import Literal, Dict, Any, List, Tuple
+from functools import lru_cache
+from typing import Literal, Dict, Any, List, Tuple, Iterator, Sequence
 
 # --- Debe concordar con entorno.py ---
 ZV = 0
@@ -11,180 +13,479 @@ ROBOT = 3
 MONSTRUO = 4
 
 # --- Orientaciones (±X, ±Y, ±Z) ---
+# Internamente la orientación es un código entero (índice en ORIENTACIONES) y todas las
+# tablas se indexan por código; el texto "X+"/"Y-"… queda solo para la API y los logs.
 Orient = Literal["X+", "X-", "Y+", "Y-", "Z+", "Z-"]
 
-def celda_frontal(x: int, y: int, z: int, orient: Orient) -> Tuple[int, int, int]:
-    if orient == "X+": return (x + 1, y, z)
-    if orient == "X-": return (x - 1, y, z)
-    if orient == "Y+": return (x, y + 1, z)
-    if orient == "Y-": return (x, y - 1, z)
-    if orient == "Z+": return (x, y, z + 1)
-    if orient == "Z-": return (x, y, z - 1)
-    raise ValueError("Orientación inválida")
-
-OPUESTA: Dict[Orient, Orient] = {
-    "X+": "X-", "X-": "X+",
-    "Y+": "Y-", "Y-": "Y+",
-    "Z+": "Z-", "Z-": "Z+",
-}
+ORIENTACIONES: Tuple[Orient, ...] = ("X+", "X-", "Y+", "Y-", "Z+", "Z-")
+ORI_COD: Dict[Orient, int] = {o: i for i, o in enumerate(ORIENTACIONES)}
+X_MAS, X_MENOS, Y_MAS, Y_MENOS, Z_MAS, Z_MENOS = range(len(ORIENTACIONES))
+
+# Desplazamiento (dx, dy, dz) de la celda frontal, por código
+DESP: Tuple[Tuple[int, int, int], ...] = (
+    (1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1),
+)
+
+OPUESTA: Tuple[int, ...] = (X_MENOS, X_MAS, Y_MENOS, Y_MAS, Z_MENOS, Z_MAS)
 
 # Ciclos de 90° (4 ortogonales) por orientación — orden fijo (cíclico)
-CICLOS_ORTO: Dict[Orient, List[Orient]] = {
-    "X+": ["Y+", "Z+", "Y-", "Z-"],
-    "X-": ["Y+", "Z-", "Y-", "Z+"],
-    "Y+": ["Z+", "X-", "Z-", "X+"],
-    "Y-": ["Z+", "X+", "Z-", "X-"],
-    "Z+": ["X+", "Y-", "X-", "Y+"],
-    "Z-": ["X+", "Y+", "X-", "Y-"],
-}
-
-def rotar_90(orient: Orient, lado_idx: int) -> Tuple[Orient, int]:
-    opciones = CICLOS_ORTO[orient]
-    nueva = opciones[lado_idx % 4]
-    return nueva, (lado_idx + 1) % 4
-
-def vecinos_locales(x: int, y: int, z: int, orient: Orient) -> Dict[str, Any]:
-    frente = celda_frontal(x, y, z, orient)
-    atras  = celda_frontal(x, y, z, OPUESTA[orient])
-    costados = [celda_frontal(x, y, z, o) for o in CICLOS_ORTO[orient]]
+CICLOS_ORTO: Tuple[Tuple[int, int, int, int], ...] = (
+    (Y_MAS, Z_MAS, Y_MENOS, Z_MENOS),     # X+
+    (Y_MAS, Z_MENOS, Y_MENOS, Z_MAS),     # X-
+    (Z_MAS, X_MENOS, Z_MENOS, X_MAS),     # Y+
+    (Z_MAS, X_MAS, Z_MENOS, X_MENOS),     # Y-
+    (X_MAS, Y_MENOS, X_MENOS, Y_MAS),     # Z+
+    (X_MAS, Y_MAS, X_MENOS, Y_MENOS),     # Z-
+)
+
+# Caras que mira el monstroscopio: frente + 4 costados (excluye atrás)
+CINCO_CARAS: Tuple[Tuple[int, ...], ...] = tuple((o,) + CICLOS_ORTO[o] for o in range(len(ORIENTACIONES)))
+
+# Siguiente orientación y lado tras rotar 90°, por [código][lado_idx]
+ROTACION: Tuple[Tuple[Tuple[int, int], ...], ...] = tuple(
+    tuple((CICLOS_ORTO[o][k], (k + 1) % 4) for k in range(4)) for o in range(len(ORIENTACIONES))
+)
+
+@lru_cache(maxsize=None)
+def pasos_planos(N: int) -> Tuple[int, ...]:
+    """Desplazamiento de cada orientación en el índice plano (x*N + y)*N + z de un cubo N³."""
+    return tuple((dx * N + dy) * N + dz for dx, dy, dz in DESP)
+
+def indice_plano(N: int, x: int, y: int, z: int) -> int:
+    return (x * N + y) * N + z
+
+def _cod(orient) -> int:
+    """Acepta "X+"… (API) o el código entero."""
+    return ORI_COD[orient] if isinstance(orient, str) else orient
+
+def celda_frontal(x: int, y: int, z: int, orient: Orient | int) -> Tuple[int, int, int]:
+    dx, dy, dz = DESP[_cod(orient)]
+    return (x + dx, y + dy, z + dz)
+
+def rotar_90(ori: Orient | int, lado_idx: int) -> Tuple[Orient | int, int]:
+    """
+    Rotación de 90°: devuelve (nueva orientación, nuevo lado_idx). La orientación vuelve
+    en la misma forma en que llegó ("X+"… o código entero).
+    """
+    if isinstance(ori, str):
+        nueva, lado = ROTACION[_cod(ori)][lado_idx % 4]
+        return ORIENTACIONES[nueva], lado
+    return ROTACION[ori][lado_idx % 4]
+
+def vecinos_locales(x: int, y: int, z: int, orient: Orient | int) -> Dict[str, Any]:
+    o = _cod(orient)
+    frente = celda_frontal(x, y, z, o)
+    atras  = celda_frontal(x, y, z, OPUESTA[o])
+    costados = [celda_frontal(x, y, z, c) for c in CICLOS_ORTO[o]]
     return {"frente": frente, "atras": atras, "costados": costados}
 
+# --- Estados frontales (códigos) ---
+ESTADOS_FRONTALES: Tuple[str, ...] = ("ZL", "ZV", "ROBOT", "MONSTRUO", "BORDE", "DESCONOCIDO", "AQUI")
+FRONTAL_COD: Dict[str, int] = {e: i for i, e in enumerate(ESTADOS_FRONTALES)}
+F_ZL, F_ZV, F_ROBOT, F_MONSTRUO, F_BORDE, F_DESCONOCIDO, F_AQUI = range(len(ESTADOS_FRONTALES))
+_FRONTAL_DE_VALOR: Dict[int, int] = {ZL: F_ZL, ZV: F_ZV, ROBOT: F_ROBOT, MONSTRUO: F_MONSTRUO}
+
 # --- Sensores de apoyo ---
-def detectar_monstruo_cinco_lados(cubo, x: int, y: int, z: int, orient: Orient) -> bool:
-    v = vecinos_locales(x, y, z, orient)
-    chequear = [v["frente"], *v["costados"]]  # 5 caras (excluye atrás)
+# Sobre el backend "array" las celdas se leen por índice plano (cubo.item), sin crear
+# vistas intermedias; con listas anidadas, por cubo[x][y][z].
+def frontal_cod(cubo, x: int, y: int, z: int, ori: int) -> int:
+    """Código (ver ESTADOS_FRONTALES) de la celda frontal."""
+    dx, dy, dz = DESP[ori]
+    nx, ny, nz = x + dx, y + dy, z + dz
     N = len(cubo)
-    for (nx, ny, nz) in chequear:
+    if not (0 <= nx < N and 0 <= ny < N and 0 <= nz < N):
+        return F_BORDE
+    if isinstance(cubo, list):
+        valor = cubo[nx][ny][nz]
+    else:
+        valor = cubo.item((nx * N + ny) * N + nz)
+    return _FRONTAL_DE_VALOR.get(valor, F_DESCONOCIDO)
+
+def monstruo_cinco_caras(cubo, x: int, y: int, z: int, ori: int) -> bool:
+    N = len(cubo)
+    lista = isinstance(cubo, list)
+    i = (x * N + y) * N + z
+    pasos = pasos_planos(N)
+    for d in CINCO_CARAS[ori]:
+        dx, dy, dz = DESP[d]
+        nx, ny, nz = x + dx, y + dy, z + dz
         if 0 <= nx < N and 0 <= ny < N and 0 <= nz < N:
-            if cubo[nx][ny][nz] == MONSTRUO:
+            if (cubo[nx][ny][nz] if lista else cubo.item(i + pasos[d])) == MONSTRUO:
                 return True
     return False
 
-def frontal_estado(cubo, x: int, y: int, z: int, orient: Orient) -> str:
-    nx, ny, nz = celda_frontal(x, y, z, orient)
-    N = len(cubo)
-    if not (0 <= nx < N and 0 <= ny < N and 0 <= nz < N):
-        return "BORDE"
-    valor = cubo[nx][ny][nz]
-    return "ZL" if valor == ZL else ("ZV" if valor == ZV else ("ROBOT" if valor == ROBOT else ("MONSTRUO" if valor == MONSTRUO else "DESCONOCIDO")))
+def detectar_monstruo_cinco_lados(cubo, x: int, y: int, z: int, orient: Orient | int) -> bool:
+    return monstruo_cinco_caras(cubo, x, y, z, _cod(orient))
+
+def frontal_estado(cubo, x: int, y: int, z: int, orient: Orient | int) -> str:
+    return ESTADOS_FRONTALES[frontal_cod(cubo, x, y, z, _cod(orient))]
+
+# --- Códigos compactos (motor de flota y memorias columnares) ---
+REGLAS: Tuple[str, ...] = (
+    "R1_MONSTRUO_EN_MI_CELDA", "R2_BLOQUEO_FRENTE", "R3_ROBOT_AL_FRENTE", "R4_MONSTRUO_FRENTE",
+    "R5_MONSTROSCOPIO_AVANZAR", "R6_MONSTROSCOPIO_BLOQUEO", "R7_NEUTRO_AVANZAR", "R8_NEUTRO_BLOQUEO",
+)
+ACCIONES: Tuple[str, ...] = (   # acción de cada regla, mismo orden que REGLAS
+    "vacuumator", "rotar_90", "rotar_90_por_robot", "avanzar_a_monstruo",
+    "avanzar", "rotar_90", "avanzar", "rotar_90",
+)
+def percepcion_de(regla: int, frontal: int, monstroscopio: bool) -> Dict[str, Any]:
+    """Reconstruye el dict de percepción a partir de los códigos (inverso de tick)."""
+    percep = {"energometro": False, "robot_frente": False, "monstroscopio": False, "vacuscopio": False}
+    if regla == 0:
+        percep["energometro"] = True
+    elif regla == 1:
+        percep["vacuscopio"] = "borde" if ESTADOS_FRONTALES[frontal] == "BORDE" else True
+    elif regla == 2:
+        percep["robot_frente"] = True
+    elif regla >= 4:
+        percep["monstroscopio"] = bool(monstroscopio)
+    return percep
+
+# =======================
+#   MEMORIA EPISÓDICA
+# =======================
+class MemoriaRobot:
+    """
+    Memoria episódica columnar: una columna `array` tipada por campo, con regla,
+    frontal y orientaciones guardadas como códigos de 1 byte (~37 bytes por fila).
+    Registrar un tick no crea objetos: solo escribe enteros en las columnas.
+
+    - capacidad: si no es None, buffer circular que conserva las últimas `capacidad` filas.
+    - muestreo: guarda solo los ticks con t % muestreo == 0 (1 = todos).
+    - total: filas registradas desde el inicio (incluye las descartadas por capacidad).
+
+    Para los consumidores se comporta como la lista de dicts original:
+    len(), memoria[i], iteración y append(fila_dict) devuelven/aceptan filas dict.
+    """
+    COLUMNAS: Tuple[Tuple[str, str], ...] = (
+        ("t", "i"), ("regla", "B"), ("frontal", "B"), ("monstro", "B"),
+        ("x_pre", "i"), ("y_pre", "i"), ("z_pre", "i"), ("ori_pre", "B"),
+        ("x_post", "i"), ("y_post", "i"), ("z_post", "i"), ("ori_post", "B"),
+        ("kills", "i"),
+    )
+
+    def __init__(self, capacidad: int | None = None, muestreo: int = 1):
+        assert capacidad is None or capacidad > 0, "capacidad debe ser > 0 o None."
+        assert muestreo >= 1, "muestreo debe ser >= 1."
+        self.capacidad = capacidad
+        self.muestreo = muestreo
+        self.total = 0
+        self._inicio = 0     # fila más antigua dentro del buffer circular
+        self._n = 0          # filas guardadas
+        self.cols: Dict[str, array] = {}
+        for nombre, tipo in self.COLUMNAS:
+            col = array(tipo)
+            if capacidad is not None:
+                col.extend(bytes(capacidad) if tipo == "B" else [0] * capacidad)
+            self.cols[nombre] = col
+        self._lista = [self.cols[nombre] for nombre, _ in self.COLUMNAS]
+
+    def registrar(self, t: int, regla: int, frontal: int, monstro: bool,
+                  x0: int, y0: int, z0: int, o0: int,
+                  x1: int, y1: int, z1: int, o1: int, kills: int):
+        """Agrega una fila a partir de códigos (ver REGLAS, ESTADOS_FRONTALES, ORIENTACIONES)."""
+        if t % self.muestreo:
+            return
+        self.total += 1
+        valores = (t, regla, frontal, monstro, x0, y0, z0, o0, x1, y1, z1, o1, kills)
+        if self.capacidad is None:
+            for col, v in zip(self._lista, valores):
+                col.append(v)
+            self._n += 1
+            return
+        if self._n < self.capacidad:
+            k = (self._inicio + self._n) % self.capacidad
+            self._n += 1
+        else:
+            k = self._inicio
+            self._inicio = (self._inicio + 1) % self.capacidad
+        for col, v in zip(self._lista, valores):
+            col[k] = v
+
+    def extender(self, columnas: Dict[str, Sequence[int]]):
+        """Agrega varias filas de una vez (mismas claves que COLUMNAS), respetando capacidad y muestreo."""
+        if self.muestreo > 1:
+            quedan = [k for k, t in enumerate(columnas["t"]) if t % self.muestreo == 0]
+            columnas = {nombre: [columnas[nombre][k] for k in quedan] for nombre, _ in self.COLUMNAS}
+        n = len(columnas["t"])
+        if self.capacidad is None:
+            for nombre, _ in self.COLUMNAS:
+                self.cols[nombre].extend(columnas[nombre])
+            self._n += n
+            self.total += n
+            return
+        # del lote solo sobreviven en el buffer las últimas `capacidad` filas
+        desde = max(0, n - self.capacidad)
+        self.total += desde
+        for k in range(desde, n):
+            self.registrar(*(columnas[nombre][k] for nombre, _ in self.COLUMNAS))
+
+    def append(self, fila: Dict[str, Any]):
+        """Compatibilidad con la memoria como lista de dicts."""
+        (x0, y0, z0), (x1, y1, z1) = fila["pos_pre"], fila["pos_post"]
+        self.registrar(
+            fila["t"], REGLAS.index(fila["regla"]), FRONTAL_COD[fila["frontal_estado"]],
+            bool(fila["percepcion"].get("monstroscopio")),
+            x0, y0, z0, ORI_COD[fila["ori_pre"]], x1, y1, z1, ORI_COD[fila["ori_post"]],
+            fila["kills"],
+        )
+
+    @classmethod
+    def desde_filas(cls, filas, capacidad: int | None = None, muestreo: int = 1) -> "MemoriaRobot":
+        mem = cls(capacidad, muestreo)
+        for fila in filas:
+            mem.append(fila)
+        return mem
+
+    @classmethod
+    def restaurada(cls, capacidad: int | None, muestreo: int, total: int,
+                   columnas: Dict[str, Sequence[int]]) -> "MemoriaRobot":
+        """
+        Memoria tal como queda tras registrar `total` filas, de las que `columnas` son las
+        últimas (en orden cronológico; con capacidad alcanza con las últimas `capacidad`).
+        """
+        mem = cls(capacidad, muestreo)
+        n = len(columnas["t"])
+        if capacidad is not None and n > capacidad:
+            columnas = {nombre: col[n - capacidad:] for nombre, col in columnas.items()}
+        mem.extender(columnas)
+        mem.total = total
+        return mem
+
+    @classmethod
+    def desde_columnas(cls, columnas: Dict[str, array], capacidad: int | None = None,
+                       muestreo: int = 1) -> "MemoriaRobot":
+        """
+        Memoria armada de una vez a partir de columnas `array` ya tipadas y muestreadas
+        (en orden cronológico): equivale a extender una memoria vacía, sin pasar fila
+        por fila.
+        """
+        n = len(columnas["t"])
+        quedan = n if capacidad is None else min(n, capacidad)
+        relleno = 0 if capacidad is None else capacidad - quedan
+        mem = cls.__new__(cls)
+        mem.capacidad, mem.muestreo = capacidad, muestreo
+        mem.total, mem._inicio, mem._n = n, 0, quedan
+        mem.cols = {}
+        for nombre, _ in cls.COLUMNAS:
+            col = columnas[nombre][n - quedan:]
+            if relleno:
+                col.frombytes(bytes(relleno * col.itemsize))
+            mem.cols[nombre] = col
+        mem._lista = [mem.cols[nombre] for nombre, _ in cls.COLUMNAS]
+        return mem
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _pos(self, i: int) -> int:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("índice de memoria fuera de rango")
+        return i if self.capacidad is None else (self._inicio + i) % self.capacidad
+
+    def valores(self, i: int) -> Tuple[int, ...]:
+        """Fila i como tupla de códigos, en el orden de COLUMNAS."""
+        k = self._pos(i)
+        return tuple(col[k] for col in self._lista)
+
+    def __getitem__(self, i: int | slice) -> Dict[str, Any] | List[Dict[str, Any]]:
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._n))]
+        t, rg, fr, mo, x0, y0, z0, o0, x1, y1, z1, o1, kills = self.valores(i)
+        return {
+            "t": t,
+            "regla": REGLAS[rg],
+            "accion": ACCIONES[rg],
+            "percepcion": percepcion_de(rg, fr, mo),
+            "frontal_estado": ESTADOS_FRONTALES[fr],
+            "pos_pre": (x0, y0, z0),
+            "ori_pre": ORIENTACIONES[o0],
+            "pos_post": (x1, y1, z1),
+            "ori_post": ORIENTACIONES[o1],
+            "kills": kills,
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._n):
+            yield self[i]
+
+    def __eq__(self, otra) -> bool:
+        if isinstance(otra, (MemoriaRobot, list)):
+            return len(self) == len(otra) and all(a == b for a, b in zip(self, otra))
+        return NotImplemented
+
+    def columna(self, nombre: str) -> List[int]:
+        """Columna completa en orden cronológico (para análisis)."""
+        col = self.cols[nombre]
+        if self.capacidad is None or self._n < self.capacidad:
+            return col[:self._n].tolist()
+        return (col[self._inicio:] + col[:self._inicio]).tolist()
+
+    def columnas_desde(self, previo: int) -> Tuple[Dict[str, array], int]:
+        """
+        Filas registradas después de las primeras `previo` (contando `total`), como
+        columnas en orden cronológico. Devuelve (columnas, perdidas): `perdidas` son las
+        filas que el buffer circular ya sobrescribió antes de poder leerlas.
+        """
+        nuevas = self.total - previo
+        disponibles = min(nuevas, self._n)
+        a, b = self._n - disponibles, self._n
+        out = {}
+        for nombre, _ in self.COLUMNAS:
+            col = self.cols[nombre]
+            if self.capacidad is None:
+                out[nombre] = col[a:b]
+                continue
+            k = (self._inicio + a) % self.capacidad
+            fin = k + disponibles
+            if fin <= self.capacidad:
+                out[nombre] = col[k:fin]
+            else:
+                out[nombre] = col[k:] + col[:fin - self.capacidad]
+        return out, nuevas - disponibles
+
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) for col in self._lista)
+
 
 # =======================
 #        ROBOT
 # =======================
-@dataclass
+R_MONSTRUO_EN_MI_CELDA, R_BLOQUEO_FRENTE, R_ROBOT_AL_FRENTE, R_MONSTRUO_FRENTE, \
+    R_MONSTROSCOPIO_AVANZAR, R_MONSTROSCOPIO_BLOQUEO, R_NEUTRO_AVANZAR, R_NEUTRO_BLOQUEO = range(len(REGLAS))
+
+@dataclass(init=False)
 class Robot:
     x: int
     y: int
     z: int
-    orientacion: Orient = "X+"
-    lado_idx: int = 0                      # índice para el ciclo de 90°
-    kills: int = 0                         # monstruos eliminados por este robot
-    memoria: List[Dict[str, Any]] = None   # tabla de logs por tick
-
-    def __post_init__(self):
-        if self.memoria is None:
-            self.memoria = []
-
-    def _log_tick(self, t: int, regla: str, accion: str, percep: Dict[str, Any],
-                  frontal: str, pre: Tuple[int,int,int,Orient], post: Tuple[int,int,int,Orient]):
-        self.memoria.append({
-            "t": t,
-            "regla": regla,
-            "accion": accion,
-            "percepcion": percep,
-            "frontal_estado": frontal,
-            "pos_pre": (pre[0], pre[1], pre[2]),
-            "ori_pre": pre[3],
-            "pos_post": (post[0], post[1], post[2]),
-            "ori_post": post[3],
-            "kills": self.kills
-        })
-
-    def tick(self, cubo, t: int) -> bool:
+    ori: int                               # código de orientación (ver ORIENTACIONES)
+    lado_idx: int                          # índice para el ciclo de 90°
+    kills: int                             # monstruos eliminados por este robot
+    memoria: MemoriaRobot                  # tabla de logs por tick (columnar)
+
+    def __init__(self, x: int, y: int, z: int, orientacion: Orient | int = "X+",
+                 lado_idx: int = 0, kills: int = 0, memoria=None):
+        self.x, self.y, self.z = x, y, z
+        self.ori = _cod(orientacion)
+        self.lado_idx = lado_idx
+        self.kills = kills
+        if memoria is None:
+            memoria = MemoriaRobot()
+        elif not isinstance(memoria, MemoriaRobot):
+            memoria = MemoriaRobot.desde_filas(memoria)
+        self.memoria = memoria
+        self.ultima_regla = -1             # código de la regla del último tick (ver REGLAS)
+
+    @property
+    def orientacion(self) -> Orient:
+        return ORIENTACIONES[self.ori]
+
+    @orientacion.setter
+    def orientacion(self, orient: Orient | int):
+        self.ori = _cod(orient)
+
+    def _log_tick(self, t: int, regla: int, frontal: int, monstro: bool,
+                  x0: int, y0: int, z0: int, ori_pre: int):
+        self.ultima_regla = regla
+        self.memoria.registrar(
+            t, regla, frontal, monstro,
+            x0, y0, z0, ori_pre,
+            self.x, self.y, self.z, self.ori,
+            self.kills,
+        )
+
+    def _avanzar(self, cubo, indice, come_monstruo: bool):
+        dx, dy, dz = DESP[self.ori]
+        nx, ny, nz = self.x + dx, self.y + dy, self.z + dz
+        cubo[self.x][self.y][self.z] = ZL
+        cubo[nx][ny][nz] = ROBOT
+        if indice is not None:
+            if come_monstruo:
+                # la celda pasa a ROBOT: el monstruo deja de estar en el cubo
+                indice.quitar_monstruo((nx, ny, nz))
+            indice.mover_robot((self.x, self.y, self.z), (nx, ny, nz))
+        self.x, self.y, self.z = nx, ny, nz
+
+    def tick(self, cubo, t: int, indice=None) -> bool:
         """
         Reglas con prioridad:
         R1 (energómetro) → R2 (borde/ZV) → R3 (robot al frente) → R4 (monstruo al frente)
         → R5 (M=TRUE & frontal ZL) → R6 (M=TRUE & frontal bloqueado) → R7 (neutro ZL) → R8 (neutro bloqueado).
+        Si se pasa un índice de ocupación (entorno.IndiceOcupacion), cada escritura
+        sobre el cubo se refleja también en él; si el índice lleva campo de proximidad
+        (entorno.CampoMonstruos), el monstroscopio lo lee en lugar de sondear el cubo.
         Devuelve False si el robot fue destruido; True si sigue activo.
         """
-        pre = (self.x, self.y, self.z, self.orientacion)
-        percep = {
-            "energometro": False,
-            "robot_frente": False,
-            "monstroscopio": False,
-            "vacuscopio": False
-        }
+        x0, y0, z0, ori0 = self.x, self.y, self.z, self.ori
 
         # R1. Monstruo en mi celda (aniquilación mutua)
-        if cubo[self.x][self.y][self.z] == MONSTRUO:
-            cubo[self.x][self.y][self.z] = ZV
+        if isinstance(cubo, list):
+            aqui = cubo[x0][y0][z0]
+        else:
+            N = len(cubo)
+            aqui = cubo.item((x0 * N + y0) * N + z0)
+        if aqui == MONSTRUO:
+            cubo[x0][y0][z0] = ZV
+            if indice is not None:
+                indice.quitar_robot((x0, y0, z0))
+                indice.quitar_monstruo((x0, y0, z0))
             self.kills += 1
-            self._log_tick(t, "R1_MONSTRUO_EN_MI_CELDA", "vacuumator", {**percep, "energometro": True}, "AQUI", pre, (self.x, self.y, self.z, self.orientacion))
+            self._log_tick(t, R_MONSTRUO_EN_MI_CELDA, F_AQUI, False, x0, y0, z0, ori0)
             return False
 
         # Sensado frontal (una vez)
-        f_estado = frontal_estado(cubo, self.x, self.y, self.z, self.orientacion)
+        frontal = frontal_cod(cubo, x0, y0, z0, ori0)
 
         # R2. Pared/ZV al frente
-        if f_estado in ("BORDE", "ZV"):
-            percep["vacuscopio"] = "borde" if f_estado == "BORDE" else True
-            self.orientacion, self.lado_idx = rotar_90(self.orientacion, self.lado_idx)
-            post = (self.x, self.y, self.z, self.orientacion)
-            self._log_tick(t, "R2_BLOQUEO_FRENTE", "rotar_90", percep, f_estado, pre, post)
+        if frontal == F_BORDE or frontal == F_ZV:
+            self.ori, self.lado_idx = rotar_90(ori0, self.lado_idx)
+            self._log_tick(t, R_BLOQUEO_FRENTE, frontal, False, x0, y0, z0, ori0)
             return True
 
         # R3. Robot al frente (protocolo determinista — TODO: coordinación global)
-        if f_estado == "ROBOT":
-            percep["robot_frente"] = True
+        if frontal == F_ROBOT:
             # Versión local (provisional): rota para evitar choque y registra R3
-            self.orientacion, self.lado_idx = rotar_90(self.orientacion, self.lado_idx)
-            post = (self.x, self.y, self.z, self.orientacion)
-            self._log_tick(t, "R3_ROBOT_AL_FRENTE", "rotar_90_por_robot", percep, f_estado, pre, post)
+            self.ori, self.lado_idx = rotar_90(ori0, self.lado_idx)
+            self._log_tick(t, R_ROBOT_AL_FRENTE, frontal, False, x0, y0, z0, ori0)
             return True
 
         # R4. Monstruo al frente
-        if f_estado == "MONSTRUO":
+        if frontal == F_MONSTRUO:
             # avanzar a la celda con monstruo; aniquilación se resuelve al inicio del próximo tick (R1)
-            nx, ny, nz = celda_frontal(self.x, self.y, self.z, self.orientacion)
-            cubo[self.x][self.y][self.z] = ZL
-            cubo[nx][ny][nz] = ROBOT
-            self.x, self.y, self.z = nx, ny, nz
-            post = (self.x, self.y, self.z, self.orientacion)
-            self._log_tick(t, "R4_MONSTRUO_FRENTE", "avanzar_a_monstruo", percep, f_estado, pre, post)
+            self._avanzar(cubo, indice, come_monstruo=True)
+            self._log_tick(t, R_MONSTRUO_FRENTE, frontal, False, x0, y0, z0, ori0)
             return True
 
-        # Monstroscopio (5 caras)
-        percep["monstroscopio"] = detectar_monstruo_cinco_lados(cubo, self.x, self.y, self.z, self.orientacion)
+        # Monstroscopio (5 caras): con campo de proximidad, una lectura menos la cara trasera
+        campo = indice.campo if indice is not None else None
+        if campo is not None:
+            monstro = campo.monstroscopio(x0, y0, z0, OPUESTA[ori0])
+        else:
+            monstro = monstruo_cinco_caras(cubo, x0, y0, z0, ori0)
 
         # R5. M=TRUE y frontal ZL → avanzar
-        if percep["monstroscopio"] and f_estado == "ZL":
-            nx, ny, nz = celda_frontal(self.x, self.y, self.z, self.orientacion)
-            cubo[self.x][self.y][self.z] = ZL
-            cubo[nx][ny][nz] = ROBOT
-            self.x, self.y, self.z = nx, ny, nz
-            post = (self.x, self.y, self.z, self.orientacion)
-            self._log_tick(t, "R5_MONSTROSCOPIO_AVANZAR", "avanzar", percep, f_estado, pre, post)
+        if monstro and frontal == F_ZL:
+            self._avanzar(cubo, indice, come_monstruo=False)
+            self._log_tick(t, R_MONSTROSCOPIO_AVANZAR, frontal, monstro, x0, y0, z0, ori0)
             return True
 
         # R6. M=TRUE y frontal bloqueado (ZV/BORDE/ROBOT) → rotar
-        if percep["monstroscopio"] and f_estado in ("ZV", "BORDE", "ROBOT"):
-            self.orientacion, self.lado_idx = rotar_90(self.orientacion, self.lado_idx)
-            post = (self.x, self.y, self.z, self.orientacion)
-            self._log_tick(t, "R6_MONSTROSCOPIO_BLOQUEO", "rotar_90", percep, f_estado, pre, post)
+        if monstro and frontal in (F_ZV, F_BORDE, F_ROBOT):
+            self.ori, self.lado_idx = rotar_90(ori0, self.lado_idx)
+            self._log_tick(t, R_MONSTROSCOPIO_BLOQUEO, frontal, monstro, x0, y0, z0, ori0)
             return True
 
         # R7. Neutro (M=FALSE) con frontal ZL → avanzar
-        if (not percep["monstroscopio"]) and f_estado == "ZL":
-            nx, ny, nz = celda_frontal(self.x, self.y, self.z, self.orientacion)
-            cubo[self.x][self.y][self.z] = ZL
-            cubo[nx][ny][nz] = ROBOT
-            self.x, self.y, self.z = nx, ny, nz
-            post = (self.x, self.y, self.z, self.orientacion)
-            self._log_tick(t, "R7_NEUTRO_AVANZAR", "avanzar", percep, f_estado, pre, post)
+        if (not monstro) and frontal == F_ZL:
+            self._avanzar(cubo, indice, come_monstruo=False)
+            self._log_tick(t, R_NEUTRO_AVANZAR, frontal, monstro, x0, y0, z0, ori0)
             return True
 
         # R8. Neutro bloqueado → rotar
-        self.orientacion, self.lado_idx = rotar_90(self.orientacion, self.lado_idx)
-        post = (self.x, self.y, self.z, self.orientacion)
-        self._log_tick(t, "R8_NEUTRO_BLOQUEO", "rotar_90", percep, f_estado, pre, post)
+        self.ori, self.lado_idx = rotar_90(ori0, self.lado_idx)
+        self._log_tick(t, R_NEUTRO_BLOQUEO, frontal, monstro, x0, y0, z0, ori0)
         return True
@@ -0,0 +1,34 @@
+# =====================================================
+# apoyo_pruebas.py — Utilidades compartidas por los test_*.py
+# =====================================================
+import pytest
+
+from entorno import ParamEntorno, np
+from puntos_control import _imagen
+from simulacion import simular
+
+con_numpy = pytest.mark.skipif(np is None, reason="requiere numpy")
+
+
+def params(**cambios) -> ParamEntorno:
+    base = dict(N=9, Pfree=0.8, Psoft=0.2, Nrobot=6, Nmonstruos=20, seed=0, K_monstruo=1, p_monstruo=0.6)
+    base.update(cambios)
+    return ParamEntorno(**base)
+
+
+def estado(cubo, robots, con_lado: bool = True) -> tuple:
+    """Grilla en bytes (cualquier backend) + robots, para comparar corridas."""
+    if hasattr(cubo, "valor"):
+        N = len(cubo)
+        grilla = bytes(cubo.valor(x, y, z) for x in range(N) for y in range(N) for z in range(N))
+    else:
+        grilla = _imagen(cubo)
+    # la repetición no guarda lado_idx (solo lo que se ve: posición, orientación, kills)
+    return grilla, sorted((r.x, r.y, r.z, r.ori, r.lado_idx if con_lado else 0, r.kills) for r in robots)
+
+
+def correr(p: ParamEntorno, **opciones) -> tuple:
+    kw = dict(T_MAX=80, S_ESTASIS=10**6, verbose=False, exportar=None, con_resultado=True)
+    kw.update(opciones)
+    cubo, robots, res = simular(p, **kw)
+    return estado(cubo, robots), [list(r.memoria) for r in robots], res
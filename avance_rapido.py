@@ -0,0 +1,113 @@
+# =====================================================
+# avance_rapido.py — Salto de ticks en los que el mundo queda congelado
+# =====================================================
+from typing import List, Tuple
+
+from agente import (
+    Robot, MONSTRUO, OPUESTA, F_ZL, F_ZV, F_ROBOT, F_MONSTRUO, F_BORDE,
+    R_BLOQUEO_FRENTE, R_ROBOT_AL_FRENTE, R_NEUTRO_BLOQUEO,
+    frontal_cod, monstruo_cinco_caras, rotar_90,
+)
+
+# Fila de un paso que solo rota: (regla, frontal, monstro, ori_pre, ori_post, lado_post)
+Fila = Tuple[int, int, bool, int, int, int]
+
+MIN_VENTANA = 2   # ventanas más cortas se ejecutan tick a tick
+
+
+def trayectoria(r: Robot, cubo, indice) -> Tuple[List[Fila], int | None]:
+    """
+    Sigue al robot sobre el mundo congelado (nadie se mueve) desde su estado (ori, lado_idx),
+    aplicando las mismas reglas que Robot.tick, mientras solo rote.
+    Devuelve (filas, ciclo): si en algún paso avanzaría (o lo aniquilan), `filas` son los
+    pasos previos y ciclo es None; si no, el estado se repite y `ciclo` es el paso desde el
+    que `filas` se repite indefinidamente.
+    """
+    x, y, z = r.x, r.y, r.z
+    N = len(cubo)
+    aqui = cubo[x][y][z] if isinstance(cubo, list) else cubo.item((x * N + y) * N + z)
+    if aqui == MONSTRUO:
+        return [], None
+    campo = indice.campo if indice is not None else None
+    filas: List[Fila] = []
+    visto = {}
+    estado = (r.ori, r.lado_idx)
+    while estado not in visto:
+        visto[estado] = len(filas)
+        ori, lado = estado
+        frontal = frontal_cod(cubo, x, y, z, ori)
+        monstro = False
+        if frontal == F_BORDE or frontal == F_ZV:
+            regla = R_BLOQUEO_FRENTE
+        elif frontal == F_ROBOT:
+            regla = R_ROBOT_AL_FRENTE
+        elif frontal == F_MONSTRUO or frontal == F_ZL:
+            return filas, None
+        else:
+            # frontal desconocido: R8, registrando el monstroscopio como Robot.tick
+            if campo is not None:
+                monstro = campo.monstroscopio(x, y, z, OPUESTA[ori])
+            else:
+                monstro = monstruo_cinco_caras(cubo, x, y, z, ori)
+            regla = R_NEUTRO_BLOQUEO
+        ori2, lado2 = rotar_90(ori, lado)
+        filas.append((regla, frontal, monstro, ori, ori2, lado2))
+        estado = (ori2, lado2)
+    return filas, visto[estado]
+
+
+def _fila(filas: List[Fila], ciclo: int | None, j: int) -> Fila:
+    if j < len(filas):
+        return filas[j]
+    return filas[ciclo + (j - ciclo) % (len(filas) - ciclo)]
+
+
+def ventana(robots: List[Robot], cubo, indice, t: int, limite: int):
+    """
+    Último tick t_fin ≤ limite hasta el que, empezando en t, ningún robot avanza (con el
+    mundo congelado, todos solo rotan). Quien llama garantiza que no hay paso de monstruos
+    en [t, limite]. Devuelve (t_fin, trayectorias) o None si la ventana es más corta que
+    MIN_VENTANA.
+    """
+    if limite - t + 1 < MIN_VENTANA:
+        return None
+    t_fin = limite
+    trayectorias = []
+    for r in robots:
+        filas, ciclo = trayectoria(r, cubo, indice)
+        if ciclo is None:
+            t_fin = min(t_fin, t + len(filas) - 1)
+            if t_fin - t + 1 < MIN_VENTANA:
+                return None
+        trayectorias.append((filas, ciclo))
+    return t_fin, trayectorias
+
+
+def avanzar(robots: List[Robot], trayectorias: list, t: int, t_fin: int):
+    """
+    Aplica los ticks t..t_fin a cada robot: estado final y filas de memoria en bloque
+    (solo las que conservaría MemoriaRobot con su muestreo y capacidad).
+    """
+    n = t_fin - t + 1
+    for r, (filas, ciclo) in zip(robots, trayectorias):
+        mem = r.memoria
+        m = mem.muestreo
+        ticks = range(-(-t // m) * m, t_fin + 1, m)
+        if mem.capacidad is not None and len(ticks) > mem.capacidad:
+            # las filas que el buffer descartaría solo cuentan en `total`
+            mem.total += len(ticks) - mem.capacidad
+            ticks = ticks[len(ticks) - mem.capacidad:]
+        if ticks:
+            pasos = [_fila(filas, ciclo, tt - t) for tt in ticks]
+            k = len(pasos)
+            x, y, z = [r.x] * k, [r.y] * k, [r.z] * k
+            mem.extender({
+                "t": ticks, "regla": [p[0] for p in pasos], "frontal": [p[1] for p in pasos],
+                "monstro": [p[2] for p in pasos],
+                "x_pre": x, "y_pre": y, "z_pre": z, "ori_pre": [p[3] for p in pasos],
+                "x_post": x, "y_post": y, "z_post": z, "ori_post": [p[4] for p in pasos],
+                "kills": [r.kills] * k,
+            })
+        ultimo = _fila(filas, ciclo, n - 1)
+        r.ori, r.lado_idx = ultimo[4], ultimo[5]
+        r.ultima_regla = ultimo[0]
@@ -0,0 +1,203 @@
+# =====================================================
+# barrido.py — Barridos de parámetros (Monte Carlo) en paralelo
+# =====================================================
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, fields, replace
+from inspect import signature
+from itertools import product
+from pathlib import Path
+from typing import Dict, Any, Iterator, List
+import argparse
+import csv
+import json
+
+from cache_mundos import CacheMundos
+from entorno import ParamEntorno
+from simulacion import simular, OPCIONES
+
+CAMPOS_PARAMS = [f.name for f in fields(ParamEntorno)]
+CAMPOS_METRICAS = ["kills", "eficiencia_pct", "eficiencia_media_por_robot",
+                   "ticks", "motivo_parada", "robots_vivos", "monstruos_restantes"]
+COLUMNAS = ["punto"] + CAMPOS_PARAMS + ["opciones"] + CAMPOS_METRICAS
+
+# Opciones de simular que fija el barrido (cada worker corre sin salida y con resultado)
+FIJAS = ("verbose", "exportar", "con_resultado")
+_DEFECTO = {k: v.default for k, v in signature(simular).parameters.items()
+            if k in OPCIONES and k not in FIJAS}
+
+
+def grilla(base: ParamEntorno, **ejes: List[Any]) -> List[ParamEntorno]:
+    """
+    Producto cartesiano de valores sobre un ParamEntorno base, p. ej.
+    grilla(base, N=[5, 10], Pfree=[0.6, 0.8]). Si varía Pfree y no Psoft, se usa Psoft = 1 - Pfree.
+    """
+    nombres = list(ejes)
+    puntos = []
+    for valores in product(*(ejes[n] for n in nombres)):
+        cambios = dict(zip(nombres, valores))
+        if "Pfree" in cambios and "Psoft" not in cambios:
+            cambios["Psoft"] = round(1.0 - cambios["Pfree"], 12)
+        puntos.append(replace(base, **cambios))
+    return puntos
+
+
+def opciones_efectivas(opciones: Dict[str, Any]) -> str:
+    """
+    Opciones de simular con las que corre el barrido (las no pasadas, con su valor por
+    defecto), como JSON canónico: va en la columna "opciones" del CSV y en la clave de
+    reanudación, así cambiar T_MAX, P_CICLO, etc. no saltea corridas hechas con otros.
+    """
+    return json.dumps({**_DEFECTO, **opciones}, sort_keys=True, default=str)
+
+
+def _clave(fila: Dict[str, Any]) -> tuple:
+    """Identifica una corrida (parámetros + semilla + opciones) para reanudar barridos."""
+    return tuple(str(fila.get(c)) for c in CAMPOS_PARAMS + ["opciones"])
+
+
+_caches: Dict[Any, CacheMundos] = {}   # una caché de mundos por proceso worker
+
+
+def _cache_del_proceso(carpeta: str | None) -> CacheMundos:
+    if carpeta not in _caches:
+        _caches[carpeta] = CacheMundos(carpeta=carpeta)
+    return _caches[carpeta]
+
+
+def _correr(punto: int, params: ParamEntorno, opciones: Dict[str, Any],
+            cache: bool = False, carpeta_cache: str | None = None) -> Dict[str, Any]:
+    """Una corrida sin salida por pantalla ni exportación de memorias (se ejecuta en un worker)."""
+    cache_mundos = _cache_del_proceso(carpeta_cache) if cache else None
+    _, _, res = simular(params, verbose=False, exportar=None, con_resultado=True,
+                        cache_mundos=cache_mundos, **opciones)
+    fila = asdict(res)
+    del fila["metricas"]
+    return {"punto": punto, **asdict(params), "opciones": opciones_efectivas(opciones), **fila}
+
+
+def barrer(
+    puntos: List[ParamEntorno],
+    semillas: int = 1,
+    procesos: int | None = None,
+    salida: str | None = None,
+    semilla_base: int = 0,
+    cache_mundos: bool = True,
+    carpeta_cache: str | None = None,
+    **opciones
+) -> Iterator[Dict[str, Any]]:
+    """
+    Corre cada punto con `semillas` semillas (semilla_base .. semilla_base + semillas - 1)
+    en un pool de procesos y devuelve las filas de resultados a medida que terminan.
+
+    Con `salida` (CSV), cada fila se agrega al archivo apenas llega; si el archivo ya
+    existe, las corridas registradas en él se saltean, así un barrido interrumpido se
+    reanuda donde quedó; cada fila guarda las opciones efectivas (columna "opciones") y
+    solo se saltean las corridas hechas con las mismas. `opciones` se pasan a simular
+    (T_MAX, S_ESTASIS, P_CICLO, ...), salvo las FIJAS, que el barrido no admite.
+
+    Con `cache_mundos`, cada worker reutiliza los mundos ya construidos (puntos que solo
+    difieren en la dinámica comparten terreno y colocación); con `carpeta_cache`, además
+    se guardan en disco y los workers los comparten por memory-mapping.
+    """
+    fijas = sorted(set(opciones) & set(FIJAS))
+    if fijas:
+        raise ValueError(f"barrer fija {fijas} para todas las corridas; no se pueden pasar.")
+    desconocidas = sorted(set(opciones) - set(_DEFECTO))
+    if desconocidas:
+        raise TypeError(f"Opciones de simular desconocidas: {desconocidas}.")
+
+    hechas = set()
+    archivo = None
+    if salida is not None:
+        ruta = Path(salida)
+        if ruta.exists() and ruta.stat().st_size > 0:
+            with open(ruta, newline="", encoding="utf-8") as f:
+                lector = csv.DictReader(f)
+                if lector.fieldnames != COLUMNAS:
+                    raise ValueError(f"{salida} tiene otras columnas (¿de otra versión del barrido?).")
+                hechas = {_clave(fila) for fila in lector}
+        nuevo = not ruta.exists() or ruta.stat().st_size == 0
+        archivo = open(ruta, "a", newline="", encoding="utf-8")
+        escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS)
+        if nuevo:
+            escritor.writeheader()
+            archivo.flush()
+
+    efectivas = opciones_efectivas(opciones)
+    trabajos = []
+    for i, p in enumerate(puntos):
+        for k in range(semillas):
+            params = replace(p, seed=semilla_base + k)
+            if _clave({**asdict(params), "opciones": efectivas}) not in hechas:
+                trabajos.append((i, params))
+
+    pool = ProcessPoolExecutor(max_workers=procesos)
+    pendientes = set()
+    try:
+        pendientes = {pool.submit(_correr, i, params, opciones, cache_mundos, carpeta_cache)
+                      for i, params in trabajos}
+        for fut in as_completed(list(pendientes)):
+            pendientes.discard(fut)
+            fila = fut.result()
+            if archivo is not None:
+                escritor.writerow(fila)
+                archivo.flush()
+            yield fila
+    finally:
+        # Si el llamador corta antes (break, close del generador o un error), las corridas
+        # que no empezaron se cancelan; las que ya estaban en curso terminan y quedan en
+        # el CSV, así la reanudación no las repite.
+        pool.shutdown(wait=True, cancel_futures=True)
+        if archivo is not None:
+            for fut in pendientes:
+                if fut.done() and not fut.cancelled() and fut.exception() is None:
+                    escritor.writerow(fut.result())
+            archivo.close()
+
+
+# ----- CLI -----
+def _parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(description="Barrido de parámetros de la simulación en paralelo.")
+    ap.add_argument("--N", type=int, nargs="+", default=[5])
+    ap.add_argument("--Pfree", type=float, nargs="+", default=[0.7])
+    ap.add_argument("--Nrobot", type=int, nargs="+", default=[2])
+    ap.add_argument("--Nmonstruos", type=int, nargs="+", default=[3])
+    ap.add_argument("--K_monstruo", type=int, nargs="+", default=[2])
+    ap.add_argument("--p_monstruo", type=float, nargs="+", default=[0.7])
+    ap.add_argument("--backend", default="lista")
+    ap.add_argument("--semillas", type=int, default=10, help="semillas por punto")
+    ap.add_argument("--semilla-base", type=int, default=0)
+    ap.add_argument("--procesos", type=int, default=None, help="workers (por defecto, núcleos)")
+    ap.add_argument("--salida", default="barrido.csv", help="CSV de resultados (se reanuda si existe)")
+    ap.add_argument("--T_MAX", type=int, default=200)
+    ap.add_argument("--S_ESTASIS", type=int, default=20)
+    ap.add_argument("--P_CICLO", type=int, default=1)
+    ap.add_argument("--sin-cache", action="store_true", help="no reutilizar mundos construidos")
+    ap.add_argument("--carpeta-cache", default=None, help="caché de mundos en disco (compartida)")
+    ap.add_argument("--inalcanzable", action="store_true",
+                    help="cortar las corridas en cuanto no quedan kills posibles")
+    ap.add_argument("--campo-monstruos", action="store_true",
+                    help="sensar monstruos con el campo de proximidad (2·N³ bytes por corrida)")
+    return ap
+
+
+def main(argv=None):
+    a = _parser().parse_args(argv)
+    base = ParamEntorno(N=a.N[0], Pfree=a.Pfree[0], Psoft=1.0 - a.Pfree[0], backend=a.backend)
+    puntos = grilla(base, N=a.N, Pfree=a.Pfree, Nrobot=a.Nrobot, Nmonstruos=a.Nmonstruos,
+                    K_monstruo=a.K_monstruo, p_monstruo=a.p_monstruo)
+    total = len(puntos) * a.semillas
+    print(f"Barrido: {len(puntos)} puntos × {a.semillas} semillas = {total} corridas → {a.salida}")
+    n = 0
+    for fila in barrer(puntos, a.semillas, a.procesos, a.salida, a.semilla_base,
+                       cache_mundos=not a.sin_cache, carpeta_cache=a.carpeta_cache,
+                       T_MAX=a.T_MAX, S_ESTASIS=a.S_ESTASIS, P_CICLO=a.P_CICLO,
+                       detectar_inalcanzable=a.inalcanzable, campo_monstruos=a.campo_monstruos):
+        n += 1
+        print(f"[{n}] punto={fila['punto']} seed={fila['seed']} kills={fila['kills']} "
+              f"ef={fila['eficiencia_pct']:.1f}% ticks={fila['ticks']} parada={fila['motivo_parada']}")
+    print(f"Listo: {n} corridas nuevas.")
+
+
+if __name__ == "__main__":
+    main()
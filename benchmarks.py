@@ -0,0 +1,280 @@
+# =====================================================
+# benchmarks.py — Benchmarks de los caminos calientes y comparación de resultados
+# =====================================================
+from dataclasses import replace
+from itertools import product
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from entorno import (
+    ParamEntorno, FlujosRNG, IndiceOcupacion, CampoMonstruos, construir_entorno,
+    colocar_agentes, step_entorno, np, _validar_parametros,
+)
+from agente import Robot
+from simulacion import simular, snapshot_estado
+
+CAMPOS_CASO = ("N", "Nrobot", "Nmonstruos", "K_monstruo", "p_monstruo", "backend", "motor_monstruos")
+
+
+# ----- Preparación -----
+def _mundo(p: ParamEntorno, campo_monstruos: bool = False):
+    """Mundo poblado como simular(campo_monstruos=...): (cubo, índice, robots, flujo de dinámica)."""
+    flujos = FlujosRNG.desde_semilla(p.seed)
+    cubo = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion(campo=CampoMonstruos(p.N) if campo_monstruos else None)
+    colocar_agentes(cubo, p, indice, flujos.colocacion)
+    robots = [Robot(x, y, z) for (x, y, z) in sorted(indice.robots)]
+    return cubo, indice, robots, flujos.dinamica
+
+
+# Cada benchmark recibe (p, ticks, campo_monstruos) y devuelve (preparar, medir, unidades,
+# unidad): solo `medir` se cronometra.
+def _b_construir(p: ParamEntorno, ticks: int, campo_monstruos: bool):
+    def medir(_):
+        construir_entorno(p, FlujosRNG.desde_semilla(p.seed).generacion)
+    return (lambda: None), medir, p.N ** 3, "celdas"
+
+
+def _b_colocar(p: ParamEntorno, ticks: int, campo_monstruos: bool):
+    def preparar():
+        return construir_entorno(p, FlujosRNG.desde_semilla(p.seed).generacion)
+
+    def medir(cubo):
+        colocar_agentes(cubo, p, IndiceOcupacion(), FlujosRNG.desde_semilla(p.seed).colocacion)
+    return preparar, medir, p.Nrobot + p.Nmonstruos, "agentes"
+
+
+def _b_monstruos(p: ParamEntorno, ticks: int, campo_monstruos: bool):
+    def medir(mundo):
+        cubo, indice, _, rng = mundo
+        for t in range(1, ticks + 1):
+            step_entorno(cubo, p, t, indice, rng)
+    return (lambda: _mundo(p, campo_monstruos)), medir, ticks, "ticks"
+
+
+def _b_robots(p: ParamEntorno, ticks: int, campo_monstruos: bool):
+    def medir(mundo):
+        cubo, indice, robots, _ = mundo
+        for t in range(1, ticks + 1):
+            robots = [r for r in robots if r.tick(cubo, t, indice)]
+    return (lambda: _mundo(p, campo_monstruos)), medir, ticks * max(p.Nrobot, 1), "robot-ticks"
+
+
+def _b_snapshot(p: ParamEntorno, ticks: int, campo_monstruos: bool):
+    def medir(mundo):
+        cubo, indice, _, _ = mundo
+        for _ in range(ticks):
+            snapshot_estado(cubo, indice)
+    return (lambda: _mundo(p, campo_monstruos)), medir, ticks, "snapshots"
+
+
+def _b_simular(p: ParamEntorno, ticks: int, campo_monstruos: bool):
+    def medir(_):
+        # S_ESTASIS > ticks: la corrida no se corta por estasis y mide siempre los mismos ticks
+        simular(p, T_MAX=ticks, S_ESTASIS=ticks + 1, verbose=False, exportar=None,
+                campo_monstruos=campo_monstruos)
+    return (lambda: None), medir, ticks, "ticks"
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "construir_entorno": _b_construir,
+    "colocar_agentes": _b_colocar,
+    "mover_monstruos": _b_monstruos,
+    "robot_tick": _b_robots,
+    "snapshot_estado": _b_snapshot,
+    "simular": _b_simular,
+}
+
+
+# ----- Medición -----
+def medir(nombre: str, p: ParamEntorno, ticks: int = 50, repeticiones: int = 3,
+          campo_monstruos: bool = False) -> Dict[str, Any]:
+    """
+    Cronometra un benchmark `repeticiones` veces (preparación fuera del cronómetro) y
+    mide el pico de memoria en una pasada aparte con tracemalloc, para no inflar los tiempos.
+    `campo_monstruos` es la opción homónima de simular (por defecto, la misma: False).
+    """
+    preparar, correr, unidades, unidad = BENCHMARKS[nombre](p, ticks, campo_monstruos)
+    tiempos = []
+    for _ in range(repeticiones):
+        estado = preparar()
+        t0 = time.perf_counter()
+        correr(estado)
+        tiempos.append(time.perf_counter() - t0)
+
+    estado = preparar()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        correr(estado)
+        pico = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    mejor = min(tiempos)
+    return {
+        "benchmark": nombre,
+        **{c: getattr(p, c) for c in CAMPOS_CASO},
+        "campo_monstruos": campo_monstruos,
+        "ticks": ticks,
+        "repeticiones": repeticiones,
+        "segundos": mejor,
+        "mediana": statistics.median(tiempos),
+        "unidades": unidades,
+        "unidad": unidad,
+        "por_segundo": unidades / mejor if mejor > 0 else float("inf"),
+        "pico_bytes": pico,
+    }
+
+
+def matriz(base: ParamEntorno, **ejes: List[Any]) -> List[ParamEntorno]:
+    """Producto cartesiano de valores sobre un ParamEntorno base (como barrido.grilla)."""
+    nombres = list(ejes)
+    return [replace(base, **dict(zip(nombres, valores)))
+            for valores in product(*(ejes[n] for n in nombres))]
+
+
+def motivo_invalido(p: ParamEntorno, campo_monstruos: bool = False) -> str | None:
+    """Por qué el caso no se puede correr (p. ej. motor 'lote' con backend 'lista'), o None."""
+    try:
+        _validar_parametros(p)
+    except (AssertionError, ImportError) as e:
+        return str(e)
+    if campo_monstruos and p.backend == "perezoso":
+        return "campo_monstruos requiere backend 'lista' o 'array'."
+    return None
+
+
+def separar_validos(casos: List[ParamEntorno], campo_monstruos: bool = False
+                    ) -> Tuple[List[ParamEntorno], List[Tuple[ParamEntorno, str]]]:
+    """Divide los casos de una matriz en (corribles, [(omitido, motivo), ...])."""
+    validos, omitidos = [], []
+    for p in casos:
+        motivo = motivo_invalido(p, campo_monstruos)
+        if motivo is None:
+            validos.append(p)
+        else:
+            omitidos.append((p, motivo))
+    return validos, omitidos
+
+
+def correr(casos: List[ParamEntorno], benchmarks: List[str], ticks: int = 50,
+           repeticiones: int = 3, campo_monstruos: bool = False) -> Iterator[Dict[str, Any]]:
+    for p in casos:
+        for nombre in benchmarks:
+            yield medir(nombre, p, ticks, repeticiones, campo_monstruos)
+
+
+def entorno_de_ejecucion() -> Dict[str, Any]:
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__ if np is not None else None,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+# ----- Comparación -----
+def _clave(fila: Dict[str, Any]) -> Tuple:
+    return ((fila["benchmark"], fila["ticks"], fila.get("campo_monstruos", False))
+            + tuple(fila[c] for c in CAMPOS_CASO))
+
+
+def comparar(base: List[Dict[str, Any]], nuevo: List[Dict[str, Any]], umbral: float = 0.10,
+             umbral_memoria: float | None = None) -> List[Dict[str, Any]]:
+    """
+    Empareja filas por benchmark + caso y devuelve una fila por par con la razón de
+    throughput (nuevo / base) y de memoria pico. `regresion` es True si el throughput
+    cae más de `umbral` (fracción) o, con `umbral_memoria`, si la memoria crece más de eso.
+    """
+    previas = {_clave(f): f for f in base}
+    out = []
+    for f in nuevo:
+        b = previas.get(_clave(f))
+        if b is None:
+            continue
+        razon = f["por_segundo"] / b["por_segundo"] if b["por_segundo"] else float("inf")
+        razon_mem = f["pico_bytes"] / b["pico_bytes"] if b["pico_bytes"] else 1.0
+        regresion = razon < 1.0 - umbral
+        if umbral_memoria is not None and razon_mem > 1.0 + umbral_memoria:
+            regresion = True
+        out.append({"clave": _clave(f), "razon": razon, "razon_memoria": razon_mem, "regresion": regresion})
+    return out
+
+
+# ----- CLI -----
+def _parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(description="Benchmarks de la simulación.")
+    sub = ap.add_subparsers(dest="comando", required=True)
+
+    c = sub.add_parser("correr", help="corre la matriz de benchmarks")
+    c.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    c.add_argument("--N", type=int, nargs="+", default=[10, 20, 40])
+    c.add_argument("--Nrobot", type=int, nargs="+", default=[10])
+    c.add_argument("--Nmonstruos", type=int, nargs="+", default=[20])
+    c.add_argument("--K_monstruo", type=int, nargs="+", default=[1])
+    c.add_argument("--p_monstruo", type=float, nargs="+", default=[0.5])
+    c.add_argument("--backend", nargs="+", default=["lista"])
+    c.add_argument("--motor", nargs="+", default=["secuencial"], dest="motor_monstruos")
+    c.add_argument("--campo-monstruos", action="store_true",
+                   help="sensar monstruos con el campo de proximidad (como simular(campo_monstruos=True))")
+    c.add_argument("--Pfree", type=float, default=0.8)
+    c.add_argument("--seed", type=int, default=0)
+    c.add_argument("--ticks", type=int, default=50)
+    c.add_argument("--repeticiones", type=int, default=3)
+    c.add_argument("--salida", default=None, help="JSON de resultados (por defecto, solo pantalla)")
+
+    k = sub.add_parser("comparar", help="compara dos archivos de resultados")
+    k.add_argument("base")
+    k.add_argument("nuevo")
+    k.add_argument("--umbral", type=float, default=0.10, help="caída de throughput tolerada (fracción)")
+    k.add_argument("--umbral-memoria", type=float, default=None, help="aumento de memoria tolerado (fracción)")
+    return ap
+
+
+def main(argv=None) -> int:
+    a = _parser().parse_args(argv)
+    if a.comando == "comparar":
+        with open(a.base, encoding="utf-8") as f:
+            base = json.load(f)["resultados"]
+        with open(a.nuevo, encoding="utf-8") as f:
+            nuevo = json.load(f)["resultados"]
+        filas = comparar(base, nuevo, a.umbral, a.umbral_memoria)
+        for fila in filas:
+            marca = "REGRESIÓN" if fila["regresion"] else "ok"
+            print(f"{marca:9} x{fila['razon']:.2f} mem x{fila['razon_memoria']:.2f}  {fila['clave']}")
+        n = sum(f["regresion"] for f in filas)
+        print(f"{len(filas)} comparados, {n} regresiones (umbral {a.umbral:.0%}).")
+        return 1 if n else 0
+
+    base = ParamEntorno(N=a.N[0], Pfree=a.Pfree, Psoft=round(1.0 - a.Pfree, 12), seed=a.seed)
+    casos = matriz(base, N=a.N, Nrobot=a.Nrobot, Nmonstruos=a.Nmonstruos, K_monstruo=a.K_monstruo,
+                   p_monstruo=a.p_monstruo, backend=a.backend, motor_monstruos=a.motor_monstruos)
+    casos, omitidos = separar_validos(casos, a.campo_monstruos)
+    for p, motivo in omitidos:
+        print(f"omitido: N={p.N} backend={p.backend} motor={p.motor_monstruos}: {motivo}")
+    resultados = []
+    for fila in correr(casos, a.benchmarks, a.ticks, a.repeticiones, a.campo_monstruos):
+        resultados.append(fila)
+        print(f"{fila['benchmark']:18} N={fila['N']:<4} R={fila['Nrobot']:<4} M={fila['Nmonstruos']:<5} "
+              f"{fila['backend']:8} {fila['motor_monstruos']:10} {fila['por_segundo']:>12.1f} {fila['unidad']}/s "
+              f"pico {fila['pico_bytes'] / 1e6:.2f} MB")
+    if a.salida:
+        with open(a.salida, "w", encoding="utf-8") as f:
+            json.dump({"entorno": entorno_de_ejecucion(), "resultados": resultados}, f, indent=1)
+        print(f"Resultados en {a.salida}")
+    if omitidos:
+        print(f"{len(omitidos)} casos omitidos por combinaciones no soportadas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
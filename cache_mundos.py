@@ -0,0 +1,168 @@
+# =====================================================
+# cache_mundos.py — Caché de mundos generados (terreno + colocación)
+# =====================================================
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple, List
+import hashlib
+import json
+import os
+
+from entorno import (
+    ParamEntorno, FlujosRNG, IndiceOcupacion, CampoMonstruos, construir_entorno,
+    colocar_agentes, es_cubo_array, np,
+)
+
+# Campos de ParamEntorno que determinan el terreno y la colocación de agentes
+CAMPOS_MUNDO = ("N", "Pfree", "Psoft", "seed", "backend", "Nrobot", "Nmonstruos")
+# Entra en el nombre de los archivos en disco: subirlo si cambia cómo se derivan los
+# mundos de la semilla (ver FlujosRNG), para no reusar mundos viejos
+FORMATO_DISCO = 2
+
+
+def clave_mundo(p: ParamEntorno) -> tuple:
+    return tuple(getattr(p, c) for c in CAMPOS_MUNDO)
+
+
+def es_cacheable(p: ParamEntorno) -> bool:
+    """Sin semilla el mundo no es reproducible; el terreno perezoso ya arranca sin costo."""
+    return p.seed is not None and p.backend != "perezoso"
+
+
+def _copiar(cubo):
+    if isinstance(cubo, Path):
+        # entrada en disco: cada entrega es un mapeo copy-on-write nuevo (sin copiar)
+        return np.load(cubo, mmap_mode="c")
+    if es_cubo_array(cubo):
+        return cubo.copy()
+    return [[fila[:] for fila in plano] for plano in cubo]
+
+
+class CacheMundos:
+    """
+    Guarda mundos ya construidos (cubo con agentes colocados + posiciones de robots y
+    monstruos) por clave_mundo(params). El terreno sale del flujo de generación y la
+    colocación del de colocación (ver FlujosRNG), así que un acierto devuelve
+    exactamente el mundo que se habría construido y la corrida no cambia.
+
+    - En memoria: LRU con hasta `capacidad` mundos; cada acierto entrega una copia.
+    - En disco (`carpeta`, requiere numpy): el cubo va a un .npy. Con backend "array"
+      cada acierto lo reabre por memory-mapping copy-on-write, así varios procesos
+      comparten las mismas páginas y cada escritura queda privada de quien la hace
+      (en memoria solo se recuerda la ruta). Con backend "lista" el .npy se convierte
+      a listas al cargar.
+    """
+
+    def __init__(self, capacidad: int = 16, carpeta: str | None = None):
+        assert capacidad >= 0, "capacidad debe ser >= 0."
+        if carpeta is not None and np is None:
+            raise ImportError("La caché en disco requiere numpy instalado.")
+        self.capacidad = capacidad
+        self.carpeta = Path(carpeta) if carpeta is not None else None
+        if self.carpeta is not None:
+            self.carpeta.mkdir(parents=True, exist_ok=True)
+        self._mundos: OrderedDict = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self) -> int:
+        return len(self._mundos)
+
+    # ----- API -----
+    def mundo(self, p: ParamEntorno, flujos: FlujosRNG | None = None,
+              campo: CampoMonstruos | None = None) -> Tuple[object, IndiceOcupacion]:
+        """
+        Devuelve (cubo, indice) listos para simular, como construir_entorno + colocar_agentes
+        con los flujos de la corrida. Con `campo`, el índice lo lleva ya cargado.
+        """
+        if flujos is None:
+            flujos = FlujosRNG.desde_semilla(p.seed)
+        if not es_cacheable(p):
+            return self._construir(p, flujos, campo)
+
+        clave = clave_mundo(p)
+        guardado = self._mundos.get(clave)
+        if guardado is not None:
+            self._mundos.move_to_end(clave)
+            self.aciertos += 1
+            cubo, robots, monstruos = guardado
+            return _copiar(cubo), IndiceOcupacion(set(robots), set(monstruos), campo=campo)
+
+        desde_disco = self._leer(clave)
+        if desde_disco is not None:
+            self.aciertos += 1
+            cubo, robots, monstruos = desde_disco
+            self._recordar(clave, cubo, robots, monstruos)
+            return _copiar(cubo), IndiceOcupacion(set(robots), set(monstruos), campo=campo)
+
+        self.fallos += 1
+        cubo, indice = self._construir(p, flujos, campo)
+        robots, monstruos = sorted(indice.robots), sorted(indice.monstruos)
+        ruta = self._escribir(clave, cubo, robots, monstruos)
+        if ruta is not None and es_cubo_array(cubo):
+            self._recordar(clave, ruta, robots, monstruos)
+        else:
+            self._recordar(clave, _copiar(cubo), robots, monstruos)
+        return cubo, indice
+
+    def limpiar(self):
+        self._mundos.clear()
+
+    # ----- Interno -----
+    @staticmethod
+    def _construir(p: ParamEntorno, flujos: FlujosRNG, campo: CampoMonstruos | None = None):
+        cubo = construir_entorno(p, flujos.generacion)
+        indice = IndiceOcupacion(campo=campo)
+        colocar_agentes(cubo, p, indice, flujos.colocacion)
+        return cubo, indice
+
+    def _recordar(self, clave, cubo, robots, monstruos):
+        if self.capacidad == 0:
+            return
+        self._mundos[clave] = (cubo, tuple(robots), tuple(monstruos))
+        self._mundos.move_to_end(clave)
+        while len(self._mundos) > self.capacidad:
+            self._mundos.popitem(last=False)
+
+    def _rutas(self, clave) -> Tuple[Path, Path]:
+        nombre = "mundo-" + hashlib.sha1(repr((FORMATO_DISCO, clave)).encode()).hexdigest()[:20]
+        return self.carpeta / f"{nombre}.npy", self.carpeta / f"{nombre}.json"
+
+    def _leer(self, clave):
+        if self.carpeta is None:
+            return None
+        ruta_cubo, ruta_meta = self._rutas(clave)
+        if not ruta_meta.exists():
+            return None
+        meta = json.loads(ruta_meta.read_text(encoding="utf-8"))
+        if meta["clave"] != list(clave):
+            return None
+        cubo = ruta_cubo
+        if meta["backend"] == "lista":
+            cubo = np.load(ruta_cubo, mmap_mode="r").tolist()
+        robots: List[tuple] = [tuple(c) for c in meta["robots"]]
+        monstruos: List[tuple] = [tuple(c) for c in meta["monstruos"]]
+        return cubo, robots, monstruos
+
+    def _escribir(self, clave, cubo, robots, monstruos):
+        """Escritura atómica (archivo temporal + rename): el .json se escribe al final."""
+        if self.carpeta is None:
+            return None
+        ruta_cubo, ruta_meta = self._rutas(clave)
+        if ruta_meta.exists():
+            return ruta_cubo
+        sufijo = f".{os.getpid()}.tmp"
+        tmp = ruta_cubo.with_name(ruta_cubo.name + sufijo)
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(cubo, dtype=np.uint8))
+        os.replace(tmp, ruta_cubo)
+        meta = {
+            "clave": list(clave),
+            "backend": clave[CAMPOS_MUNDO.index("backend")],
+            "robots": [list(c) for c in robots],
+            "monstruos": [list(c) for c in monstruos],
+        }
+        tmp = ruta_meta.with_name(ruta_meta.name + sufijo)
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, ruta_meta)
+        return ruta_cubo
@@ -1,9 +1,18 @@
 # =====================================================
 # entorno.py — Mundo N×N×N y dinámica de monstruos
 # =====================================================
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
+import hashlib
 import random
 
+try:
+    import numpy as np
+except ImportError:  # numpy solo es necesario para el backend "array"
+    np = None
+
+from terreno import CuboPerezoso
+
 # ----- Constantes de celdas -----
 ZV = 0   # Zona Vacía (bloqueo total)
 ZL = 1   # Zona Libre
@@ -17,6 +26,18 @@ SIMBOLOS = {
     MONSTRUO: "M",
 }
 
+# ----- Backends de la grilla -----
+# "lista": listas anidadas de int (comportamiento original).
+# "array": ndarray uint8 contiguo (requiere numpy), relleno vectorizado.
+# "perezoso": terreno procedural generado al primer acceso, por chunks (terreno.CuboPerezoso).
+BACKENDS = ("lista", "array", "perezoso")
+
+# ----- Motores de dinámica de monstruos -----
+# "secuencial": bucle original monstruo por monstruo (cualquier backend).
+# "lote":       vectorizado; mismas reglas de fusión que el orden barajado secuencial.
+# "paralelo":   vectorizado y síncrono; todos se mueven a la vez (ver mover_monstruos_lote).
+MOTORES_MONSTRUOS = ("secuencial", "lote", "paralelo")
+
 # ----- Parámetros del entorno -----
 @dataclass
 class ParamEntorno:
@@ -31,6 +52,41 @@ class ParamEntorno:
     K_monstruo: int = 0      # cada cuántas iteraciones se evalúa movimiento (0=desactivado)
     p_monstruo: float = 0.0  # prob. de moverse cuando “toca” (0..1)
 
+    # Representación del cubo
+    backend: str = "lista"   # "lista" | "array" | "perezoso"
+    motor_monstruos: str = "secuencial"  # "secuencial" | "lote" | "paralelo"
+
+
+# ----- Flujos aleatorios por corrida -----
+ETAPAS_RNG = ("generacion", "colocacion", "dinamica")
+
+
+def semilla_flujo(seed: int, etapa: str) -> int:
+    """Semilla de 128 bits del flujo `etapa` de la corrida `seed` (BLAKE2b de ambos)."""
+    digest = hashlib.blake2b(f"{seed}/{etapa}".encode(), digest_size=16).digest()
+    return int.from_bytes(digest, "little")
+
+
+@dataclass
+class FlujosRNG:
+    """
+    Generadores propios de una corrida, uno por etapa, para que varias simulaciones
+    puedan convivir en el mismo proceso (hilos, asyncio) sin tocar el `random` global.
+    Con semilla, cada flujo se siembra con un hash de (seed, etapa): los flujos de una
+    corrida son independientes entre sí y de los de cualquier otra semilla (con
+    offsets seed + k, la dinámica de la semilla s era la generación de la s + 2).
+    No depende de numpy, así que la corrida es la misma con o sin él.
+    """
+    generacion: random.Random
+    colocacion: random.Random
+    dinamica: random.Random
+
+    @classmethod
+    def desde_semilla(cls, seed: int | None) -> "FlujosRNG":
+        if seed is None:
+            return cls(random.Random(), random.Random(), random.Random())
+        return cls(*(random.Random(semilla_flujo(seed, etapa)) for etapa in ETAPAS_RNG))
+
 
 # ----- Validación -----
 def _validar_parametros(p: ParamEntorno):
@@ -41,26 +97,57 @@ def _validar_parametros(p: ParamEntorno):
     assert p.Nrobot >= 0 and p.Nmonstruos >= 0, "Cantidades de agentes no negativas."
     assert 0.0 <= p.p_monstruo <= 1.0, "p_monstruo en [0,1]."
     assert isinstance(p.K_monstruo, int) and p.K_monstruo >= 0, "K_monstruo entero >= 0."
+    assert p.backend in BACKENDS, f"backend debe ser uno de {BACKENDS}."
+    if p.backend == "array" and np is None:
+        raise ImportError("El backend 'array' requiere numpy instalado.")
+    assert p.motor_monstruos in MOTORES_MONSTRUOS, f"motor_monstruos debe ser uno de {MOTORES_MONSTRUOS}."
+    assert p.motor_monstruos == "secuencial" or p.backend == "array", \
+        "Los motores 'lote' y 'paralelo' requieren backend 'array'."
 
 
 # ----- Construcción y utilidades -----
-def crear_cubo_vacio(N: int):
+def es_cubo_array(cubo) -> bool:
+    """True si el cubo usa el backend "array" (ndarray de numpy)."""
+    return np is not None and isinstance(cubo, np.ndarray)
+
+def es_cubo_perezoso(cubo) -> bool:
+    """True si el cubo usa el backend "perezoso" (terreno.CuboPerezoso)."""
+    return isinstance(cubo, CuboPerezoso)
+
+def crear_cubo_vacio(N: int, backend: str = "lista"):
+    if backend == "perezoso":
+        return CuboPerezoso(N)
+    if backend == "array":
+        return np.full((N, N, N), ZL, dtype=np.uint8)
     return [[[ZL for _z in range(N)] for _y in range(N)] for _x in range(N)]
 
-def rellenar_cubo(cubo, p: ParamEntorno):
-    """Rellena aleatoriamente con ZL / ZV según Pfree/Psoft."""
-    if p.seed is not None:
-        random.seed(p.seed)
+def rellenar_cubo(cubo, p: ParamEntorno, rng: random.Random | None = None):
+    """
+    Rellena aleatoriamente con ZL / ZV según Pfree/Psoft.
+    Usa `rng` (flujo de generación); sin él, el de FlujosRNG.desde_semilla(p.seed).
+    """
+    if rng is None:
+        rng = FlujosRNG.desde_semilla(p.seed).generacion
+    if es_cubo_perezoso(cubo):
+        # No se sortea nada celda por celda: cada celda es función pura de (semilla, x, y, z)
+        cubo.sembrar(rng.getrandbits(64), p.Pfree)
+        return
+    if es_cubo_array(cubo):
+        # Un único sorteo vectorizado; con la misma semilla el layout es reproducible
+        gen = np.random.default_rng(rng.getrandbits(64))
+        libres = gen.random(cubo.shape) < p.Pfree
+        cubo[...] = np.where(libres, ZL, ZV)
+        return
     N = len(cubo)
     for x in range(N):
         for y in range(N):
             for z in range(N):
-                cubo[x][y][z] = ZL if random.random() < p.Pfree else ZV
+                cubo[x][y][z] = ZL if rng.random() < p.Pfree else ZV
 
-def construir_entorno(p: ParamEntorno):
+def construir_entorno(p: ParamEntorno, rng: random.Random | None = None):
     _validar_parametros(p)
-    cubo = crear_cubo_vacio(p.N)
-    rellenar_cubo(cubo, p)
+    cubo = crear_cubo_vacio(p.N, p.backend)
+    rellenar_cubo(cubo, p, rng)
     return cubo
 
 def es_coord_valida(N: int, x: int, y: int, z: int) -> bool:
@@ -73,7 +160,16 @@ def vecinos_6(x: int, y: int, z: int):
         (x, y, z+1), (x, y, z-1),
     ]
 
+# Desplazamientos en el mismo orden que vecinos_6
+_DESP_6 = ((1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1))
+
 def obtener_posiciones(cubo, valor: int):
+    if es_cubo_perezoso(cubo):
+        # los agentes solo están en celdas escritas: basta con los chunks materializados
+        return cubo.posiciones(valor, solo_tocadas=valor in (ROBOT, MONSTRUO))
+    if es_cubo_array(cubo):
+        # argwhere recorre en el mismo orden (x, y, z) que los bucles anidados
+        return [tuple(c) for c in np.argwhere(cubo == valor).tolist()]
     N = len(cubo)
     out = []
     for x in range(N):
@@ -86,13 +182,381 @@ def obtener_posiciones(cubo, valor: int):
 def celdas_libres(cubo):
     return obtener_posiciones(cubo, ZL)
 
-def colocar_agentes(cubo, p: ParamEntorno):
-    """Coloca Nrobot y Nmonstruos en celdas ZL aleatorias (sin superposición)."""
-    if p.seed is not None:
-        random.seed(p.seed + 1)  # pequeño offset para distribución distinta
+
+# ----- Huella Zobrist -----
+_MASK64 = (1 << 64) - 1
+
+def clave_zobrist(pos, tipo: int) -> int:
+    """
+    Clave Zobrist de 64 bits para (celda, tipo de agente), calculada con splitmix64
+    sobre las coordenadas empaquetadas: no requiere tabla de N³ claves en memoria.
+    """
+    x, y, z = pos
+    h = ((((x << 21) | y) << 21 | z) << 3 | tipo) + 0x9E3779B97F4A7C15
+    h &= _MASK64
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return h ^ (h >> 31)
+
+def xor_zobrist(x, y, z, tipo: int) -> int:
+    """
+    XOR de clave_zobrist sobre arreglos numpy de coordenadas (vectorizado, requiere
+    numpy). Equivale a reducir clave_zobrist((x[i], y[i], z[i]), tipo) para todo i.
+    """
+    if len(x) == 0:
+        return 0
+    u = np.uint64
+    x, y, z = (np.asarray(c).astype(u) for c in (x, y, z))
+    h = ((((x << u(21)) | y) << u(21) | z) << u(3) | u(tipo)) + u(0x9E3779B97F4A7C15)
+    h = (h ^ (h >> u(30))) * u(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> u(27))) * u(0x94D049BB133111EB)
+    return int(np.bitwise_xor.reduce(h ^ (h >> u(31))))
+
+
+# ----- Campo de proximidad de monstruos -----
+class CampoMonstruos:
+    """
+    Para cada celda, cuántos de sus 6 vecinos tienen monstruo (`cuenta`), más la
+    ocupación por monstruos (`hay`); ambos bytearray planos indexados por
+    (x*N + y)*N + z. Cada alta/baja de monstruo actualiza solo su celda y sus 6
+    vecinas, así que no hace falta volver a recorrer el cubo para sensar.
+    Las caras se numeran como vecinos_6 (= códigos de orientación de agente.py).
+    """
+
+    def __init__(self, N: int, monstruos=()):
+        self.N = N
+        self.cuenta = bytearray(N * N * N)
+        self.hay = bytearray(N * N * N)
+        self.pasos = tuple((dx * N + dy) * N + dz for dx, dy, dz in _DESP_6)
+        for pos in monstruos:
+            self.marcar(pos, 1)
+
+    def marcar(self, pos, delta: int):
+        """Alta (delta=1) o baja (delta=-1) de un monstruo en `pos`."""
+        x, y, z = pos
+        N, c = self.N, self.cuenta
+        NN = N * N
+        i = x * NN + y * N + z
+        self.hay[i] += delta
+        if x + 1 < N: c[i + NN] += delta
+        if x > 0:     c[i - NN] += delta
+        if y + 1 < N: c[i + N] += delta
+        if y > 0:     c[i - N] += delta
+        if z + 1 < N: c[i + 1] += delta
+        if z > 0:     c[i - 1] += delta
+
+    def _vecino(self, x: int, y: int, z: int, cara: int) -> int:
+        """Índice plano de la celda vecina por `cara`, o -1 si cae fuera del cubo."""
+        dx, dy, dz = _DESP_6[cara]
+        N = self.N
+        if 0 <= x + dx < N and 0 <= y + dy < N and 0 <= z + dz < N:
+            return (x * N + y) * N + z + self.pasos[cara]
+        return -1
+
+    def adyacentes(self, x: int, y: int, z: int) -> int:
+        return self.cuenta[(x * self.N + y) * self.N + z]
+
+    def monstroscopio(self, x: int, y: int, z: int, atras: int) -> bool:
+        """Monstruo en alguna de las 5 caras que no son `atras` (cuenta − cara trasera)."""
+        n = self.cuenta[(x * self.N + y) * self.N + z]
+        if n == 0:
+            return False
+        j = self._vecino(x, y, z, atras)
+        return n - (self.hay[j] if j >= 0 else 0) > 0
+
+    def direccion_cercana(self, x: int, y: int, z: int) -> int | None:
+        """
+        Cara hacia el monstruo más cercano a distancia ≤ 2: primero un vecino con
+        monstruo; si no hay, la cara cuya celda vecina tiene más monstruos adyacentes.
+        None si no hay monstruos a esa distancia (o si el monstruo está en la celda).
+        """
+        propio = self.hay[(x * self.N + y) * self.N + z]   # también cuenta en cada vecina
+        mejor, cuenta_mejor = None, 0
+        for cara in range(6):
+            j = self._vecino(x, y, z, cara)
+            if j < 0:
+                continue
+            if self.hay[j]:
+                return cara
+            if self.cuenta[j] - propio > cuenta_mejor:
+                mejor, cuenta_mejor = cara, self.cuenta[j] - propio
+        return mejor
+
+    def como_array(self):
+        """Vista numpy (N, N, N) de `cuenta`, sin copiar (requiere numpy)."""
+        return np.frombuffer(self.cuenta, dtype=np.uint8).reshape(self.N, self.N, self.N)
+
+
+# ----- Componentes conexas del espacio transitable -----
+def _etiquetar_np(libre) -> tuple:
+    """Union-find vectorizado: enganchar raíces por aristas + compresión de caminos."""
+    L = np.arange(libre.size, dtype=np.int64)
+    idx = L.reshape(libre.shape)
+    a, b = [], []
+    for eje in range(3):
+        sa = [slice(None)] * 3
+        sb = [slice(None)] * 3
+        sa[eje], sb[eje] = slice(0, -1), slice(1, None)
+        m = libre[tuple(sa)] & libre[tuple(sb)]
+        a.append(idx[tuple(sa)][m])
+        b.append(idx[tuple(sb)][m])
+    a, b = np.concatenate(a), np.concatenate(b)
+    while True:
+        la, lb = L[a], L[b]
+        distinta = la != lb
+        if not distinta.any():
+            break
+        # las aristas ya unidas no vuelven a separarse
+        a, b, la, lb = a[distinta], b[distinta], la[distinta], lb[distinta]
+        np.minimum.at(L, np.maximum(la, lb), np.minimum(la, lb))
+        while True:
+            L2 = L[L]
+            if np.array_equal(L2, L):
+                break
+            L = L2
+    plano = libre.reshape(-1)
+    etiquetas = np.full(libre.size, -1, dtype=np.int32)
+    raices, etiquetas[plano] = np.unique(L[plano], return_inverse=True)
+    return array("i", etiquetas.tobytes()), len(raices)
+
+
+def _etiquetar_py(libre, N: int) -> tuple:
+    """Recorrido en profundidad sobre la máscara plana de celdas transitables."""
+    NN = N * N
+    etiquetas = array("i", [-1]) * (N * NN)
+    n = 0
+    for s, ok in enumerate(libre):
+        if not ok or etiquetas[s] >= 0:
+            continue
+        etiquetas[s] = n
+        pila = [s]
+        while pila:
+            i = pila.pop()
+            x, r = divmod(i, NN)
+            y, z = divmod(r, N)
+            for j, dentro in ((i - NN, x > 0), (i + NN, x < N - 1), (i - N, y > 0),
+                              (i + N, y < N - 1), (i - 1, z > 0), (i + 1, z < N - 1)):
+                if dentro and libre[j] and etiquetas[j] < 0:
+                    etiquetas[j] = n
+                    pila.append(j)
+        n += 1
+    return etiquetas, n
+
+
+def etiquetar_componentes(cubo) -> tuple:
+    """
+    Componentes conexas (6-vecindad) de las celdas no ZV. Devuelve (etiquetas, n):
+    etiquetas es un array('i') plano indexado por (x*N + y)*N + z, con -1 en las ZV.
+    """
+    if es_cubo_perezoso(cubo):
+        raise ValueError("Las componentes requieren el cubo completo (backend 'lista' o 'array').")
+    N = len(cubo)
+    if es_cubo_array(cubo):
+        return _etiquetar_np(cubo != ZV)
+    libre = bytes(v != ZV for plano in cubo for fila in plano for v in fila)
+    return _etiquetar_py(libre, N)
+
+
+class ComponentesLibres:
+    """
+    Componentes conexas del espacio transitable y cuántos robots y monstruos hay en cada
+    una. Robots y monstruos solo ocupan celdas no ZV y ninguna ZV vuelve a ser libre, así
+    que las componentes solo pueden partirse: si ninguna tiene a la vez robot y monstruo,
+    ya no puede haber encuentros (ni kills) en lo que queda de la corrida.
+    `activas` (componentes con ambos) se actualiza en O(1) con cada alta/baja del índice.
+    """
+
+    def __init__(self, cubo):
+        self.N = len(cubo)
+        self.etiquetas, self.n = etiquetar_componentes(cubo)
+        self.robots = [0] * self.n
+        self.monstruos = [0] * self.n
+        self.activas = 0
+
+    def componente(self, pos) -> int:
+        x, y, z = pos
+        return self.etiquetas[(x * self.N + y) * self.N + z]
+
+    def marcar(self, pos, tipo: int, delta: int):
+        c = self.componente(pos)
+        if tipo == ROBOT:
+            cuenta, otra = self.robots, self.monstruos
+        else:
+            cuenta, otra = self.monstruos, self.robots
+        antes = cuenta[c]
+        cuenta[c] = antes + delta
+        if otra[c] and (antes == 0) != (cuenta[c] == 0):
+            self.activas += 1 if antes == 0 else -1
+
+
+# ----- Índice de ocupación -----
+@dataclass
+class IndiceOcupacion:
+    """
+    Conjuntos de coordenadas de robots y monstruos, mantenidos en sincronía con
+    cada escritura sobre el cubo. Permite contar y ubicar agentes en O(agentes)
+    sin recorrer las N³ celdas.
+    `huella` es el XOR de las claves Zobrist de todos los agentes presentes; se
+    actualiza en O(1) con cada alta, baja, movimiento o fusión.
+    Con `campo` (CampoMonstruos), cada alta/baja de monstruo actualiza también el
+    campo de proximidad que usan los sensores de los robots; con `componentes`
+    (ComponentesLibres), cada alta/baja de agente actualiza los conteos por componente.
+    Con `cambios` (un set), cada alta/baja agrega ahí la celda tocada (ver
+    repeticion.GrabadorRepeticion, que lo vacía en cada tick); `tocadas` hace lo mismo
+    para puntos_control.EscritorPuntosControl, que lo vacía en cada punto de control.
+    """
+    robots: set = field(default_factory=set)
+    monstruos: set = field(default_factory=set)
+    huella: int = 0
+    campo: CampoMonstruos | None = field(default=None, compare=False, repr=False)
+    componentes: ComponentesLibres | None = field(default=None, compare=False, repr=False)
+    cambios: set | None = field(default=None, compare=False, repr=False)
+    tocadas: set | None = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        self.huella = 0
+        for pos in self.robots:
+            self.huella ^= clave_zobrist(pos, ROBOT)
+        for pos in self.monstruos:
+            self.huella ^= clave_zobrist(pos, MONSTRUO)
+        if self.campo is not None:
+            for pos in self.monstruos:
+                self.campo.marcar(pos, 1)
+        if self.componentes is not None:
+            self.usar_componentes(self.componentes)
+
+    @classmethod
+    def desde_cubo(cls, cubo, con_campo: bool = False) -> "IndiceOcupacion":
+        """Construye el índice con un único recorrido del cubo."""
+        return cls(
+            robots=set(obtener_posiciones(cubo, ROBOT)),
+            monstruos=set(obtener_posiciones(cubo, MONSTRUO)),
+            campo=CampoMonstruos(len(cubo)) if con_campo else None,
+        )
+
+    def usar_componentes(self, componentes: ComponentesLibres):
+        """Asocia (y carga con los agentes actuales) un ComponentesLibres recién construido."""
+        self.componentes = componentes
+        for pos in self.robots:
+            componentes.marcar(pos, ROBOT, 1)
+        for pos in self.monstruos:
+            componentes.marcar(pos, MONSTRUO, 1)
+
+    def _alta(self, conjunto: set, pos, tipo: int):
+        if pos not in conjunto:
+            conjunto.add(pos)
+            self.huella ^= clave_zobrist(pos, tipo)
+            if tipo == MONSTRUO and self.campo is not None:
+                self.campo.marcar(pos, 1)
+            if self.componentes is not None:
+                self.componentes.marcar(pos, tipo, 1)
+            if self.cambios is not None:
+                self.cambios.add(pos)
+            if self.tocadas is not None:
+                self.tocadas.add(pos)
+
+    def _baja(self, conjunto: set, pos, tipo: int):
+        if pos in conjunto:
+            conjunto.remove(pos)
+            self.huella ^= clave_zobrist(pos, tipo)
+            if tipo == MONSTRUO and self.campo is not None:
+                self.campo.marcar(pos, -1)
+            if self.componentes is not None:
+                self.componentes.marcar(pos, tipo, -1)
+            if self.cambios is not None:
+                self.cambios.add(pos)
+            if self.tocadas is not None:
+                self.tocadas.add(pos)
+
+    def _lote(self, conjunto: set, tipo: int, x, y, z, delta: int):
+        """
+        Alta (delta=1) o baja (delta=-1) de muchas celdas a la vez a partir de arreglos
+        numpy de coordenadas: operaciones de conjunto en bloque y un único XOR
+        vectorizado para la huella. Igual que _alta/_baja, ignora las celdas que ya
+        estaban (alta) o que no estaban (baja).
+        """
+        pos = set(zip(x.tolist(), y.tolist(), z.tolist()))
+        if delta > 0:
+            pos -= conjunto
+            conjunto.update(pos)
+        else:
+            pos &= conjunto
+            conjunto.difference_update(pos)
+        if not pos:
+            return
+        if len(pos) == len(x):
+            self.huella ^= xor_zobrist(x, y, z, tipo)
+        else:
+            cx, cy, cz = np.array(list(pos), dtype=np.int64).T
+            self.huella ^= xor_zobrist(cx, cy, cz, tipo)
+        if tipo == MONSTRUO and self.campo is not None:
+            for p in pos:
+                self.campo.marcar(p, delta)
+        if self.componentes is not None:
+            for p in pos:
+                self.componentes.marcar(p, tipo, delta)
+        if self.cambios is not None:
+            self.cambios.update(pos)
+        if self.tocadas is not None:
+            self.tocadas.update(pos)
+
+    def altas(self, tipo: int, x, y, z):
+        """Alta en bloque de agentes `tipo` (ROBOT o MONSTRUO) en las celdas (x, y, z)."""
+        self._lote(self.robots if tipo == ROBOT else self.monstruos, tipo, x, y, z, 1)
+
+    def bajas(self, tipo: int, x, y, z):
+        """Baja en bloque de agentes `tipo` (ROBOT o MONSTRUO) de las celdas (x, y, z)."""
+        self._lote(self.robots if tipo == ROBOT else self.monstruos, tipo, x, y, z, -1)
+
+    # Robots
+    def agregar_robot(self, pos):
+        self._alta(self.robots, pos, ROBOT)
+
+    def quitar_robot(self, pos):
+        self._baja(self.robots, pos, ROBOT)
+
+    def mover_robot(self, origen, destino):
+        self._baja(self.robots, origen, ROBOT)
+        self._alta(self.robots, destino, ROBOT)
+
+    # Monstruos
+    def agregar_monstruo(self, pos):
+        self._alta(self.monstruos, pos, MONSTRUO)
+
+    def quitar_monstruo(self, pos):
+        self._baja(self.monstruos, pos, MONSTRUO)
+
+    def mover_monstruo(self, origen, destino):
+        """Si el destino ya tenía monstruo, el conjunto refleja la fusión (queda 1)."""
+        self._baja(self.monstruos, origen, MONSTRUO)
+        self._alta(self.monstruos, destino, MONSTRUO)
+
+    def n_monstruos(self) -> int:
+        return len(self.monstruos)
+
+    def n_robots(self) -> int:
+        return len(self.robots)
+
+
+def colocar_agentes(cubo, p: ParamEntorno, indice: IndiceOcupacion | None = None,
+                    rng: random.Random | None = None):
+    """
+    Coloca Nrobot y Nmonstruos en celdas ZL aleatorias (sin superposición).
+    Si se pasa un índice de ocupación, registra ahí cada agente colocado.
+    Usa `rng` (flujo de colocación); sin él, el de FlujosRNG.desde_semilla(p.seed).
+    """
+    if rng is None:
+        rng = FlujosRNG.desde_semilla(p.seed).colocacion
+
+    if es_cubo_array(cubo):
+        _colocar_agentes_array(cubo, p, indice, rng)
+        return
+    if es_cubo_perezoso(cubo):
+        _colocar_agentes_muestreo(cubo, p, indice, rng)
+        return
 
     libres = celdas_libres(cubo)
-    random.shuffle(libres)
+    rng.shuffle(libres)
 
     necesarios = p.Nrobot + p.Nmonstruos
     if len(libres) < necesarios:
@@ -102,48 +566,148 @@ def colocar_agentes(cubo, p: ParamEntorno):
     for _ in range(p.Nrobot):
         x, y, z = libres.pop()
         cubo[x][y][z] = ROBOT
+        if indice is not None:
+            indice.agregar_robot((x, y, z))
 
     # Colocar monstruos
     for _ in range(p.Nmonstruos):
         x, y, z = libres.pop()
         cubo[x][y][z] = MONSTRUO
+        if indice is not None:
+            indice.agregar_monstruo((x, y, z))
+
+def _colocar_agentes_array(cubo, p: ParamEntorno, indice: IndiceOcupacion | None,
+                           rng: random.Random):
+    """Versión vectorizada: elige las celdas sin barajar la lista completa de libres."""
+    gen = np.random.default_rng(rng.getrandbits(64))
+    plano = cubo.reshape(-1)
+    libres = np.flatnonzero(plano == ZL)
+
+    necesarios = p.Nrobot + p.Nmonstruos
+    if len(libres) < necesarios:
+        raise ValueError("No hay suficientes Zonas Libres para colocar todos los agentes.")
+
+    elegidas = libres[gen.choice(len(libres), size=necesarios, replace=False)]
+    plano[elegidas[:p.Nrobot]] = ROBOT
+    plano[elegidas[p.Nrobot:]] = MONSTRUO
+
+    if indice is not None:
+        coords = np.column_stack(np.unravel_index(elegidas, cubo.shape)).tolist()
+        for c in coords[:p.Nrobot]:
+            indice.agregar_robot(tuple(c))
+        for c in coords[p.Nrobot:]:
+            indice.agregar_monstruo(tuple(c))
+
+def _colocar_agentes_muestreo(cubo, p: ParamEntorno, indice: IndiceOcupacion | None,
+                              rng: random.Random):
+    """
+    Muestreo por rechazo: sortea celdas (x, y, z) hasta juntar las necesarias que sean
+    ZL y distintas. No arma la lista de libres, así que solo se generan los chunks de
+    las celdas sorteadas. El tope de intentos escala con 1/Pfree (sin pasar de N³);
+    si se agota, se recorren los chunks desde uno al azar hasta juntar las que faltan.
+    """
+    N = p.N
+    necesarios = p.Nrobot + p.Nmonstruos
+    if necesarios == 0:
+        return
+    if p.Pfree <= 0:
+        raise ValueError("Pfree=0: el cubo no tiene Zonas Libres donde colocar agentes.")
+    limite = min(N ** 3, int((1000 + 100 * necesarios) / p.Pfree))
+    elegidas: list = []
+    vistas = set()
+    intentos = 0
+    while len(elegidas) < necesarios and intentos < limite:
+        intentos += 1
+        c = (rng.randrange(N), rng.randrange(N), rng.randrange(N))
+        if c in vistas or cubo.valor(*c) != ZL:
+            continue
+        vistas.add(c)
+        elegidas.append(c)
+
+    if len(elegidas) < necesarios:
+        # Mundo muy disperso: recorrer chunks (sin materializarlos) hasta juntar las que
+        # faltan, antes de dar por hecho que no hay libres.
+        faltan = necesarios - len(elegidas)
+        resto = []
+        for c in cubo.recorrer(ZL, desde=rng.getrandbits(32)):
+            if c not in vistas:
+                resto.append(c)
+                if len(resto) == faltan:
+                    break
+        if len(resto) < faltan:
+            raise ValueError("No hay suficientes Zonas Libres para colocar todos los agentes.")
+        rng.shuffle(resto)
+        elegidas.extend(resto)
+
+    for k, (x, y, z) in enumerate(elegidas):
+        robot = k < p.Nrobot
+        cubo.poner(x, y, z, ROBOT if robot else MONSTRUO)
+        if indice is not None:
+            if robot:
+                indice.agregar_robot((x, y, z))
+            else:
+                indice.agregar_monstruo((x, y, z))
 
 
 # ----- Impresión -----
-def imprimir_capas(cubo):
-    """Imprime el cubo por capas de Z (z=0 arriba)."""
+def formatear_capas(cubo) -> str:
+    """Texto del cubo por capas de Z (z=0 arriba), tal como lo imprime imprimir_capas."""
     N = len(cubo)
+    lineas = []
+    if es_cubo_array(cubo):
+        tabla = np.full(256, "?", dtype=object)
+        for v, s in SIMBOLOS.items():
+            tabla[v] = s
+        chars = tabla[cubo]
+        for z in range(N):
+            lineas.append(f"z = {z}")
+            lineas.extend(" ".join(chars[:, y, z]) for y in range(N))
+            lineas.append("")
+        return "\n".join(lineas) + "\n"
     for z in range(N):
-        print(f"z = {z}")
+        lineas.append(f"z = {z}")
         for y in range(N):
-            fila = []
-            for x in range(N):
-                v = cubo[x][y][z]
-                fila.append(SIMBOLOS.get(v, "?"))
-            print(" ".join(fila))
-        print()
+            lineas.append(" ".join(SIMBOLOS.get(cubo[x][y][z], "?") for x in range(N)))
+        lineas.append("")
+    return "\n".join(lineas) + "\n"
+
+def imprimir_capas(cubo):
+    """Imprime el cubo por capas de Z (z=0 arriba)."""
+    print(formatear_capas(cubo), end="")
 
 
 # ----- Dinámica de monstruos -----
-def mover_monstruos(cubo, p: ParamEntorno, iteracion: int):
+def mover_monstruos(cubo, p: ParamEntorno, iteracion: int, indice: IndiceOcupacion | None = None,
+                    rng: random.Random | None = None):
     """
     Cada K_monstruo iteraciones, cada monstruo intenta moverse con probabilidad p_monstruo
     a una celda adyacente válida (no ZV). Si el destino tiene MONSTRUO, se fusionan (queda 1).
     *No* implementamos autosuicidio en ROBOT (pendiente de confirmación).
+    Con índice de ocupación, los monstruos se toman de él (sin recorrer el cubo) y
+    cada movimiento/fusión se refleja en el índice.
+    Usa `rng` (flujo de dinámica de la corrida); sin él, el `random` global.
+    Devuelve la cantidad de monstruos que se movieron (incluidas las fusiones).
     """
     if p.K_monstruo <= 0 or p.p_monstruo <= 0.0:
-        return
+        return 0
     if iteracion % p.K_monstruo != 0:
-        return
+        return 0
+    if rng is None:
+        rng = random
 
     N = len(cubo)
-    monstruos = obtener_posiciones(cubo, MONSTRUO)
-    random.shuffle(monstruos)
-
+    if indice is not None:
+        # sorted → mismo orden que el recorrido del cubo (misma secuencia aleatoria)
+        monstruos = sorted(indice.monstruos)
+    else:
+        monstruos = obtener_posiciones(cubo, MONSTRUO)
+    rng.shuffle(monstruos)
+
+    movidos = 0
     for (x, y, z) in monstruos:
         if cubo[x][y][z] != MONSTRUO:
             continue
-        if random.random() >= p.p_monstruo:
+        if rng.random() >= p.p_monstruo:
             continue
 
         candidatos = []
@@ -161,7 +725,7 @@ def mover_monstruos(cubo, p: ParamEntorno, iteracion: int):
         if not candidatos:
             continue
 
-        nx, ny, nz, destino = random.choice(candidatos)
+        nx, ny, nz, destino = rng.choice(candidatos)
 
         # Deja libre su celda actual
         cubo[x][y][z] = ZL
@@ -173,7 +737,102 @@ def mover_monstruos(cubo, p: ParamEntorno, iteracion: int):
             # movimiento normal a ZL
             cubo[nx][ny][nz] = MONSTRUO
 
+        if indice is not None:
+            indice.mover_monstruo((x, y, z), (nx, ny, nz))
+        movidos += 1
+    return movidos
+
 
-def step_entorno(cubo, p: ParamEntorno, iteracion: int):
-    """Avanza el mundo una iteración (por ahora solo monstruos)."""
-    mover_monstruos(cubo, p, iteracion)
+def mover_monstruos_lote(cubo, p: ParamEntorno, iteracion: int,
+                         indice: IndiceOcupacion | None = None, paralelo: bool = False,
+                         rng: random.Random | None = None):
+    """
+    Versión vectorizada de mover_monstruos para el backend "array".
+    Para todos los monstruos a la vez: máscara de movimientos válidos (no ZV, no ROBOT,
+    dentro del cubo), sorteo de p_monstruo y elección del destino como arreglos.
+
+    Las celdas candidatas no cambian mientras se mueven los monstruos (solo se excluyen
+    ZV, ROBOT y el borde), así que las máscaras calculadas de una vez son exactas.
+    - Modo exacto (paralelo=False): se sortea un orden de proceso y la ocupación final es
+      la que dejaría el bucle secuencial con ese orden y esos destinos: una celda queda con
+      monstruo si su último evento (llegada/salida) en ese orden es una llegada. Así, si A se
+      fusiona con B y B se mueve después, B se lleva el monstruo fusionado.
+    - Modo paralelo (paralelo=True): todos se mueven simultáneamente y solo se fusionan los
+      que eligen el mismo destino; un monstruo que entra a una celda que otro abandona en el
+      mismo paso no se fusiona. No reproduce ningún orden secuencial, pero no necesita barajar
+      ni ordenar eventos.
+    Las decisiones salen de un generador numpy sembrado desde `rng` (o el `random` global),
+    por lo que una corrida con semilla es reproducible (aunque distinta de la del motor secuencial).
+    Devuelve la cantidad de monstruos que se movieron (incluidas las fusiones).
+    """
+    if p.K_monstruo <= 0 or p.p_monstruo <= 0.0:
+        return 0
+    if iteracion % p.K_monstruo != 0:
+        return 0
+
+    N = cubo.shape[0]
+    if indice is not None:
+        pos = np.array(sorted(indice.monstruos), dtype=np.int64).reshape(-1, 3)
+    else:
+        pos = np.argwhere(cubo == MONSTRUO).astype(np.int64)
+    M = len(pos)
+    if M == 0:
+        return 0
+
+    gen = np.random.default_rng((rng if rng is not None else random).getrandbits(64))
+    orden = gen.permutation(M)          # orden[i] = turno del monstruo i
+    intenta = gen.random(M) < p.p_monstruo
+    eleccion = gen.random(M)
+
+    # Máscara (M, 6) de destinos válidos
+    dest = pos[:, None, :] + np.array(_DESP_6, dtype=np.int64)[None, :, :]
+    dentro = ((dest >= 0) & (dest < N)).all(axis=2)
+    dc = np.clip(dest, 0, N - 1)
+    valor = cubo[dc[..., 0], dc[..., 1], dc[..., 2]]
+    valida = dentro & (valor != ZV) & (valor != ROBOT)
+
+    n_validas = valida.sum(axis=1)
+    mueve = intenta & (n_validas > 0)
+
+    # k-ésimo candidato válido (equivalente a random.choice sobre la lista de candidatos)
+    k = np.minimum((eleccion * n_validas).astype(np.int64), np.maximum(n_validas - 1, 0))
+    j = np.argmax(np.cumsum(valida, axis=1) > k[:, None], axis=1)
+    destino = np.where(mueve[:, None], dest[np.arange(M), j], pos)
+
+    origen_flat = (pos[:, 0] * N + pos[:, 1]) * N + pos[:, 2]
+    destino_flat = (destino[:, 0] * N + destino[:, 1]) * N + destino[:, 2]
+
+    if paralelo:
+        final = np.unique(destino_flat)
+    else:
+        # Eventos: quietos = llegada en turno -1; móviles = salida y llegada en su turno
+        m = np.flatnonzero(mueve)
+        q = np.flatnonzero(~mueve)
+        celda = np.concatenate([origen_flat[q], origen_flat[m], destino_flat[m]])
+        turno = np.concatenate([np.full(len(q), -1), orden[m], orden[m]])
+        llega = np.concatenate([np.ones(len(q), bool), np.zeros(len(m), bool), np.ones(len(m), bool)])
+        ix = np.lexsort((turno, celda))
+        celda, llega = celda[ix], llega[ix]
+        ultimo = np.append(celda[1:] != celda[:-1], True)
+        final = celda[ultimo & llega]
+
+    vaciadas = np.setdiff1d(origen_flat, final, assume_unique=True)
+    nuevas = np.setdiff1d(final, origen_flat, assume_unique=True)
+    plano = cubo.reshape(-1)
+    plano[vaciadas] = ZL
+    plano[nuevas] = MONSTRUO
+
+    if indice is not None:
+        for c in np.column_stack(np.unravel_index(vaciadas, cubo.shape)).tolist():
+            indice.quitar_monstruo(tuple(c))
+        for c in np.column_stack(np.unravel_index(nuevas, cubo.shape)).tolist():
+            indice.agregar_monstruo(tuple(c))
+    return int(np.count_nonzero(mueve))
+
+
+def step_entorno(cubo, p: ParamEntorno, iteracion: int, indice: IndiceOcupacion | None = None,
+                 rng: random.Random | None = None):
+    """Avanza el mundo una iteración (por ahora solo monstruos). Devuelve los monstruos movidos."""
+    if p.motor_monstruos == "secuencial":
+        return mover_monstruos(cubo, p, iteracion, indice, rng)
+    return mover_monstruos_lote(cubo, p, iteracion, indice, paralelo=(p.motor_monstruos == "paralelo"), rng=rng)
@@ -0,0 +1,248 @@
+# =====================================================
+# exportador.py — Exportación continua de memorias de robots
+# =====================================================
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any
+import csv
+import json
+import mmap
+import os
+import sys
+
+from agente import Robot, MemoriaRobot, ORIENTACIONES
+
+try:
+    import numpy as np
+except ImportError:  # sin numpy, abrir_memorias devuelve memoryviews
+    np = None
+
+# Columnas del CSV (mismo formato que exportar_memoria_robot)
+COLUMNAS_CSV = [
+    "t", "regla", "accion", "frontal_estado", "percepcion",
+    "pos_pre", "ori_pre", "pos_post", "ori_post", "kills"
+]
+
+# Columnas binarias: id de robot + columnas de MemoriaRobot
+COLUMNAS_BIN = (("id", "i"),) + MemoriaRobot.COLUMNAS
+_DTYPE = {"i": "<i4", "B": "u1"}
+
+FORMATOS = ("binario", "csv")
+_SWAP = sys.byteorder == "big"   # los .bin son little-endian sea cual sea la máquina
+
+
+def fila_csv(row: Dict[str, Any]) -> list:
+    return [row.get(c) for c in COLUMNAS_CSV]
+
+
+class ExportadorMemorias:
+    """
+    Vuelca a disco, por bloques y durante la simulación, las filas nuevas de la memoria
+    de todos los robots registrados (vivos o destruidos).
+
+    Formatos:
+      - "binario": columnar, un archivo por columna (`memorias.<col>.bin`, little-endian)
+        más `memorias.json` con tipos, cantidad de filas y datos finales de cada robot.
+        Se reabre con `abrir_memorias` (memory-mapping, sin cargar todo en RAM).
+      - "csv": un único `memorias.csv` con columna `robot` + las columnas de siempre.
+
+    La escritura ocurre en un hilo aparte: `volcar` solo copia las filas nuevas y
+    encola el bloque, así el bucle de ticks no espera al disco. La cola admite hasta
+    `max_pendientes` bloques: si el disco no da abasto, `volcar` espera al más viejo en
+    lugar de acumular memoria. Un error de escritura se relanza en el próximo `volcar`
+    (o en `cerrar`).
+
+    Con `estado` (ver `estado()`, guardado en un punto de control) se retoma una
+    exportación en curso: cada archivo se trunca al tamaño que tenía en ese momento.
+    """
+
+    def __init__(self, carpeta: str = "memorias", formato: str = "binario",
+                 estado: Dict[str, Any] | None = None, max_pendientes: int = 8):
+        if formato not in FORMATOS:
+            raise ValueError(f"formato debe ser uno de {FORMATOS}.")
+        assert max_pendientes >= 1, "max_pendientes debe ser >= 1."
+        self.carpeta = Path(carpeta)
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        self.formato = formato
+        self.n_filas = 0
+        self.perdidas = 0
+        self._robots: List[Robot] = []
+        self._exportadas: List[int] = []
+        self._flota = None
+        self._bloques_exportados = 0
+        self._hilo = ThreadPoolExecutor(max_workers=1)
+        self._pendientes: deque = deque()
+        self.max_pendientes = max_pendientes
+
+        if estado is not None:
+            self.n_filas, self.perdidas = estado["n_filas"], estado["perdidas"]
+            self._archivos = {}
+            for nombre, tam in estado["posiciones"].items():
+                os.truncate(self._ruta(nombre), tam)
+                self._archivos[nombre] = (open(self._ruta(nombre), "ab") if formato == "binario"
+                                          else open(self._ruta(nombre), "a", newline="", encoding="utf-8"))
+            return
+        if formato == "binario":
+            self._archivos = {nombre: open(self._ruta(nombre), "wb") for nombre, _ in COLUMNAS_BIN}
+        else:
+            self._archivos = {"csv": open(self._ruta("csv"), "w", newline="", encoding="utf-8")}
+            csv.writer(self._archivos["csv"]).writerow(["robot"] + COLUMNAS_CSV)
+
+    def _ruta(self, nombre: str) -> Path:
+        if self.formato == "binario":
+            return self.carpeta / f"memorias.{nombre}.bin"
+        return self.carpeta / "memorias.csv"
+
+    # ----- Registro -----
+    def registrar_robots(self, robots: List[Robot]):
+        """Los ids de robot son el orden de registro."""
+        self._robots.extend(robots)
+        self._exportadas.extend(r.memoria.total for r in robots)
+
+    def registrar_flota(self, flota):
+        """Exporta los bloques de una RobotFleet (ids = índices de la flota)."""
+        self._flota = flota
+        self._bloques_exportados = flota.n_bloques
+
+    # ----- Puntos de control -----
+    def estado(self) -> Dict[str, Any]:
+        """Cursores y tamaño de cada archivo, tras esperar las escrituras pendientes."""
+        self._esperar(0)
+        posiciones = {}
+        for nombre, f in self._archivos.items():
+            f.flush()
+            posiciones[nombre] = f.tell()
+        return {
+            "formato": self.formato, "posiciones": posiciones,
+            "n_filas": self.n_filas, "perdidas": self.perdidas,
+            "exportadas": list(self._exportadas), "bloques_exportados": self._bloques_exportados,
+        }
+
+    def restaurar_cursores(self, estado: Dict[str, Any]):
+        """Tras registrar los mismos robots/flota, retoma desde las filas ya exportadas."""
+        self._exportadas = list(estado["exportadas"])
+        self._bloques_exportados = estado["bloques_exportados"]
+
+    # ----- Volcado -----
+    def volcar(self):
+        """Toma las filas nuevas de cada robot y las encola para escribir."""
+        self._esperar(self.max_pendientes - 1)
+        bloques = []
+        if self._flota is not None:
+            nuevos, perdidos = self._flota.bloques_desde(self._bloques_exportados)
+            self._bloques_exportados = self._flota.n_bloques
+            self.perdidas += perdidos
+            if nuevos:
+                bloques.append({
+                    nombre: np.concatenate([b[k] for b in nuevos])
+                    for k, (nombre, _) in enumerate(COLUMNAS_BIN)
+                })
+        for i, r in enumerate(self._robots):
+            if r.memoria.total == self._exportadas[i]:
+                continue
+            cols, perdidas = r.memoria.columnas_desde(self._exportadas[i])
+            self._exportadas[i] = r.memoria.total
+            self.perdidas += perdidas
+            cols["id"] = array("i", [i]) * len(cols["t"])
+            bloques.append(cols)
+        if bloques:
+            self.n_filas += sum(len(b["t"]) for b in bloques)
+            self._pendientes.append(self._hilo.submit(self._escribir, bloques))
+
+    def _esperar(self, quedan: int):
+        """
+        Descarta las escrituras terminadas y espera a las más viejas hasta que queden
+        a lo sumo `quedan` en cola; si alguna falló, relanza su error.
+        """
+        while self._pendientes and (self._pendientes[0].done() or len(self._pendientes) > quedan):
+            self._pendientes.popleft().result()
+
+    def _escribir(self, bloques: List[Dict[str, Any]]):
+        if self.formato == "binario":
+            for nombre, tipo in COLUMNAS_BIN:
+                f = self._archivos[nombre]
+                for b in bloques:
+                    col = b[nombre]
+                    if np is not None and isinstance(col, np.ndarray):
+                        f.write(col.astype(_DTYPE[tipo]).tobytes())
+                    elif _SWAP and col.itemsize > 1:
+                        col = array(col.typecode, col)
+                        col.byteswap()
+                        f.write(col.tobytes())
+                    else:
+                        f.write(col.tobytes())
+            return
+        w = csv.writer(self._archivos["csv"])
+        nombres = [nombre for nombre, _ in MemoriaRobot.COLUMNAS]
+        for b in bloques:
+            columnas = [list(b[n]) for n in nombres]
+            ids = list(b["id"])
+            mem = MemoriaRobot()
+            mem.extender(dict(zip(nombres, columnas)))
+            w.writerows([rid] + fila_csv(row) for rid, row in zip(ids, mem))
+
+    def cerrar(self, vivos: List[Robot] | None = None) -> str:
+        """
+        Vuelca lo pendiente, espera al hilo de escritura y escribe los metadatos; si una
+        escritura falló, relanza su error (sin escribir los metadatos).
+        """
+        try:
+            self.volcar()
+            self._hilo.shutdown(wait=True)
+        finally:
+            for f in self._archivos.values():
+                f.close()
+        self._esperar(0)
+
+        vivos_ids = {id(r) for r in (vivos or [])}
+        robots_meta = [
+            {"id": i, "pos": [r.x, r.y, r.z], "orientacion": r.orientacion,
+             "kills": r.kills, "vivo": id(r) in vivos_ids}
+            for i, r in enumerate(self._robots)
+        ]
+        if self._flota is not None:
+            f = self._flota
+            robots_meta = [
+                {"id": i, "pos": [int(f.x[i]), int(f.y[i]), int(f.z[i])],
+                 "orientacion": ORIENTACIONES[f.ori[i]], "kills": int(f.kills[i]),
+                 "vivo": bool(f.vivo[i])}
+                for i in range(len(f))
+            ]
+        meta = {
+            "formato": self.formato,
+            "n_filas": self.n_filas,
+            "perdidas": self.perdidas,
+            "columnas": [[nombre, _DTYPE[tipo]] for nombre, tipo in COLUMNAS_BIN],
+            "robots": robots_meta,
+        }
+        ruta = self.carpeta / "memorias.json"
+        ruta.write_text(json.dumps(meta, indent=1), encoding="utf-8")
+        return str(ruta)
+
+
+def abrir_memorias(carpeta: str = "memorias"):
+    """
+    Reabre una exportación binaria por memory-mapping.
+    Devuelve (meta, columnas): con numpy, cada columna es un np.memmap de solo lectura;
+    sin numpy, un memoryview tipado sobre el mmap del archivo (en una máquina big-endian,
+    un array con los bytes ya invertidos).
+    """
+    carpeta = Path(carpeta)
+    meta = json.loads((carpeta / "memorias.json").read_text(encoding="utf-8"))
+    columnas = {}
+    for nombre, dtype in meta["columnas"]:
+        ruta = carpeta / f"memorias.{nombre}.bin"
+        if meta["n_filas"] == 0:
+            columnas[nombre] = [] if np is None else np.zeros(0, dtype=dtype)
+        elif np is not None:
+            columnas[nombre] = np.memmap(ruta, dtype=dtype, mode="r")
+        else:
+            with open(ruta, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            columnas[nombre] = memoryview(mm).cast("i" if dtype == "<i4" else "B")
+            if _SWAP and dtype == "<i4":
+                columnas[nombre] = array("i", columnas[nombre])
+                columnas[nombre].byteswap()
+    return meta, columnas
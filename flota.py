@@ -0,0 +1,265 @@
+# =====================================================
+# flota.py — Motor struct-of-arrays para muchos robots (R1..R8 en bloque)
+# =====================================================
+from array import array
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+
+from agente import (
+    Robot, MemoriaRobot, Orient, ORIENTACIONES, ORI_COD, REGLAS, ZV, ZL, ROBOT, MONSTRUO,
+    F_ZL, F_ZV, F_ROBOT, F_MONSTRUO, F_BORDE, F_DESCONOCIDO, F_AQUI,
+    DESP as _DESP, CICLOS_ORTO,
+)
+
+# ----- Tablas por código de orientación -----
+DESP = np.array(_DESP, dtype=np.int64)              # (6, 3)
+CICLOS = np.array(CICLOS_ORTO, dtype=np.int8)      # (6, 4)
+
+R1, R2, R3, R4, R5, R6, R7, R8 = range(len(REGLAS))
+
+_FUERA = 255   # valor centinela para celdas fuera del cubo
+_COD_VALOR = np.full(256, F_DESCONOCIDO, dtype=np.int8)   # valor de celda → código frontal
+_COD_VALOR[ZL], _COD_VALOR[ZV], _COD_VALOR[ROBOT], _COD_VALOR[MONSTRUO] = F_ZL, F_ZV, F_ROBOT, F_MONSTRUO
+_COD_VALOR[_FUERA] = F_BORDE
+
+_ROTAN = np.zeros(len(REGLAS), dtype=bool)
+_ROTAN[[R2, R3, R6, R8]] = True
+
+_COLUMNAS = ("id",) + tuple(nombre for nombre, _ in MemoriaRobot.COLUMNAS)
+
+
+class RobotFleet:
+    """
+    Flota de robots guardada como arreglos paralelos (x, y, z, orientación, lado_idx,
+    kills, vivo). `tick` evalúa la cascada R1..R8 para todos los robots a la vez sobre
+    un cubo del backend "array".
+
+    Semántica (síncrona, determinista):
+      - R1 se resuelve primero para toda la flota; luego todos sensan el mismo estado.
+      - Si varios robots quieren avanzar (R4/R5/R7) a la misma celda, gana el de menor
+        id (orden inicial, como en la lista de `simular`); los demás aplican R3.
+      - El monstroscopio se evalúa sobre el estado al inicio del tick.
+    Con robots que no interactúan entre sí, el resultado coincide con Robot.tick.
+
+    La memoria se guarda por bloques de arreglos compactos (un bloque por tick registrado);
+    con `capacidad` solo se conservan los últimos bloques (≤ capacidad filas por robot) y
+    con `muestreo` solo los ticks múltiplos. `a_robots` arma objetos Robot con MemoriaRobot.
+    """
+
+    def __init__(self, posiciones, orientacion: Orient = "X+", registrar: bool = True,
+                 capacidad: int | None = None, muestreo: int = 1):
+        pos = np.array(list(posiciones), dtype=np.int64).reshape(-1, 3)
+        n = len(pos)
+        self.x = pos[:, 0].copy()
+        self.y = pos[:, 1].copy()
+        self.z = pos[:, 2].copy()
+        self.ori = np.full(n, ORI_COD[orientacion], dtype=np.int8)
+        self.lado_idx = np.zeros(n, dtype=np.int8)
+        self.kills = np.zeros(n, dtype=np.int64)
+        self.vivo = np.ones(n, dtype=bool)
+        self.registrar = registrar
+        self.capacidad = capacidad
+        self.muestreo = muestreo
+        self._memoria_previa: List[MemoriaRobot | None] = [None] * n
+        self._bloques: deque = deque(maxlen=capacidad)
+        self.n_bloques = 0   # bloques registrados desde el inicio (incluye descartados)
+        self.reglas = np.zeros(0, dtype=np.int8)   # regla de cada robot activo en el último tick
+
+    @classmethod
+    def desde_robots(cls, robots: List[Robot], registrar: bool = True,
+                     capacidad: int | None = None, muestreo: int = 1) -> "RobotFleet":
+        flota = cls([(r.x, r.y, r.z) for r in robots], registrar=registrar,
+                    capacidad=capacidad, muestreo=muestreo)
+        flota.ori[:] = [r.ori for r in robots]
+        flota.lado_idx[:] = [r.lado_idx for r in robots]
+        flota.kills[:] = [r.kills for r in robots]
+        flota._memoria_previa = [r.memoria if len(r.memoria) else None for r in robots]
+        return flota
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def n_vivos(self) -> int:
+        return int(self.vivo.sum())
+
+    def resumen(self) -> List[Tuple[int, int, int, Orient]]:
+        """(x, y, z, orientación) de los robots vivos, como imprime `simular`."""
+        return [(int(self.x[i]), int(self.y[i]), int(self.z[i]), ORIENTACIONES[self.ori[i]])
+                for i in np.flatnonzero(self.vivo)]
+
+    # ----- Sensores -----
+    @staticmethod
+    def _monstroscopio(cubo, x, y, z, ori) -> np.ndarray:
+        """Monstruo en alguna de las 5 caras (frente + 4 costados) de cada robot."""
+        N = cubo.shape[0]
+        caras = np.column_stack([ori, CICLOS[ori]])                    # (n, 5)
+        c = np.stack([x, y, z], axis=1)[:, None, :] + DESP[caras]      # (n, 5, 3)
+        dentro = ((c >= 0) & (c < N)).all(axis=2)
+        cc = np.clip(c, 0, N - 1)
+        return (dentro & (cubo[cc[..., 0], cc[..., 1], cc[..., 2]] == MONSTRUO)).any(axis=1)
+
+    @staticmethod
+    def _monstroscopio_campo(campo, x, y, z, ori) -> np.ndarray:
+        """Igual que _monstroscopio, leyendo el campo de proximidad (cuenta − cara trasera)."""
+        N = campo.N
+        cuenta = np.frombuffer(campo.cuenta, dtype=np.uint8)
+        hay = np.frombuffer(campo.hay, dtype=np.uint8)
+        atras = np.stack([x, y, z], axis=1) - DESP[ori]
+        dentro = ((atras >= 0) & (atras < N)).all(axis=1)
+        i = (x * N + y) * N + z
+        j = np.where(dentro, (atras[:, 0] * N + atras[:, 1]) * N + atras[:, 2], 0)
+        return cuenta[i].astype(np.int16) - (dentro & (hay[j] == 1)) > 0
+
+    # ----- Paso -----
+    def tick(self, cubo, t: int, indice=None) -> int:
+        """
+        Aplica un tick a todos los robots vivos. Si se pasa un índice de ocupación,
+        cada escritura sobre el cubo se refleja en él. Devuelve la cantidad de vivos.
+        """
+        act = np.flatnonzero(self.vivo)
+        n = len(act)
+        if n == 0:
+            return 0
+        N = cubo.shape[0]
+        x, y, z, ori = self.x[act], self.y[act], self.z[act], self.ori[act]
+        lado = self.lado_idx[act]
+
+        regla = np.full(n, R8, dtype=np.int8)
+        frontal = np.full(n, F_AQUI, dtype=np.int8)
+        monstro = np.zeros(n, dtype=bool)
+
+        # R1. Monstruo en mi celda (se resuelve antes de sensar)
+        r1 = cubo[x, y, z] == MONSTRUO
+        if r1.any():
+            cubo[x[r1], y[r1], z[r1]] = ZV
+            regla[r1] = R1
+            self.kills[act[r1]] += 1
+            self.vivo[act[r1]] = False
+            if indice is not None:
+                indice.bajas(ROBOT, x[r1], y[r1], z[r1])
+                indice.bajas(MONSTRUO, x[r1], y[r1], z[r1])
+
+        # Sensado frontal
+        d = DESP[ori]
+        fx, fy, fz = x + d[:, 0], y + d[:, 1], z + d[:, 2]
+        dentro = (fx >= 0) & (fx < N) & (fy >= 0) & (fy < N) & (fz >= 0) & (fz < N)
+        fval = np.full(n, _FUERA, dtype=np.uint8)
+        fval[dentro] = cubo[fx[dentro], fy[dentro], fz[dentro]]
+        sigue = ~r1
+        frontal[sigue] = _COD_VALOR[fval[sigue]]
+
+        r2 = sigue & ((frontal == F_ZV) | (frontal == F_BORDE))
+        r3 = sigue & (frontal == F_ROBOT)
+        r4 = sigue & (frontal == F_MONSTRUO)
+        resto = sigue & ~(r2 | r3 | r4)
+        if resto.any():
+            if indice is not None and indice.campo is not None:
+                monstro[resto] = self._monstroscopio_campo(indice.campo, x[resto], y[resto], z[resto], ori[resto])
+            else:
+                monstro[resto] = self._monstroscopio(cubo, x[resto], y[resto], z[resto], ori[resto])
+        zl = resto & (frontal == F_ZL)
+
+        regla[r2] = R2
+        regla[r3] = R3
+        regla[r4] = R4
+        regla[zl & monstro] = R5
+        regla[zl & ~monstro] = R7
+        # resto con frontal desconocido → R8 (valor por defecto)
+
+        # R3 determinista: un destino, un robot (gana el menor id)
+        mueve = r4 | zl
+        idx = np.flatnonzero(mueve)
+        if len(idx):
+            destino = (fx[idx] * N + fy[idx]) * N + fz[idx]
+            gana = np.zeros(len(idx), dtype=bool)
+            gana[np.unique(destino, return_index=True)[1]] = True
+            pierde = idx[~gana]
+            regla[pierde] = R3
+            frontal[pierde] = F_ROBOT
+            monstro[pierde] = False
+            mueve[pierde] = False
+
+        # Rotaciones (R2, R3, R6, R8)
+        rota = _ROTAN[regla]
+        ori_post = ori.copy()
+        ori_post[rota] = CICLOS[ori[rota], lado[rota] % 4]
+        self.ori[act] = ori_post
+        self.lado_idx[act[rota]] = (lado[rota] + 1) % 4
+
+        # Avances (R4, R5, R7)
+        m = np.flatnonzero(mueve)
+        if len(m):
+            cubo[x[m], y[m], z[m]] = ZL
+            cubo[fx[m], fy[m], fz[m]] = ROBOT
+            if indice is not None:
+                # destinos y orígenes son celdas distintas entre sí: el lote equivale a
+                # mover robot por robot
+                caza = m[regla[m] == R4]
+                indice.bajas(MONSTRUO, fx[caza], fy[caza], fz[caza])
+                indice.bajas(ROBOT, x[m], y[m], z[m])
+                indice.altas(ROBOT, fx[m], fy[m], fz[m])
+            self.x[act[m]] = fx[m]
+            self.y[act[m]] = fy[m]
+            self.z[act[m]] = fz[m]
+
+        self.reglas = regla
+        if self.registrar and t % self.muestreo == 0:
+            i32 = np.int32
+            self._bloques.append((
+                act.astype(i32), np.full(n, t, dtype=i32), regla, frontal, monstro.astype(np.uint8),
+                x.astype(i32), y.astype(i32), z.astype(i32), ori,
+                self.x[act].astype(i32), self.y[act].astype(i32), self.z[act].astype(i32), ori_post,
+                self.kills[act].astype(i32),
+            ))
+            self.n_bloques += 1
+        return self.n_vivos()
+
+    # ----- Vistas -----
+    def bloques_desde(self, previo: int) -> Tuple[list, int]:
+        """
+        Bloques registrados después de los primeros `previo`, con columnas en el orden
+        ("id",) + MemoriaRobot.COLUMNAS. Devuelve (bloques, perdidos por capacidad).
+        """
+        primero = self.n_bloques - len(self._bloques)
+        desde = max(previo, primero)
+        return list(self._bloques)[desde - primero:], desde - previo
+
+    def memorias(self) -> List[MemoriaRobot]:
+        """
+        Memoria de cada robot (por id) como MemoriaRobot, igual que Robot.memoria. Las
+        columnas de todos los bloques se ordenan y convierten a `array` una sola vez;
+        cada robot recibe su tramo.
+        """
+        tipos = dict(MemoriaRobot.COLUMNAS)
+        planas = {k: array(tipo) for k, tipo in tipos.items()}
+        tramos = {}
+        if self._bloques:
+            arr = dict(zip(_COLUMNAS, (np.concatenate(c) for c in zip(*self._bloques))))
+            orden = np.lexsort((arr["t"], arr["id"]))
+            for k, tipo in tipos.items():
+                v = arr[k][orden].astype(np.int32 if tipo == "i" else np.uint8)
+                planas[k] = array(tipo, v.tobytes())
+            ids, inicios = np.unique(arr["id"][orden], return_index=True)
+            fines = np.append(inicios[1:], len(orden))
+            tramos = dict(zip(ids.tolist(), zip(inicios.tolist(), fines.tolist())))
+        out = []
+        for i, previa in enumerate(self._memoria_previa):
+            a, b = tramos.get(i, (0, 0))
+            columnas = {k: col[a:b] for k, col in planas.items()}
+            if previa is not None:
+                columnas = {k: array(tipos[k], previa.columna(k)) + col for k, col in columnas.items()}
+            out.append(MemoriaRobot.desde_columnas(columnas, self.capacidad, self.muestreo))
+        return out
+
+    def a_robots(self, solo_vivos: bool = True) -> List[Robot]:
+        """Objetos Robot (vistas de solo lectura del estado actual) con su memoria."""
+        memorias = self.memorias()
+        return [
+            Robot(int(self.x[i]), int(self.y[i]), int(self.z[i]),
+                  orientacion=int(self.ori[i]), lado_idx=int(self.lado_idx[i]),
+                  kills=int(self.kills[i]), memoria=memorias[i])
+            for i in range(len(self))
+            if self.vivo[i] or not solo_vivos
+        ]
@@ -0,0 +1,154 @@
+# =====================================================
+# instrumentacion.py — Tiempos por fase y frecuencia de reglas del bucle de simular
+# =====================================================
+from array import array
+from time import perf_counter
+from typing import Any, Dict, List
+import json
+import sys
+
+from agente import REGLAS
+from entorno import np
+
+# Fases del tick de simular, en el orden en que se ejecutan ("deltas": fotos y DeltaTick
+# de iterar más el registro de repetición, antes y después de la dinámica)
+FASES = ("deltas", "entorno", "robots", "volcado", "render", "paradas", "estasis", "punto_control")
+(F_DELTAS, F_ENTORNO, F_ROBOTS, F_VOLCADO, F_RENDER, F_PARADAS, F_ESTASIS,
+ F_PUNTO_CONTROL) = range(len(FASES))
+REGLAS_CORTAS = tuple(r[:2] for r in REGLAS)   # "R1".."R8"
+
+
+class MetricasSimulacion:
+    """
+    Instrumentación opcional de simular (parámetro `metricas`): sin ella el bucle solo
+    paga un `is None` por fase. Por cada tick registra el tiempo de pared de cada fase
+    (FASES), las reglas aplicadas por los robots y los movimientos y fusiones de monstruos.
+
+    - acumulado[fase]: segundos totales por fase; reglas: conteo por regla (orden REGLAS);
+      movimientos / fusiones: totales de la dinámica de monstruos.
+    - por_tick=True guarda además una serie por tick (ver `serie`), ~70 bytes por tick.
+    - volcar_cada: cada tantos ticks escribe resumen() como una línea JSON en `destino`
+      (ruta de archivo, que se abre en modo append, u objeto con write; por defecto stderr).
+    """
+
+    def __init__(self, por_tick: bool = True, volcar_cada: int | None = None, destino=None):
+        assert volcar_cada is None or volcar_cada > 0, "volcar_cada debe ser > 0 o None."
+        self.por_tick = por_tick
+        self.volcar_cada = volcar_cada
+        self.destino = destino
+        self.ticks = 0
+        self.acumulado: Dict[str, float] = dict.fromkeys(FASES, 0.0)
+        self.reglas: List[int] = [0] * len(REGLAS)
+        self.movimientos = 0
+        self.fusiones = 0
+        self._series: Dict[str, array] = {"t": array("i")}
+        for nombre in FASES:
+            self._series[nombre] = array("d")
+        for nombre in ("movimientos", "fusiones") + REGLAS_CORTAS:
+            self._series[nombre] = array("I")
+        self._abierto = False
+        self._archivo = None
+
+    # ----- Registro (lo llama simular) -----
+    def iniciar_tick(self, t: int, n_monstruos: int):
+        self._cerrar_tick()
+        self._t = t
+        self._fase = [0.0] * len(FASES)
+        self._reglas = [0] * len(REGLAS)
+        self._mov = 0
+        self._fus = 0
+        self._n_monstruos = n_monstruos
+        self._abierto = True
+        self._ultimo = perf_counter()
+
+    def marca(self, fase: int):
+        """Atribuye a `fase` el tiempo transcurrido desde la marca anterior."""
+        ahora = perf_counter()
+        self._fase[fase] += ahora - self._ultimo
+        self._ultimo = ahora
+
+    def monstruos(self, movidos: int, n_monstruos: int):
+        """Movimientos del paso y fusiones (la dinámica solo reduce monstruos al fusionar)."""
+        self._mov = movidos
+        self._fus = self._n_monstruos - n_monstruos
+
+    def tick_robots(self, robots: list, cubo, t: int, indice=None) -> list:
+        """Robot.tick de cada robot contando la regla aplicada; devuelve los que siguen vivos."""
+        cuenta = self._reglas
+        vivos = []
+        for r in robots:
+            sigue = r.tick(cubo, t, indice)
+            cuenta[r.ultima_regla] += 1
+            if sigue:
+                vivos.append(r)
+        return vivos
+
+    def contar_reglas(self, reglas):
+        """Reglas de un tick de RobotFleet (arreglo de códigos, ver RobotFleet.reglas)."""
+        for rg, c in enumerate(np.bincount(reglas, minlength=len(REGLAS)).tolist()):
+            self._reglas[rg] += c
+
+    def terminar(self):
+        self._cerrar_tick()
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def _cerrar_tick(self):
+        if not self._abierto:
+            return
+        self._abierto = False
+        self.ticks += 1
+        for i, nombre in enumerate(FASES):
+            self.acumulado[nombre] += self._fase[i]
+        for rg, c in enumerate(self._reglas):
+            self.reglas[rg] += c
+        self.movimientos += self._mov
+        self.fusiones += self._fus
+        if self.por_tick:
+            s = self._series
+            s["t"].append(self._t)
+            for i, nombre in enumerate(FASES):
+                s[nombre].append(self._fase[i])
+            s["movimientos"].append(self._mov)
+            s["fusiones"].append(self._fus)
+            for nombre, c in zip(REGLAS_CORTAS, self._reglas):
+                s[nombre].append(c)
+        if self.volcar_cada is not None and self._t % self.volcar_cada == 0:
+            self.volcar()
+
+    # ----- Consulta -----
+    def serie(self, nombre: str) -> list:
+        """Valores por tick de "t", una fase, "movimientos", "fusiones" o "R1".."R8"."""
+        return self._series[nombre].tolist()
+
+    def total(self) -> float:
+        return sum(self.acumulado.values())
+
+    def resumen(self) -> Dict[str, Any]:
+        total = self.total()
+        return {
+            "t": self._t if self.ticks else 0,
+            "ticks": self.ticks,
+            "segundos": total,
+            "ticks_por_segundo": self.ticks / total if total > 0 else 0.0,
+            "fases": dict(self.acumulado),
+            "reglas": dict(zip(REGLAS_CORTAS, self.reglas)),
+            "movimientos": self.movimientos,
+            "fusiones": self.fusiones,
+        }
+
+    def volcar(self):
+        if self.destino is None or hasattr(self.destino, "write"):
+            salida = self.destino if self.destino is not None else sys.stderr
+        else:
+            if self._archivo is None:
+                self._archivo = open(self.destino, "a", encoding="utf-8")
+            salida = self._archivo
+        salida.write(json.dumps(self.resumen()) + "\n")
+        salida.flush()
+
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        estado["_archivo"] = None
+        return estado
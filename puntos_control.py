@@ -0,0 +1,368 @@
+# =====================================================
+# puntos_control.py — Puntos de control (checkpoint) y reanudación de simular
+# =====================================================
+from array import array
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import pickle
+import random
+import signal
+import struct
+import threading
+import zlib
+
+from agente import Robot, MemoriaRobot
+from entorno import ParamEntorno, FlujosRNG, es_cubo_array, es_cubo_perezoso, np
+from terreno import CuboPerezoso
+
+VERSION = 1
+BLOQUE = 4096          # bytes de grilla por bloque (unidad de escritura incremental)
+_LARGO = struct.Struct("<Q")
+
+
+# ----- Grilla ↔ bytes -----
+def _imagen(cubo) -> bytes:
+    """Celdas del cubo en orden plano (x, y, z), un byte por celda."""
+    if es_cubo_array(cubo):
+        return cubo.tobytes()
+    return bytes(chain.from_iterable(chain.from_iterable(cubo)))
+
+
+def _cubo_desde_imagen(imagen, N: int, backend: str):
+    if backend == "array":
+        return np.frombuffer(bytearray(imagen), dtype=np.uint8).reshape(N, N, N)
+    return [[list(imagen[(x * N + y) * N:(x * N + y + 1) * N]) for y in range(N)] for x in range(N)]
+
+
+def _bloques(plano, claves) -> List[Tuple[int, bytes]]:
+    """Bloques `claves` de la grilla plana (bytearray o ndarray de un byte por celda)."""
+    return [(k, bytes(plano[k * BLOQUE:(k + 1) * BLOQUE])) for k in claves]
+
+
+def _empacar_rng(estado: tuple) -> tuple:
+    """Estado de random.Random con las 624 palabras del Mersenne Twister como bytes."""
+    version, interno, gauss = estado
+    return version, array("I", interno[:-1]).tobytes(), interno[-1], gauss
+
+
+def _desempacar_rng(empacado: tuple) -> tuple:
+    version, palabras, pos, gauss = empacado
+    return version, tuple(array("I", palabras)) + (pos,), gauss
+
+
+# ----- Estado restaurado -----
+@dataclass
+class EstadoSimulacion:
+    """Todo lo necesario para que simular siga desde el tick `t` como si no se hubiera detenido."""
+    params: ParamEntorno
+    opciones: Dict[str, Any]
+    t: int
+    cubo: Any
+    robots_pos: List[tuple]
+    monstruos_pos: List[tuple]
+    todos: List[Robot]                 # robots en orden de registro (vivos y destruidos)
+    vivos: List[bool]
+    flota: Any                         # RobotFleet o None
+    flujos: FlujosRNG
+    estasis: tuple                     # ver DetectorEstasis.estado
+    exportador: Dict[str, Any] | None  # ver ExportadorMemorias.estado
+    # para seguir escribiendo incrementalmente en el mismo archivo
+    ruta: str = ""
+    fin: int = 0
+    cursores: List[int] = field(default_factory=list)
+    cursor_bloques: int = 0
+
+
+# ----- Escritura -----
+class EscritorPuntosControl:
+    """
+    Escribe puntos de control de una corrida en un único archivo binario de solo
+    agregado: una cabecera y luego un registro por punto de control, cada uno con
+    largo + pickle comprimido (zlib). Cada registro es incremental:
+      - grilla: solo los bloques de BLOQUE bytes que cambiaron desde el registro anterior
+        (terreno perezoso: solo los chunks cambiados); el primero lleva la grilla entera;
+      - memorias: solo las filas registradas desde el registro anterior (cursor = total);
+      - el resto (robots, índice, RNG, estasis, cursores del exportador) completo, es chico.
+    La captura ocurre en el bucle de ticks; la compresión y la escritura, en un hilo aparte.
+    Si una escritura falla, el error se relanza en el próximo guardar o en cerrar.
+    Las celdas cambiadas no se buscan comparando grillas: hay que asociar `tocadas` al
+    índice de ocupación (indice.tocadas = escritor.tocadas), que anota cada alta/baja.
+
+    Se escribe cada `cada` ticks y/o cuando se pide con `solicitar()` (por ejemplo desde
+    el manejador de la señal instalada con `escuchar`).
+    """
+
+    def __init__(self, ruta: str, params: ParamEntorno, opciones: Dict[str, Any],
+                 cada: int | None = None, continuar: EstadoSimulacion | None = None):
+        assert cada is None or cada >= 1, "cada debe ser >= 1 o None."
+        self.ruta = Path(ruta)
+        self.cada = cada
+        self.n_escritos = 0
+        self._pedido = False
+        self._senal = None
+        self._manejador_previo = None
+        self._hilo = ThreadPoolExecutor(max_workers=1)
+        self._pendientes: List[Future] = []
+        self.tocadas: set = set()
+        self._completo = continuar is None   # el primer registro de un archivo nuevo lleva la grilla entera
+        self._espejo = None                  # backend lista: copia plana de la grilla, al día con `tocadas`
+        if continuar is not None:
+            # se sigue el mismo archivo: se descarta lo posterior al registro reanudado
+            with open(self.ruta, "r+b") as f:
+                f.truncate(continuar.fin)
+            self._archivo = open(self.ruta, "ab")
+            self._cursores = list(continuar.cursores)
+            self._cursor_bloques = continuar.cursor_bloques
+            self._rng = tuple(r.getstate() for r in
+                              (continuar.flujos.generacion, continuar.flujos.colocacion, continuar.flujos.dinamica))
+            return
+        self._archivo = open(self.ruta, "wb")
+        self._cursores: List[int] = []
+        self._cursor_bloques = 0
+        self._rng = (None, None, None)
+        self._encolar({
+            "tipo": "cabecera", "version": VERSION, "params": params, "opciones": opciones,
+        })
+
+    # ----- Disparo -----
+    def solicitar(self):
+        """Pide un punto de control al final del tick en curso (seguro desde señales o hilos)."""
+        self._pedido = True
+
+    def escuchar(self, senal: int):
+        """Instala un manejador de `senal` que llama a solicitar (solo desde el hilo principal)."""
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("Las señales solo pueden escucharse desde el hilo principal.")
+        self._senal = senal
+        self._manejador_previo = signal.signal(senal, lambda *_: self.solicitar())
+
+    def toca(self, t: int) -> bool:
+        return self._pedido or (self.cada is not None and t % self.cada == 0)
+
+    # ----- Captura -----
+    def guardar(self, t: int, cubo, indice, todos: List[Robot], robots: List[Robot], flota,
+                flujos: FlujosRNG, estasis: tuple, exportador=None):
+        """Captura el estado al final del tick t (`robots` son los vivos, `todos` en orden de registro)."""
+        self._revisar()
+        self._pedido = False
+        registro: Dict[str, Any] = {"tipo": "punto", "t": t}
+
+        if es_cubo_perezoso(cubo):
+            if self._completo:
+                claves = list(cubo._chunks)
+            else:
+                sh, M = cubo._s, cubo._M
+                claves = {((x >> sh) * M + (y >> sh)) * M + (z >> sh) for x, y, z in self.tocadas}
+            registro["grilla"] = {"perezoso": (cubo.semilla, cubo.Pfree, cubo.lado_chunk),
+                                  "chunks": {k: bytes(cubo._chunks[k]) for k in claves}}
+        else:
+            N = len(cubo)
+            if es_cubo_array(cubo):
+                plano = cubo.reshape(-1)
+            elif self._espejo is None:
+                plano = self._espejo = bytearray(_imagen(cubo))
+            else:
+                plano = self._espejo
+                for x, y, z in self.tocadas:
+                    plano[(x * N + y) * N + z] = cubo[x][y][z]
+            if self._completo:
+                claves = range(-(-N ** 3 // BLOQUE))
+            else:
+                claves = sorted({((x * N + y) * N + z) // BLOQUE for x, y, z in self.tocadas})
+            registro["grilla"] = {"bloques": _bloques(plano, claves)}
+        self.tocadas.clear()
+        self._completo = False
+
+        registro["indice"] = (sorted(indice.robots), sorted(indice.monstruos))
+        if flota is not None:
+            nuevos, _ = flota.bloques_desde(self._cursor_bloques)
+            self._cursor_bloques = flota.n_bloques
+            registro["flota"] = {
+                "arreglos": {k: getattr(flota, k).copy() for k in ("x", "y", "z", "ori", "lado_idx", "kills", "vivo")},
+                "bloques": nuevos, "n_bloques": flota.n_bloques,
+                "capacidad": flota.capacidad, "muestreo": flota.muestreo, "registrar": flota.registrar,
+            }
+        else:
+            if not self._cursores:
+                self._cursores = [0] * len(todos)
+            vivos = {id(r) for r in robots}
+            filas = []
+            for i, r in enumerate(todos):
+                cols, _ = r.memoria.columnas_desde(self._cursores[i])
+                self._cursores[i] = r.memoria.total
+                filas.append((r.x, r.y, r.z, r.ori, r.lado_idx, r.kills, id(r) in vivos, r.memoria.total, cols))
+            registro["robots"] = filas
+            if todos:
+                registro["memoria"] = (todos[0].memoria.capacidad, todos[0].memoria.muestreo)
+
+        # estados de RNG (solo los que cambiaron: generación y colocación no se usan tras el inicio)
+        estados = (flujos.generacion.getstate(), flujos.colocacion.getstate(), flujos.dinamica.getstate())
+        registro["rng"] = tuple(_empacar_rng(e) if e != previo else None
+                                for e, previo in zip(estados, self._rng))
+        self._rng = estados
+        registro["estasis"] = estasis
+        registro["exportador"] = exportador.estado() if exportador is not None else None
+        self._encolar(registro)
+        self.n_escritos += 1
+
+    def _encolar(self, registro: Dict[str, Any]):
+        self._pendientes.append(self._hilo.submit(self._escribir, registro))
+
+    def _revisar(self):
+        """Relanza el error de una escritura ya terminada y olvida las que salieron bien."""
+        pendientes = []
+        for fut in self._pendientes:
+            if not fut.done():
+                pendientes.append(fut)
+            elif fut.exception() is not None:
+                self._pendientes = []
+                raise fut.exception()
+        self._pendientes = pendientes
+
+    def _escribir(self, registro: Dict[str, Any]):
+        datos = zlib.compress(pickle.dumps(registro, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        self._archivo.write(_LARGO.pack(len(datos)) + datos)
+        self._archivo.flush()
+
+    def cerrar(self):
+        """
+        Espera las escrituras pendientes, cierra el archivo y restaura la señal; si alguna
+        escritura falló, relanza su error.
+        """
+        try:
+            self._hilo.shutdown(wait=True)
+            self._archivo.close()
+            if self._senal is not None:
+                signal.signal(self._senal, self._manejador_previo)
+                self._senal = None
+        finally:
+            self._revisar()
+
+
+# ----- Lectura -----
+def _registros(ruta: str):
+    """(registro, fin en bytes) de cada registro completo; ignora un final truncado."""
+    with open(ruta, "rb") as f:
+        datos = f.read()
+    pos = 0
+    while pos + _LARGO.size <= len(datos):
+        (n,) = _LARGO.unpack_from(datos, pos)
+        fin = pos + _LARGO.size + n
+        if fin > len(datos):
+            break
+        try:
+            registro = pickle.loads(zlib.decompress(datos[pos + _LARGO.size:fin]))
+        except (zlib.error, pickle.UnpicklingError, EOFError):
+            break
+        yield registro, fin
+        pos = fin
+
+
+def puntos_disponibles(ruta: str) -> List[int]:
+    """Ticks de los puntos de control completos guardados en `ruta`."""
+    return [r["t"] for r, _ in _registros(ruta) if r["tipo"] == "punto"]
+
+
+def leer_punto_control(ruta: str, t: int | None = None) -> EstadoSimulacion:
+    """
+    Reconstruye el estado del último punto de control (o del último con tick ≤ t),
+    aplicando en orden los registros incrementales.
+    """
+    cabecera = None
+    ultimo = None
+    fin = 0
+    imagen = None
+    chunks: Dict[int, bytes] = {}
+    perezoso = None
+    memorias: List[Dict[str, array]] = []
+    bloques: List[tuple] = []
+    rng = [None, None, None]
+
+    for registro, fin_registro in _registros(ruta):
+        if registro["tipo"] == "cabecera":
+            cabecera = registro
+            fin = fin_registro
+            continue
+        if t is not None and registro["t"] > t:
+            break
+        grilla = registro["grilla"]
+        if "perezoso" in grilla:
+            perezoso = grilla["perezoso"]
+            chunks.update(grilla["chunks"])
+        else:
+            if imagen is None:
+                imagen = bytearray()
+            for k, trozo in grilla["bloques"]:
+                a = k * BLOQUE
+                if a + len(trozo) > len(imagen):
+                    imagen.extend(bytes(a + len(trozo) - len(imagen)))
+                imagen[a:a + len(trozo)] = trozo
+        if "robots" in registro:
+            if not memorias:
+                memorias = [{nombre: array(tipo) for nombre, tipo in MemoriaRobot.COLUMNAS}
+                            for _ in registro["robots"]]
+            for mem, fila in zip(memorias, registro["robots"]):
+                for nombre, col in fila[8].items():
+                    mem[nombre].extend(col)
+        if "flota" in registro:
+            bloques.extend(registro["flota"]["bloques"])
+        rng = [st if st is not None else previo for st, previo in zip(registro["rng"], rng)]
+        ultimo = registro
+        fin = fin_registro
+
+    if cabecera is None or cabecera.get("version") != VERSION:
+        raise ValueError(f"{ruta} no es un archivo de puntos de control válido.")
+    if ultimo is None:
+        raise ValueError(f"{ruta} no tiene puntos de control (con t ≤ {t}).")
+
+    params: ParamEntorno = cabecera["params"]
+    N = params.N
+    if perezoso is not None:
+        semilla, Pfree, lado = perezoso
+        cubo = CuboPerezoso(N, Pfree, semilla, lado)
+        cubo._chunks = {k: bytearray(c) for k, c in chunks.items()}
+    else:
+        cubo = _cubo_desde_imagen(imagen, N, params.backend)
+
+    todos: List[Robot] = []
+    vivos: List[bool] = []
+    cursores: List[int] = []
+    flota = None
+    if "flota" in ultimo:
+        from flota import RobotFleet
+        info = ultimo["flota"]
+        arr = info["arreglos"]
+        flota = RobotFleet(np.column_stack([arr["x"], arr["y"], arr["z"]]), registrar=info["registrar"],
+                           capacidad=info["capacidad"], muestreo=info["muestreo"])
+        for k, v in arr.items():
+            setattr(flota, k, v.copy())
+        flota._bloques = deque(bloques, maxlen=info["capacidad"])
+        flota.n_bloques = info["n_bloques"]
+        todos = [Robot(int(x), int(y), int(z), orientacion=int(o))
+                 for x, y, z, o in zip(arr["x"], arr["y"], arr["z"], arr["ori"])]
+        vivos = [bool(v) for v in arr["vivo"]]
+    else:
+        capacidad, muestreo = ultimo.get("memoria", (None, 1))
+        for fila, cols in zip(ultimo["robots"], memorias):
+            x, y, z, ori, lado, kills, vivo, total, _ = fila
+            todos.append(Robot(x, y, z, orientacion=ori, lado_idx=lado, kills=kills,
+                               memoria=MemoriaRobot.restaurada(capacidad, muestreo, total, cols)))
+            vivos.append(vivo)
+            cursores.append(total)
+
+    flujos = FlujosRNG(random.Random(), random.Random(), random.Random())
+    for gen, st in zip((flujos.generacion, flujos.colocacion, flujos.dinamica), rng):
+        gen.setstate(_desempacar_rng(st))
+
+    robots_pos, monstruos_pos = ultimo["indice"]
+    return EstadoSimulacion(
+        params=params, opciones=cabecera["opciones"], t=ultimo["t"], cubo=cubo,
+        robots_pos=robots_pos, monstruos_pos=monstruos_pos, todos=todos, vivos=vivos,
+        flota=flota, flujos=flujos, estasis=ultimo["estasis"], exportador=ultimo["exportador"],
+        ruta=str(ruta), fin=fin, cursores=cursores,
+        cursor_bloques=flota.n_bloques if flota is not None else 0,
+    )
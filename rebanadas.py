@@ -0,0 +1,394 @@
+# =====================================================
+# rebanadas.py — Un mundo repartido en rebanadas (eje X), un proceso por rebanada
+# =====================================================
+from dataclasses import replace
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from agente import Robot, F_ZL, F_ZV, F_ROBOT, F_MONSTRUO, F_BORDE
+from entorno import (
+    ParamEntorno, FlujosRNG, IndiceOcupacion, construir_entorno, colocar_agentes,
+    ZV, ZL, ROBOT, MONSTRUO, _DESP_6, xor_zobrist,
+)
+from flota import RobotFleet, DESP, CICLOS, R2, R3, R4, R5, R7, R8, _COD_VALOR, _FUERA, _ROTAN
+from simulacion import DetectorEstasis, ResultadoSimulacion
+from terreno import hash_celda, _hash_np, _MASK64
+
+D6 = np.array(_DESP_6, dtype=np.int64)
+_U = np.uint64
+
+
+def _zobrist(flat: np.ndarray, N: int, tipo: int) -> int:
+    """XOR de entorno.clave_zobrist sobre un arreglo de índices planos (vectorizado)."""
+    x, r = np.divmod(flat.astype(np.int64), N * N)
+    y, z = np.divmod(r, N)
+    return xor_zobrist(x, y, z, tipo)
+
+
+def limites(N: int, trabajadores: int) -> List[Tuple[int, int]]:
+    """
+    Rangos [x0, x1) de cada rebanada, de espesor lo más parejo posible y ≥ 2: así quien
+    reclama una celda de borde siempre está en una de las dos rebanadas que la rodean.
+    """
+    w = max(1, min(trabajadores, N // 2))
+    return [(k * N // w, (k + 1) * N // w) for k in range(w)]
+
+
+# ----- Rebanada (estado y pasos de un trabajador) -----
+class Rebanada:
+    """
+    Agentes de las celdas con x0 ≤ x < x1 sobre el cubo compartido. Cada fase lee el
+    estado al inicio de la fase (incluido el halo: la capa vecina de cada rebanada
+    adyacente, leída directo de la memoria compartida) y solo escribe celdas propias;
+    el proceso principal separa las fases y reparte lo que cruza los bordes.
+    """
+
+    def __init__(self, cubo, x0: int, x1: int, robots: Dict[str, np.ndarray], monstruos: np.ndarray,
+                 p: ParamEntorno, semilla: int):
+        self.cubo = cubo
+        self.plano = cubo.reshape(-1)
+        self.N = cubo.shape[0]
+        self.x0, self.x1 = x0, x1
+        self.r = {k: v.copy() for k, v in robots.items()}     # id, x, y, z, ori, lado, kills
+        self.monstruos = np.sort(monstruos.astype(np.int64))
+        self.p_umbral = int(p.p_monstruo * (1 << 53))
+        self.semilla = semilla
+
+    def _propia(self, flat: np.ndarray) -> np.ndarray:
+        x = flat // (self.N * self.N)
+        return (x >= self.x0) & (x < self.x1)
+
+    # ----- Monstruos (motor "paralelo": todos a la vez, se fusionan los de igual destino) -----
+    def decidir_monstruos(self, t: int) -> Dict[int, np.ndarray]:
+        """
+        Sorteos por celda y tick (hash contador, no un flujo secuencial): la decisión de un
+        monstruo no depende de cuántas rebanadas haya. Devuelve {-1/+1: destinos ajenos}.
+        """
+        N, m = self.N, self.monstruos
+        self._destinos = m
+        if len(m) == 0:
+            return {-1: m, 1: m}
+        s = hash_celda(self.semilla, 2 * t)
+        intenta = (_hash_np(s, m.astype(_U)) >> _U(11)) < _U(self.p_umbral)
+        eleccion = (_hash_np(s ^ _MASK64, m.astype(_U)) >> _U(11)).astype(np.float64) / float(1 << 53)
+        pos = np.stack(np.unravel_index(m, self.cubo.shape), axis=1)
+        dest = pos[:, None, :] + D6[None, :, :]
+        dentro = ((dest >= 0) & (dest < N)).all(axis=2)
+        dc = np.clip(dest, 0, N - 1)
+        valor = self.cubo[dc[..., 0], dc[..., 1], dc[..., 2]]
+        valida = dentro & (valor != ZV) & (valor != ROBOT)
+        n_validas = valida.sum(axis=1)
+        mueve = intenta & (n_validas > 0)
+        k = np.minimum((eleccion * n_validas).astype(np.int64), np.maximum(n_validas - 1, 0))
+        j = np.argmax(np.cumsum(valida, axis=1) > k[:, None], axis=1)
+        d = dest[np.arange(len(m)), j]
+        destino = np.where(mueve, (d[:, 0] * N + d[:, 1]) * N + d[:, 2], m)
+        propia = self._propia(destino)
+        self._destinos = destino[propia]
+        ajenos = destino[~propia]
+        xa = ajenos // (N * N)
+        return {-1: ajenos[xa < self.x0], 1: ajenos[xa >= self.x1]}
+
+    def aplicar_monstruos(self, llegadas: List[np.ndarray]) -> int:
+        """
+        Escribe los monstruos de la rebanada (propios + llegados) y resuelve R1 antes de que
+        nadie sense, como RobotFleet: un robot con un monstruo en su celda lo aniquila y la
+        celda queda ZV. Solo un paso de monstruos puede poner uno en la celda de un robot.
+        """
+        N, r = self.N, self.r
+        nuevos = np.unique(np.concatenate([self._destinos] + llegadas))
+        self.plano[np.setdiff1d(self.monstruos, nuevos, assume_unique=True)] = ZL
+        self.plano[np.setdiff1d(nuevos, self.monstruos, assume_unique=True)] = MONSTRUO
+        flat = (r["x"] * N + r["y"]) * N + r["z"]
+        r1 = np.isin(flat, nuevos, assume_unique=True)
+        if r1.any():
+            self.plano[flat[r1]] = ZV
+            nuevos = np.setdiff1d(nuevos, flat[r1], assume_unique=True)
+            self.r = {k: v[~r1] for k, v in r.items()}
+        self.monstruos = nuevos
+        return len(nuevos)
+
+    # ----- Robots (semántica de RobotFleet; conflictos por menor id en todo el mundo) -----
+    def decidir_robots(self) -> Dict[int, Dict[str, np.ndarray]]:
+        """
+        Cascada R2..R8 sobre el estado al inicio de la fase (R1 ya se resolvió al escribir
+        los monstruos). Cada robot que avanza reclama su destino; devuelve los reclamos
+        sobre las capas de borde, para la rebanada vecina de cada lado.
+        """
+        N, r = self.N, self.r
+        x, y, z, ori = r["x"], r["y"], r["z"], r["ori"]
+        n = len(x)
+        flat = (x * N + y) * N + z
+        regla = np.full(n, R8, dtype=np.int8)
+        d = DESP[ori]
+        fx, fy, fz = x + d[:, 0], y + d[:, 1], z + d[:, 2]
+        dentro = (fx >= 0) & (fx < N) & (fy >= 0) & (fy < N) & (fz >= 0) & (fz < N)
+        fflat = (fx * N + fy) * N + fz
+        fval = np.full(n, _FUERA, dtype=np.uint8)
+        fval[dentro] = self.plano[fflat[dentro]]
+        frontal = _COD_VALOR[fval]
+        r2 = (frontal == F_ZV) | (frontal == F_BORDE)
+        r3 = frontal == F_ROBOT
+        r4 = frontal == F_MONSTRUO
+        resto = ~(r2 | r3 | r4)
+        monstro = np.zeros(n, dtype=bool)
+        if resto.any():
+            monstro[resto] = RobotFleet._monstroscopio(self.cubo, x[resto], y[resto], z[resto], ori[resto])
+        zl = resto & (frontal == F_ZL)
+        regla[r2] = R2
+        regla[r3] = R3
+        regla[r4] = R4
+        regla[zl & monstro] = R5
+        regla[zl & ~monstro] = R7
+        mueve = r4 | zl
+        self._fase = (regla, mueve, flat, fflat)
+
+        m = np.flatnonzero(mueve)
+        self._reclamos = {"destino": fflat[m], "id": r["id"][m], "ori": ori[m],
+                          "lado": r["lado"][m], "kills": r["kills"][m]}
+        xd = self._reclamos["destino"] // (N * N)
+        bordes = {-1: (xd == self.x0 - 1) | (xd == self.x0), 1: (xd == self.x1 - 1) | (xd == self.x1)}
+        return {lado: {k: v[sel] for k, v in self._reclamos.items()} for lado, sel in bordes.items()}
+
+    def resolver_robots(self, recibidos: List[Dict[str, np.ndarray]]) -> Tuple[int, int, int, int]:
+        """
+        Resuelve los reclamos (propios + de las vecinas) y escribe solo celdas propias:
+        salidas, llegadas y monstruos comidos. Un robot que gana una celda de la rebanada
+        vecina pasa a ser de ella (la vecina ve el mismo reclamo ganador y lo incorpora).
+        Devuelve (robots, monstruos, kills, huella parcial).
+        """
+        N, r = self.N, self.r
+        regla, mueve, flat, fflat = self._fase
+        todos = {k: np.concatenate([self._reclamos[k]] + [c[k] for c in recibidos]) for k in self._reclamos}
+        orden = np.lexsort((todos["id"], todos["destino"]))
+        dest_o = todos["destino"][orden]
+        primero = np.ones(len(dest_o), dtype=bool)
+        primero[1:] = dest_o[1:] != dest_o[:-1]
+        ganadores = {k: v[orden[primero]] for k, v in todos.items()}   # uno por destino, ordenados
+
+        m = np.flatnonzero(mueve)
+        gana = ganadores["id"][np.searchsorted(ganadores["destino"], fflat[m])] == r["id"][m]
+        regla[m[~gana]] = R3               # perdió el destino: rota como ante un robot
+        m = m[gana]
+
+        # Rotaciones (R2, R3, R6, R8)
+        rota = _ROTAN[regla]
+        ori, lado = r["ori"], r["lado"]
+        ori[rota] = CICLOS[ori[rota], lado[rota] % 4]
+        lado[rota] = (lado[rota] + 1) % 4
+
+        # Escrituras (orígenes ROBOT y destinos ZL/MONSTRUO no se pisan)
+        propios = {k: v[self._propia(ganadores["destino"])] for k, v in ganadores.items()}
+        gd = propios["destino"]
+        comidos = gd[self.plano[gd] == MONSTRUO]
+        self.plano[flat[m]] = ZL
+        self.plano[gd] = ROBOT
+        self.monstruos = np.setdiff1d(self.monstruos, comidos, assume_unique=True)
+
+        # Robots: se quedan los que no salieron; entran los ganadores de la vecina
+        r["x"][m], r["y"][m], r["z"][m] = np.unravel_index(fflat[m], self.cubo.shape)
+        queda = np.ones(len(flat), dtype=bool)
+        queda[m] = self._propia(fflat[m])
+        entra = ~np.isin(propios["id"], r["id"])
+        ex, ey, ez = np.unravel_index(gd[entra], self.cubo.shape)
+        nuevos = {"id": propios["id"][entra], "x": ex, "y": ey, "z": ez, "ori": propios["ori"][entra],
+                  "lado": propios["lado"][entra], "kills": propios["kills"][entra]}
+        juntos = {k: np.concatenate([r[k][queda], nuevos[k].astype(r[k].dtype)]) for k in r}
+        o = np.argsort(juntos["id"], kind="stable")
+        self.r = {k: v[o] for k, v in juntos.items()}
+
+        rflat = (self.r["x"] * N + self.r["y"]) * N + self.r["z"]
+        huella = _zobrist(rflat, N, ROBOT) ^ _zobrist(self.monstruos, N, MONSTRUO)
+        return len(rflat), len(self.monstruos), int(self.r["kills"].sum()), huella
+
+    def robots(self) -> Dict[str, np.ndarray]:
+        return self.r
+
+
+# ----- Canales hacia las rebanadas -----
+class _Local:
+    """Rebanada en el mismo proceso (mismo protocolo que _Remoto)."""
+
+    def __init__(self, rebanada: Rebanada):
+        self._reb = rebanada
+        self._resp = None
+
+    def enviar(self, metodo: str, *args):
+        self._resp = getattr(self._reb, metodo)(*args)
+
+    def recibir(self):
+        return self._resp
+
+    def cerrar(self):
+        pass
+
+
+def _trabajador(conn, nombre_shm: str, N: int, x0: int, x1: int, robots, monstruos,
+                p: ParamEntorno, semilla: int):
+    shm = SharedMemory(name=nombre_shm)
+    try:
+        cubo = np.ndarray((N, N, N), dtype=np.uint8, buffer=shm.buf)
+        reb = Rebanada(cubo, x0, x1, robots, monstruos, p, semilla)
+        while True:
+            metodo, args = conn.recv()
+            if metodo is None:
+                break
+            conn.send(getattr(reb, metodo)(*args))
+        del reb, cubo
+    finally:
+        shm.close()
+
+
+class _Remoto:
+    def __init__(self, ctx, *args):
+        self._conn, hijo = ctx.Pipe()
+        self._proc = ctx.Process(target=_trabajador, args=(hijo,) + args, daemon=True)
+        self._proc.start()
+        hijo.close()
+
+    def enviar(self, metodo: str, *args):
+        self._conn.send((metodo, args))
+
+    def recibir(self):
+        return self._conn.recv()
+
+    def cerrar(self):
+        try:
+            self._conn.send((None, ()))
+        except (BrokenPipeError, OSError):
+            pass
+        self._proc.join(timeout=5)
+        if self._proc.is_alive():
+            self._proc.terminate()
+
+
+def _todas(canales: list, metodo: str, args_por_canal=None) -> list:
+    """Envía a todas las rebanadas y después espera todas las respuestas (en paralelo)."""
+    for k, c in enumerate(canales):
+        c.enviar(metodo, *(args_por_canal[k] if args_por_canal is not None else ()))
+    return [c.recibir() for c in canales]
+
+
+# ----- Corrida -----
+def simular_rebanadas(params: ParamEntorno, trabajadores: int = 2, T_MAX: int = 200,
+                      S_ESTASIS: int = 20, P_CICLO: int = 1, procesos: bool = True):
+    """
+    Corre un mundo grande repartido en `trabajadores` rebanadas a lo largo de X, cada una
+    en su proceso sobre el cubo en memoria compartida (backend "array"; procesos=False
+    corre las rebanadas en este proceso, con el mismo protocolo).
+
+    Mundo inicial: el mismo que simular (construir_entorno + colocar_agentes con los
+    flujos de params.seed). Cada tick:
+      1. monstruos con el motor "paralelo" (se mueven a la vez; se fusionan los de igual
+         destino), con sorteos por (celda, tick) derivados de la semilla;
+      2. robots con la semántica de RobotFleet (todos sensan el estado al inicio de la
+         fase; si varios avanzan a la misma celda gana el de menor id, esté en la rebanada
+         que esté; una aniquilación R1 reserva su celda).
+    Lo que cruza un borde (monstruos que llegan, reclamos sobre las capas de borde y los
+    robots que ganan una celda vecina) se intercambia por el proceso principal, que
+    además separa las fases y evalúa las paradas (sin robots, sin monstruos, estasis o
+    ciclo con la huella Zobrist, t_max). Ninguna decisión depende de la partición: el
+    resultado es el mismo con cualquier cantidad de trabajadores.
+    Los robots no llevan memoria episódica. Devuelve (cubo, robots_vivos, ResultadoSimulacion).
+    """
+    p = replace(params, backend="array")
+    flujos = FlujosRNG.desde_semilla(p.seed)
+    inicial = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion()
+    colocar_agentes(inicial, p, indice, flujos.colocacion)
+    semilla = flujos.dinamica.getrandbits(64)
+    N = p.N
+
+    pos = np.array(sorted(indice.robots), dtype=np.int64).reshape(-1, 3)
+    robots = {"id": np.arange(len(pos), dtype=np.int64), "x": pos[:, 0], "y": pos[:, 1], "z": pos[:, 2],
+              "ori": np.zeros(len(pos), dtype=np.int8), "lado": np.zeros(len(pos), dtype=np.int8),
+              "kills": np.zeros(len(pos), dtype=np.int64)}
+    mpos = np.array(sorted(indice.monstruos), dtype=np.int64).reshape(-1, 3)
+    monstruos = (mpos[:, 0] * N + mpos[:, 1]) * N + mpos[:, 2]
+
+    shm = SharedMemory(create=True, size=max(1, inicial.nbytes))
+    canales = []
+    try:
+        cubo = np.ndarray(inicial.shape, dtype=np.uint8, buffer=shm.buf)
+        cubo[...] = inicial
+        ctx = get_context()
+        for x0, x1 in limites(N, trabajadores):
+            sel = (robots["x"] >= x0) & (robots["x"] < x1)
+            mias = {k: v[sel] for k, v in robots.items()}
+            mx = monstruos // (N * N)
+            args = (x0, x1, mias, monstruos[(mx >= x0) & (mx < x1)], p, semilla)
+            if procesos:
+                canales.append(_Remoto(ctx, shm.name, N, *args))
+            else:
+                canales.append(_Local(Rebanada(cubo, *args)))
+        W = len(canales)
+
+        estasis = DetectorEstasis(S_ESTASIS, P_CICLO)
+        estasis.iniciar(indice.huella)
+        motivo, ticks = "t_max", 0
+        n_robots = n_monstruos = kills = 0
+        mueven = p.K_monstruo > 0 and p.p_monstruo > 0.0
+        for t in range(1, T_MAX + 1):
+            ticks = t
+            # 1) Monstruos: destinos → llegadas a cada rebanada → escritura
+            if mueven and t % p.K_monstruo == 0:
+                salidas = _todas(canales, "decidir_monstruos", [(t,)] * W)
+                llegadas = [[salidas[k - 1][1]] if k > 0 else [] for k in range(W)]
+                for k in range(W - 1):
+                    llegadas[k].append(salidas[k + 1][-1])
+                _todas(canales, "aplicar_monstruos", [(ll,) for ll in llegadas])
+
+            # 2) Robots: decisiones → reclamos de borde a cada vecina → resolución y escritura
+            reclamos = _todas(canales, "decidir_robots")
+            recibidos = [[] for _ in range(W)]
+            for k in range(W):
+                if k > 0:
+                    recibidos[k - 1].append(reclamos[k][-1])
+                if k < W - 1:
+                    recibidos[k + 1].append(reclamos[k][1])
+            partes = _todas(canales, "resolver_robots", [(rc,) for rc in recibidos])
+            n_robots = sum(x[0] for x in partes)
+            n_monstruos = sum(x[1] for x in partes)
+            kills = sum(x[2] for x in partes)
+            huella = 0
+            for x in partes:
+                huella ^= x[3]
+
+            # 3) Paradas globales (mismo orden que simular)
+            if n_robots == 0:
+                motivo = "sin_robots"
+                break
+            if n_monstruos == 0:
+                motivo = "sin_monstruos"
+                break
+            if estasis.registrar(huella):
+                motivo = "estasis" if estasis.periodo == 1 else "ciclo"
+                break
+
+        finales = _todas(canales, "robots")
+        final = np.array(cubo)
+        del cubo
+    finally:
+        for c in canales:
+            c.cerrar()
+        shm.close()
+        shm.unlink()
+
+    r = {k: np.concatenate([f[k] for f in finales]) for k in finales[0]} if finales else robots
+    o = np.argsort(r["id"], kind="stable")
+    vivos = [Robot(int(x), int(y), int(z), orientacion=int(ori), lado_idx=int(lado), kills=int(k))
+             for x, y, z, ori, lado, k in zip(*(r[c][o].tolist() for c in ("x", "y", "z", "ori", "lado", "kills")))]
+    n_ini = p.Nrobot if p.Nrobot > 0 else 1
+    resultado = ResultadoSimulacion(
+        kills=kills,
+        eficiencia_pct=(100.0 * kills / p.Nmonstruos) if p.Nmonstruos > 0 else 0.0,
+        eficiencia_media_por_robot=kills / n_ini,
+        ticks=ticks,
+        motivo_parada=motivo,
+        robots_vivos=len(vivos),
+        monstruos_restantes=n_monstruos,
+    )
+    return final, vivos, resultado
@@ -0,0 +1,106 @@
+# =====================================================
+# render.py — Salida por pantalla del modo verbose (buffer único por frame)
+# =====================================================
+from typing import List
+import sys
+import time
+
+from entorno import formatear_capas, es_cubo_array, SIMBOLOS, np
+
+MODOS_RENDER = ("completo", "diferencial", "resumen")
+
+_BORRAR_PANTALLA = "\x1b[2J\x1b[H"
+_BORRAR_LINEA = "\x1b[2K"
+_BORRAR_HASTA_FIN = "\x1b[J"
+
+
+def _ir(fila: int, col: int) -> str:
+    return f"\x1b[{fila};{col}H"
+
+
+class Renderizador:
+    """
+    Arma cada frame en un único buffer y lo escribe con una sola llamada.
+
+    Modos:
+      - "completo":    título + cubo por capas + líneas de estado (mismo texto que antes).
+      - "diferencial": el primer frame dibuja todo; los siguientes reescriben en su lugar
+                       (secuencias ANSI) solo las celdas que cambiaron y las líneas de estado.
+      - "resumen":     solo título y líneas de estado, sin volcar el cubo.
+    Limitación de frames: solo se dibujan los ticks múltiplos de `cada` y, con `fps_max`,
+    como mucho esa cantidad de frames por segundo. `forzar=True` ignora ambos límites.
+    """
+
+    def __init__(self, modo: str = "completo", cada: int = 1, fps_max: float | None = None,
+                 salida=None):
+        if modo not in MODOS_RENDER:
+            raise ValueError(f"modo debe ser uno de {MODOS_RENDER}.")
+        assert cada >= 1, "cada debe ser >= 1."
+        self.modo = modo
+        self.cada = cada
+        self.fps_max = fps_max
+        self.salida = salida if salida is not None else sys.stdout
+        self.ultimo_t = None
+        self._ultimo_instante = None
+        self._base = None          # modo diferencial: huella del último frame dibujado
+        self._N = 0
+
+    def toca(self, t: int) -> bool:
+        if t % self.cada != 0:
+            return False
+        if self.fps_max and self._ultimo_instante is not None:
+            return time.monotonic() - self._ultimo_instante >= 1.0 / self.fps_max
+        return True
+
+    def frame(self, cubo, titulo: str, lineas: List[str], t: int | None = None,
+              indice=None, forzar: bool = False) -> bool:
+        """Dibuja un frame si corresponde; devuelve True si se escribió algo."""
+        if not forzar and t is not None and not self.toca(t):
+            return False
+        if self.modo == "resumen":
+            texto = titulo + "\n" + "\n".join(lineas) + "\n"
+        elif self.modo == "completo":
+            texto = titulo + "\n" + formatear_capas(cubo) + "\n".join(lineas) + "\n"
+        else:
+            texto = self._diferencial(cubo, titulo.strip("\n"), lineas, indice)
+        self.salida.write(texto)
+        self.salida.flush()
+        self.ultimo_t = t
+        self._ultimo_instante = time.monotonic()
+        return True
+
+    # ----- Modo diferencial -----
+    def _huella(self, cubo, indice):
+        if indice is not None:
+            return (set(indice.robots), set(indice.monstruos))
+        if es_cubo_array(cubo):
+            return cubo.copy()
+        return [[fila[:] for fila in plano] for plano in cubo]
+
+    def _cambios(self, cubo, indice):
+        if indice is not None:
+            robots, monstruos = self._base
+            return (robots ^ indice.robots) | (monstruos ^ indice.monstruos)
+        if es_cubo_array(cubo):
+            return [tuple(c) for c in np.argwhere(cubo != self._base).tolist()]
+        N = self._N
+        return [(x, y, z) for x in range(N) for y in range(N) for z in range(N)
+                if cubo[x][y][z] != self._base[x][y][z]]
+
+    def _diferencial(self, cubo, titulo: str, lineas: List[str], indice) -> str:
+        N = len(cubo)
+        estado = "\n".join(_BORRAR_LINEA + l for l in lineas) + "\n"
+        fin_cubo = 2 + N * (N + 2)          # línea 1: título; capas desde la línea 2
+        if self._base is None or N != self._N:
+            self._N = N
+            self._base = self._huella(cubo, indice)
+            return _BORRAR_PANTALLA + titulo + "\n" + formatear_capas(cubo) + estado
+
+        partes = [_ir(1, 1), _BORRAR_LINEA, titulo]
+        for (x, y, z) in self._cambios(cubo, indice):
+            fila = 3 + z * (N + 2) + y     # "z = k" en 2 + z*(N+2), luego N filas
+            partes.append(_ir(fila, 2 * x + 1) + SIMBOLOS.get(cubo[x][y][z], "?"))
+        partes.append(_ir(fin_cubo, 1) + _BORRAR_HASTA_FIN + estado)
+        self._base = self._huella(cubo, indice)
+        return "".join(partes)
+
@@ -0,0 +1,519 @@
+# =====================================================
+# repeticion.py — Registro de repetición (mundo inicial + deltas por tick) y lector con salto
+# =====================================================
+from array import array
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import accumulate, chain
+from operator import sub
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import argparse
+import pickle
+import struct
+import sys
+import zlib
+
+from agente import Robot
+from entorno import ParamEntorno, MONSTRUO, es_cubo_array, np
+from puntos_control import _imagen, _cubo_desde_imagen
+from render import Renderizador, MODOS_RENDER
+
+VERSION = 1
+MAGIA = b"REPLAY01"
+COLA = b"REPIDX01"                          # fin de archivo cerrado: offset del índice + COLA
+_REGISTRO = struct.Struct("<QB")            # largo de los datos (comprimidos), tipo
+_COLA = struct.Struct("<Q8s")
+_DELTA = struct.Struct("<IIIII")            # t, fusiones, celdas, robots cambiados, destruidos
+_CLAVE = struct.Struct("<III")              # t, robots registrados, celdas distintas del mundo inicial
+T_CABECERA, T_MUNDO, T_CLAVE, T_DELTA, T_INDICE = b"H"[0], b"M"[0], b"K"[0], b"D"[0], b"I"[0]
+LOTE = 32                                   # deltas por registro (se comprimen juntos)
+_TROZO = struct.Struct("<I")                # largo de cada delta dentro de un registro
+DENSO = 300                                 # con más de N³/DENSO celdas marcadas se compara el cubo entero
+
+
+# ----- Codificación -----
+def _diferencias(valores) -> bytes:
+    """Secuencia creciente como diferencias sucesivas (uint32): números chicos que zlib comprime bien."""
+    if np is not None and isinstance(valores, np.ndarray):
+        return np.diff(valores, prepend=0).astype(np.uint32).tobytes()
+    return array("I", map(sub, valores, chain((0,), valores))).tobytes()
+
+
+def _u32(valores) -> bytes:
+    if np is not None and isinstance(valores, np.ndarray):
+        return valores.astype(np.uint32).tobytes()
+    return array("I", valores).tobytes()
+
+
+def _enteros(datos, pos: int, n: int) -> Tuple[array, int]:
+    a = array("I")
+    a.frombytes(datos[pos:pos + 4 * n])
+    return a, pos + 4 * n
+
+
+@dataclass
+class EventosTick:
+    """Lo que cambió en un tick, tal como quedó en el registro."""
+    t: int
+    fusiones: int                               # monstruos perdidos por fusión en el paso de monstruos
+    celdas: List[Tuple[int, int]]               # (índice plano, valor nuevo) de cada celda cambiada
+    robots: List[Tuple[int, int, int, int]]     # (id, índice plano, orientación, kills) de los que cambiaron
+    destruidos: List[int]                       # ids aniquilados (R1) en el tick
+
+    @property
+    def kills(self) -> int:
+        return len(self.destruidos)
+
+
+def _codificar_delta(t: int, fusiones: int, planos, valores: bytes, robots: tuple, destruidos) -> bytes:
+    """
+    Delta de un tick: `planos` (ordenados) y `valores` son las celdas cambiadas; `robots`,
+    las columnas (ids ordenados, planos, orientaciones, kills) de los robots que cambiaron.
+    Las secuencias pueden ser listas o arreglos de numpy.
+    """
+    ids, r_planos, oris, kills = robots
+    return b"".join((
+        _DELTA.pack(t, fusiones, len(planos), len(ids), len(destruidos)),
+        _diferencias(planos), valores,
+        _diferencias(ids), _u32(r_planos), bytes(oris), _u32(kills),
+        _diferencias(destruidos),
+    ))
+
+
+def _decodificar_delta(datos: bytes) -> EventosTick:
+    t, fusiones, nc, nr, nd = _DELTA.unpack_from(datos)
+    pos = _DELTA.size
+    dc, pos = _enteros(datos, pos, nc)
+    valores = datos[pos:pos + nc]
+    pos += nc
+    ids, pos = _enteros(datos, pos, nr)
+    planos, pos = _enteros(datos, pos, nr)
+    oris = datos[pos:pos + nr]
+    pos += nr
+    kills, pos = _enteros(datos, pos, nr)
+    dd, pos = _enteros(datos, pos, nd)
+    return EventosTick(
+        t=t, fusiones=fusiones,
+        celdas=list(zip(accumulate(dc), valores)),
+        robots=list(zip(accumulate(ids), planos, oris, kills)),
+        destruidos=list(accumulate(dd)),
+    )
+
+
+# ----- Grabación -----
+class GrabadorRepeticion:
+    """
+    Graba una corrida de simular en un único archivo binario de solo agregado:
+    cabecera (params), el mundo inicial (cubo completo, una sola vez) y luego, por tick,
+    un delta con las celdas que cambiaron (movimientos, aniquilaciones y fusiones de
+    monstruos), los robots cuya posición, orientación o kills cambió y los destruidos.
+    Cada `clave_cada` ticks (y al inicio) agrega un fotograma clave: las celdas que
+    difieren del mundo inicial más la tabla completa de robots. Al cerrar, un índice de
+    los fotogramas clave para que el lector salte sin recorrer el archivo.
+
+    Las celdas cambiadas no se buscan en el cubo: las marca el IndiceOcupacion (ver
+    `cambios`) en cada alta o baja de agente, así el costo por tick es proporcional a lo
+    que cambió. Como en los puntos de control, la captura ocurre en el bucle de ticks y
+    la compresión y la escritura, en un hilo aparte. Los deltas se agrupan de a LOTE por
+    registro (un fotograma clave cierra el grupo): si la corrida se interrumpe sin cerrar,
+    el lector llega hasta el último registro completo en disco. Si una escritura falla,
+    el error se relanza al encolar la siguiente o en `cerrar` (que entonces no agrega
+    el índice: el archivo queda como el de una corrida interrumpida).
+    """
+
+    def __init__(self, ruta: str, params: ParamEntorno, clave_cada: int = 100):
+        assert clave_cada >= 1, "clave_cada debe ser >= 1."
+        self.ruta = Path(ruta)
+        self.N = params.N
+        self.clave_cada = clave_cada
+        self.cambios: set = set()           # se asigna a IndiceOcupacion.cambios
+        self._claves: List[Tuple[int, int]] = []   # (t, offset) de cada fotograma clave
+        self._lote: list = []
+        self._hilo = ThreadPoolExecutor(max_workers=1)
+        self._pendientes: List[Future] = []
+        self._archivo = open(self.ruta, "wb")
+        self._archivo.write(MAGIA)
+        self._pos = len(MAGIA)
+        self._encolar(self._escribir, T_CABECERA, pickle.dumps(
+            {"version": VERSION, "params": params, "clave_cada": clave_cada},
+            protocol=pickle.HIGHEST_PROTOCOL))
+
+    # ----- Estado de los robots -----
+    def iniciar(self, t: int, cubo, todos: List[Robot], robots: List[Robot], flota=None):
+        """Mundo y fotograma clave del estado inicial (o del tick reanudado)."""
+        self._flota = flota
+        self._todos = todos
+        if flota is None:
+            self._ids = {id(r): i for i, r in enumerate(todos)}
+            self._estado = [self._de(r) for r in todos]
+            self._vivos = {self._ids[id(r)] for r in robots}
+        else:
+            self._previo = self._de_flota(flota)
+        self.cambios.clear()
+        imagen = _imagen(cubo)
+        self._encolar(self._escribir, T_MUNDO, imagen)
+        if es_cubo_array(cubo):
+            self._inicial = cubo.reshape(-1).copy()
+            self._previa = cubo.reshape(-1).copy()     # para comparar cuando los cambios son muchos
+        else:
+            self._inicial = imagen
+            self._previa = None
+        self._clave(t, cubo)
+
+    def _de(self, r: Robot) -> Tuple[int, int, int]:
+        return (r.x * self.N + r.y) * self.N + r.z, r.ori, r.kills
+
+    def _de_flota(self, flota) -> tuple:
+        plano = (flota.x * self.N + flota.y) * self.N + flota.z
+        return plano, flota.ori.copy(), flota.kills.copy(), flota.vivo.copy()
+
+    def _tabla(self) -> Tuple[List[Tuple[int, int, int]], List[bool]]:
+        if self._flota is None:
+            return self._estado, [i in self._vivos for i in range(len(self._todos))]
+        plano, ori, kills, vivo = self._previo
+        return list(zip(plano.tolist(), ori.tolist(), kills.tolist())), vivo.tolist()
+
+    def _robots_cambiados(self, robots: List[Robot]) -> Tuple[tuple, list]:
+        """(columnas de los robots cambiados, ids destruidos), ver _codificar_delta."""
+        if self._flota is not None:
+            previo = self._previo
+            ahora = self._de_flota(self._flota)
+            idx = ((ahora[0] != previo[0]) | (ahora[1] != previo[1]) | (ahora[2] != previo[2])).nonzero()[0]
+            destruidos = (previo[3] & ~ahora[3]).nonzero()[0]
+            self._previo = ahora
+            return (idx, ahora[0][idx], ahora[1][idx], ahora[2][idx]), destruidos
+
+        ids, estado = self._ids, self._estado
+        cambiados = []
+        for r in robots:
+            i = ids[id(r)]
+            s = self._de(r)
+            if s != estado[i]:
+                estado[i] = s
+                cambiados.append(i)
+        destruidos = []
+        if len(robots) != len(self._vivos):
+            ahora = {ids[id(r)] for r in robots}
+            destruidos = sorted(self._vivos - ahora)
+            self._vivos = ahora
+            for i in destruidos:
+                estado[i] = self._de(self._todos[i])
+            cambiados = sorted(set(cambiados).union(destruidos))
+        elif cambiados and cambiados != sorted(cambiados):
+            cambiados.sort()
+        filas = [estado[i] for i in cambiados]
+        return (cambiados, [f[0] for f in filas], [f[1] for f in filas], [f[2] for f in filas]), destruidos
+
+    # ----- Por tick -----
+    def tick(self, t: int, cubo, fusiones: int, robots: List[Robot]):
+        """Registra el delta del tick `t` (al final de la fase de robots)."""
+        planos, valores = self._celdas(cubo)
+        self.cambios.clear()
+        cambiados, destruidos = self._robots_cambiados(robots)
+        self._lote.append((t, fusiones, planos, valores, cambiados, destruidos))
+        if t % self.clave_cada == 0:
+            self._clave(t, cubo)
+        elif len(self._lote) >= LOTE:
+            self._vaciar_lote()
+
+    def _celdas(self, cubo):
+        """(índices planos ordenados, valores) de las celdas que cambiaron en el tick."""
+        N, cambios = self.N, self.cambios
+        if self._previa is None:
+            NN = N * N
+            planos = sorted([(x * N + y) * N + z for x, y, z in cambios])
+            return planos, bytes(cubo[p // NN][p // N % N][p % N] for p in planos)
+        plano = cubo.reshape(-1)
+        if len(cambios) * DENSO > plano.size:
+            # muchos cambios para el tamaño del cubo: comparar con la copia es más barato
+            planos = np.flatnonzero(plano != self._previa)
+        else:
+            c = np.fromiter(chain.from_iterable(cambios), dtype=np.int64, count=3 * len(cambios))
+            c = c.reshape(-1, 3)
+            planos = np.sort((c[:, 0] * N + c[:, 1]) * N + c[:, 2])
+        valores = plano[planos]
+        self._previa[planos] = valores
+        return planos, valores.tobytes()
+
+    def _vaciar_lote(self):
+        if self._lote:
+            self._encolar(self._escribir_deltas, self._lote)
+            self._lote = []
+
+    def _clave(self, t: int, cubo):
+        self._vaciar_lote()
+        if self._previa is not None:
+            plano = cubo.reshape(-1)
+            planos = np.flatnonzero(plano != self._inicial)
+            valores = plano[planos].tobytes()
+        else:
+            imagen = _imagen(cubo)
+            planos = [i for i, (a, b) in enumerate(zip(imagen, self._inicial)) if a != b]
+            valores = bytes(imagen[i] for i in planos)
+        tabla, vivos = self._tabla()
+        datos = b"".join((
+            _CLAVE.pack(t, len(tabla), len(planos)), _diferencias(planos), valores, bytes(vivos),
+            array("I", [s[0] for s in tabla]).tobytes(), bytes(s[1] for s in tabla),
+            array("I", [s[2] for s in tabla]).tobytes(),
+        ))
+        self._encolar(self._escribir, T_CLAVE, datos, t)
+
+    def _encolar(self, funcion, *args):
+        self._revisar()
+        self._pendientes.append(self._hilo.submit(funcion, *args))
+
+    def _revisar(self):
+        """Relanza el error de una escritura ya terminada y olvida las que salieron bien."""
+        pendientes = []
+        for fut in self._pendientes:
+            if not fut.done():
+                pendientes.append(fut)
+            elif fut.exception() is not None:
+                self._pendientes = []
+                raise fut.exception()
+        self._pendientes = pendientes
+
+    def _escribir_deltas(self, lote: list):
+        trozos = []
+        for delta in lote:
+            d = _codificar_delta(*delta)
+            trozos += (_TROZO.pack(len(d)), d)
+        self._escribir(T_DELTA, b"".join(trozos))
+
+    def _escribir(self, tipo: int, datos: bytes, t_clave: int | None = None):
+        comprimido = zlib.compress(datos, 1)
+        if t_clave is not None:
+            self._claves.append((t_clave, self._pos))
+        self._archivo.write(_REGISTRO.pack(len(comprimido), tipo) + comprimido)
+        self._pos += _REGISTRO.size + len(comprimido)
+
+    def cerrar(self):
+        """
+        Espera las escrituras pendientes, agrega el índice de fotogramas clave y cierra;
+        si alguna escritura falló, cierra sin índice y relanza su error.
+        """
+        try:
+            self._vaciar_lote()
+            self._hilo.shutdown(wait=True)
+            self._revisar()
+            inicio = self._pos
+            self._escribir(T_INDICE, pickle.dumps(self._claves, protocol=pickle.HIGHEST_PROTOCOL))
+            self._archivo.write(_COLA.pack(inicio, COLA))
+        finally:
+            self._hilo.shutdown(wait=True)
+            self._archivo.close()
+
+
+# ----- Lectura -----
+@dataclass
+class Fotograma:
+    """Mundo reconstruido al final del tick `t`."""
+    t: int
+    cubo: object                                  # mismo backend que la corrida ("lista" o "array")
+    robots: Dict[int, Robot] = field(default_factory=dict)   # vivos, por id (orden de registro)
+    monstruos: int = 0
+
+
+class LectorRepeticion:
+    """
+    Lee un archivo de GrabadorRepeticion. `fotograma(t)` reconstruye el mundo al final
+    del tick t partiendo del fotograma clave anterior más cercano y aplicando solo los
+    deltas desde ahí (a lo sumo `clave_cada`); `recorrer` avanza tick a tick sin volver a
+    saltar. Un archivo sin cerrar (corrida interrumpida) se indexa recorriendo los
+    encabezados de registro, sin descomprimir, y se lee hasta el último registro completo.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = Path(ruta)
+        self._f = open(self.ruta, "rb")
+        try:
+            if self._f.read(len(MAGIA)) != MAGIA:
+                raise ValueError(f"{ruta} no es un registro de repetición.")
+            cabecera = self._leer(len(MAGIA))
+            if cabecera is None:
+                raise ValueError(f"{ruta} no tiene cabecera.")
+            _, datos, pos = cabecera
+            cabecera = pickle.loads(datos)
+            self.params: ParamEntorno = cabecera["params"]
+            self.clave_cada: int = cabecera["clave_cada"]
+            self.N = self.params.N
+            mundo = self._leer(pos)
+            if mundo is None or mundo[0] != T_MUNDO:
+                raise ValueError(f"{ruta} no tiene el mundo inicial.")
+            self._mundo = mundo[1]
+            self._claves = self._indice()
+            if not self._claves:
+                raise ValueError(f"{ruta} no tiene ningún fotograma clave.")
+            self.t_inicial = self._claves[0][0]
+            self.t_final = self._ultimo_t()
+        except BaseException:
+            # el constructor no llega a devolver el lector: nadie más cerraría el archivo
+            self._f.close()
+            raise
+
+    def cerrar(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # ----- Registros -----
+    def _leer(self, pos: int, descomprimir: bool = True):
+        """(tipo, datos, posición del siguiente) o None si no hay un registro completo en pos."""
+        self._f.seek(pos)
+        cab = self._f.read(_REGISTRO.size)
+        if len(cab) < _REGISTRO.size:
+            return None
+        n, tipo = _REGISTRO.unpack(cab)
+        if not descomprimir:
+            return tipo, None, pos + _REGISTRO.size + n
+        datos = self._f.read(n)
+        if len(datos) < n:
+            return None
+        try:
+            return tipo, zlib.decompress(datos), pos + _REGISTRO.size + n
+        except zlib.error:
+            return None
+
+    def _indice(self) -> List[Tuple[int, int]]:
+        tam = self.ruta.stat().st_size
+        if tam >= _COLA.size:
+            self._f.seek(tam - _COLA.size)
+            inicio, cola = _COLA.unpack(self._f.read(_COLA.size))
+            if cola == COLA:
+                return pickle.loads(self._leer(inicio)[1])
+        # sin índice: se recorren los encabezados (solo se descomprime el de cada clave)
+        claves = []
+        pos = len(MAGIA)
+        while (reg := self._leer(pos, descomprimir=False)) is not None and reg[2] <= tam:
+            if reg[0] == T_CLAVE:
+                clave = self._leer(pos)
+                if clave is None:
+                    break
+                claves.append((_CLAVE.unpack_from(clave[1])[0], pos))
+            pos = reg[2]
+        return claves
+
+    def _ultimo_t(self) -> int:
+        t_clave, pos = self._claves[-1]
+        t = t_clave
+        for datos in self._deltas(pos):
+            t = _DELTA.unpack_from(datos)[0]
+        return t
+
+    def _deltas(self, pos: int) -> Iterator[bytes]:
+        """Deltas codificados de los registros desde `pos` en adelante, en orden de tick."""
+        while (reg := self._leer(pos)) is not None and reg[0] != T_INDICE:
+            tipo, datos, pos = reg
+            if tipo != T_DELTA:
+                continue
+            k = 0
+            while k < len(datos):
+                (n,) = _TROZO.unpack_from(datos, k)
+                k += _TROZO.size
+                yield datos[k:k + n]
+                k += n
+
+    # ----- Reconstrucción -----
+    def _desde_clave(self, datos: bytes):
+        t, n, nc = _CLAVE.unpack_from(datos)
+        pos = _CLAVE.size
+        dc, pos = _enteros(datos, pos, nc)
+        imagen = bytearray(self._mundo)
+        for c, v in zip(accumulate(dc), datos[pos:pos + nc]):
+            imagen[c] = v
+        pos += nc
+        vivos = bytearray(datos[pos:pos + n])
+        pos += n
+        planos, pos = _enteros(datos, pos, n)
+        oris = bytearray(datos[pos:pos + n])
+        pos += n
+        kills, pos = _enteros(datos, pos, n)
+        return t, [imagen, vivos, planos, oris, kills]
+
+    @staticmethod
+    def _aplicar(estado: list, ev: EventosTick):
+        imagen, vivos, planos, oris, kills = estado
+        for c, v in ev.celdas:
+            imagen[c] = v
+        for i, p, o, k in ev.robots:
+            planos[i], oris[i], kills[i] = p, o, k
+        for i in ev.destruidos:
+            vivos[i] = 0
+
+    def _fotograma(self, t: int, estado: list) -> Fotograma:
+        imagen, vivos, planos, oris, kills = estado
+        N = self.N
+        robots = {}
+        for i, vivo in enumerate(vivos):
+            if vivo:
+                x, r = divmod(planos[i], N * N)
+                y, z = divmod(r, N)
+                robots[i] = Robot(x, y, z, orientacion=oris[i], kills=kills[i])
+        return Fotograma(t=t, cubo=_cubo_desde_imagen(imagen, N, self.params.backend),
+                         robots=robots, monstruos=imagen.count(MONSTRUO))
+
+    def _ticks(self, desde: int, hasta: int) -> Iterator[Tuple[int, list, EventosTick | None]]:
+        """Estado (mutable, compartido) al final de cada tick de [desde, hasta], con su delta."""
+        if not self.t_inicial <= desde <= hasta:
+            raise ValueError(f"ticks fuera del registro ({self.t_inicial}..{self.t_final}).")
+        k = bisect_right(self._claves, (desde, float("inf"))) - 1
+        t_clave, pos = self._claves[k]
+        tipo, datos, pos = self._leer(pos)
+        t, estado = self._desde_clave(datos)
+        if t >= desde:
+            yield t, estado, None
+        for datos in self._deltas(pos):
+            ev = _decodificar_delta(datos)
+            if ev.t > hasta:
+                return
+            self._aplicar(estado, ev)
+            if ev.t >= desde:
+                yield ev.t, estado, ev
+
+    def fotograma(self, t: int) -> Fotograma:
+        """Mundo al final del tick t (t_inicial ≤ t ≤ t_final)."""
+        if t > self.t_final:
+            raise ValueError(f"tick {t} fuera del registro ({self.t_inicial}..{self.t_final}).")
+        for tt, estado, _ in self._ticks(t, t):
+            return self._fotograma(tt, estado)
+
+    def recorrer(self, desde: int | None = None, hasta: int | None = None) -> Iterator[Fotograma]:
+        """Fotogramas de los ticks desde..hasta, aplicando un delta por paso."""
+        desde = self.t_inicial if desde is None else desde
+        hasta = self.t_final if hasta is None else min(hasta, self.t_final)
+        for t, estado, _ in self._ticks(desde, hasta):
+            yield self._fotograma(t, estado)
+
+    def eventos(self, desde: int, hasta: int | None = None) -> List[EventosTick]:
+        """Deltas de los ticks desde..hasta (sin armar fotogramas)."""
+        hasta = desde if hasta is None else hasta
+        return [ev for _, _, ev in self._ticks(max(desde, self.t_inicial + 1), hasta) if ev is not None]
+
+
+# ----- CLI -----
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Muestra el mundo de un registro de repetición.")
+    ap.add_argument("ruta")
+    ap.add_argument("--t", type=int, nargs="+", default=None, help="ticks a mostrar (por defecto, el último)")
+    ap.add_argument("--render", choices=MODOS_RENDER, default="completo")
+    a = ap.parse_args(argv)
+    with LectorRepeticion(a.ruta) as lector:
+        print(f"Ticks {lector.t_inicial}..{lector.t_final}, fotograma clave cada {lector.clave_cada}.")
+        renderizador = Renderizador(a.render)
+        for t in a.t if a.t is not None else [lector.t_final]:
+            f = lector.fotograma(t)
+            renderizador.frame(f.cubo, f"--- Tick {t} ---", [
+                f"Robots vivos: {[(r.x, r.y, r.z, r.orientacion) for r in f.robots.values()]}",
+                f"Monstruos: {f.monstruos}",
+            ], forzar=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,15 +2,36 @@
 # simulacion.py — orquestación de la simulación
 # =====================================================
 from typing import Tuple, List
+from collections import deque
+from dataclasses import dataclass, field
+import asyncio
 import csv
+import inspect
+import threading
 from pathlib import Path
 
 from entorno import (
     ParamEntorno, construir_entorno, colocar_agentes,
-    obtener_posiciones, imprimir_capas, step_entorno,
-    ROBOT, MONSTRUO
+    obtener_posiciones, step_entorno,
+    IndiceOcupacion, CampoMonstruos, ComponentesLibres, FlujosRNG, ROBOT, MONSTRUO
 )
-from agente import Robot
+from agente import Robot, MemoriaRobot, REGLAS, R_MONSTRUO_EN_MI_CELDA
+from exportador import ExportadorMemorias, COLUMNAS_CSV, fila_csv
+from render import Renderizador
+from puntos_control import EscritorPuntosControl, EstadoSimulacion, leer_punto_control
+from repeticion import GrabadorRepeticion
+import avance_rapido
+from instrumentacion import (
+    MetricasSimulacion, F_DELTAS, F_ENTORNO, F_ROBOTS, F_VOLCADO, F_RENDER, F_PARADAS, F_ESTASIS,
+    F_PUNTO_CONTROL,
+)
+
+# Modos de exportación de memorias en simular
+#   "csv":          al final, un CSV por robot sobreviviente (comportamiento original)
+#   "binario":      durante la corrida, columnar binario de todos los robots (ExportadorMemorias)
+#   "csv_continuo": durante la corrida, un único CSV de todos los robots
+#   None:           sin exportar
+EXPORTACIONES = ("csv", "binario", "csv_continuo", None)
 
 
 def exportar_memoria_robot(robot: Robot, carpeta: str = "memorias") -> str:
@@ -23,41 +44,143 @@ def exportar_memoria_robot(robot: Robot, carpeta: str = "memorias") -> str:
     ruta = Path(carpeta) / nombre
     with open(ruta, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow([
-            "t", "regla", "accion", "frontal_estado", "percepcion",
-            "pos_pre", "ori_pre", "pos_post", "ori_post", "kills"
-        ])
-        for row in robot.memoria:
-            w.writerow([
-                row.get("t"),
-                row.get("regla"),
-                row.get("accion"),
-                row.get("frontal_estado"),
-                row.get("percepcion"),
-                row.get("pos_pre"),
-                row.get("ori_pre"),
-                row.get("pos_post"),
-                row.get("ori_post"),
-                row.get("kills"),
-            ])
+        w.writerow(COLUMNAS_CSV)
+        w.writerows(fila_csv(row) for row in robot.memoria)
     return str(ruta)
 
 
-def snapshot_estado(cubo) -> tuple:
+def snapshot_estado(cubo, indice: IndiceOcupacion | None = None) -> tuple:
     """
     “Huella” inmutable del estado para detectar estasis:
     posiciones de robots y monstruos (ordenadas).
+    Con índice de ocupación se arma en O(agentes) sin recorrer el cubo.
     """
+    if indice is not None:
+        return (tuple(sorted(indice.robots)), tuple(sorted(indice.monstruos)))
     robots_pos = tuple(sorted(obtener_posiciones(cubo, ROBOT)))
     mons_pos = tuple(sorted(obtener_posiciones(cubo, MONSTRUO)))
     return (robots_pos, mons_pos)
 
 
+class DetectorEstasis:
+    """
+    Detector de estasis sobre la huella Zobrist del índice (compara enteros).
+    Con P_CICLO = 1 reproduce el criterio original: S_ESTASIS ticks seguidos con
+    el mismo estado que el tick anterior. Con P_CICLO > 1 detecta además ciclos:
+    para cada periodo p ≤ P_CICLO cuenta los ticks seguidos cuyo estado coincide
+    con el de p ticks atrás, y declara estasis cuando algún contador llega a S_ESTASIS.
+    """
+
+    def __init__(self, S_ESTASIS: int, P_CICLO: int = 1):
+        assert P_CICLO >= 1, "P_CICLO debe ser >= 1."
+        self.S_ESTASIS = S_ESTASIS
+        self.P_CICLO = P_CICLO
+        self.historial = deque(maxlen=P_CICLO)
+        self.contadores = [0] * (P_CICLO + 1)   # índice = periodo
+        self.periodo = 0                        # periodo detectado (0 = ninguno)
+
+    def iniciar(self, huella: int):
+        self.historial.clear()
+        self.historial.append(huella)
+        self.contadores = [0] * (self.P_CICLO + 1)
+        self.periodo = 0
+
+    def registrar(self, huella: int) -> bool:
+        """Registra la huella del tick actual; True si hay estasis."""
+        hist = self.historial
+        for p in range(1, len(hist) + 1):
+            if hist[-p] == huella:
+                self.contadores[p] += 1
+                if self.contadores[p] >= self.S_ESTASIS and not self.periodo:
+                    self.periodo = p
+            else:
+                self.contadores[p] = 0
+        hist.append(huella)
+        return self.periodo > 0
+
+    def estado(self) -> tuple:
+        return (list(self.historial), list(self.contadores), self.periodo)
+
+    def restaurar(self, estado: tuple):
+        historial, contadores, periodo = estado
+        self.historial = deque(historial, maxlen=self.P_CICLO)
+        self.contadores = list(contadores)
+        self.periodo = periodo
+
+
+# Motivos de parada (ResultadoSimulacion.motivo_parada)
+MOTIVOS_PARADA = ("sin_robots", "sin_monstruos", "estasis", "ciclo", "t_max", "cancelada", "inalcanzable")
+
+# Opciones de simular que se guardan en los puntos de control (orden en que se desempaquetan)
+OPCIONES = (
+    "T_MAX", "verbose", "S_ESTASIS", "P_CICLO", "motor_robots", "memoria_capacidad",
+    "memoria_muestreo", "exportar", "carpeta_memorias", "volcar_cada", "con_resultado",
+    "render", "render_cada", "render_fps", "punto_control", "punto_control_cada",
+    "detectar_inalcanzable", "avance_rapido", "repeticion", "repeticion_clave_cada",
+    "campo_monstruos",
+)
+
+
+@dataclass
+class ResultadoSimulacion:
+    """Métricas de eficiencia de una corrida (las mismas que imprime `simular`)."""
+    kills: int
+    eficiencia_pct: float
+    eficiencia_media_por_robot: float
+    ticks: int                  # ticks ejecutados
+    motivo_parada: str          # uno de MOTIVOS_PARADA
+    robots_vivos: int
+    monstruos_restantes: int
+    # instrumentación de la corrida (solo con simular(metricas=...))
+    metricas: MetricasSimulacion | None = field(default=None, compare=False, repr=False)
+
+
+@dataclass
+class DeltaTick:
+    """
+    Cambios de un tick, tal como los entrega `iterar` (sin copiar el cubo).
+    Los robots se identifican por su orden de registro (el de la lista inicial).
+    """
+    t: int
+    robots_movidos: List[Tuple[int, tuple, tuple]]   # (id, origen, destino)
+    robots_destruidos: List[int]                      # ids aniquilados por R1
+    monstruos_quitados: List[tuple]                   # celdas que dejaron de tener monstruo
+    monstruos_agregados: List[tuple]                  # celdas que pasaron a tenerlo
+    kills: int
+    fusiones: int
+    reglas: Tuple[int, ...]                           # conteo por regla (orden REGLAS)
+    robots_vivos: int
+    monstruos: int
+    motivo: str | None = None                         # motivo de parada si es el último tick
+
+
 def simular(
     params: ParamEntorno,
     T_MAX: int = 200,
     verbose: bool = True,
-    S_ESTASIS: int = 20
+    S_ESTASIS: int = 20,
+    P_CICLO: int = 1,
+    motor_robots: str = "secuencial",
+    memoria_capacidad: int | None = None,
+    memoria_muestreo: int = 1,
+    exportar: str | None = "csv",
+    carpeta_memorias: str = "memorias",
+    volcar_cada: int = 64,
+    con_resultado: bool = False,
+    render: str = "completo",
+    render_cada: int = 1,
+    render_fps: float | None = None,
+    cache_mundos=None,
+    punto_control: str | None = None,
+    punto_control_cada: int | None = None,
+    punto_control_senal: int | None = None,
+    reanudar_desde: EstadoSimulacion | None = None,
+    metricas: MetricasSimulacion | bool | None = None,
+    detectar_inalcanzable: bool = False,
+    avance_rapido: bool = False,
+    repeticion: str | None = None,
+    repeticion_clave_cada: int = 100,
+    campo_monstruos: bool = False
 ) -> Tuple[list, List[Robot]]:
     """
     Ejecuta la simulación por hasta T_MAX ticks (1 tick = 1 segundo) o hasta que
@@ -65,72 +188,444 @@ def simular(
       - sin robots vivos
       - sin monstruos
       - estasis (S_ESTASIS ticks sin cambios relevantes)
-    Devuelve (cubo, robots_vivos).
+      - ciclo: con P_CICLO > 1, un estado que se repite con periodo ≤ P_CICLO
+        durante S_ESTASIS ticks seguidos
+      - inalcanzable: con detectar_inalcanzable=True, ninguna componente conexa del
+        espacio transitable tiene a la vez robot y monstruo (no hay más kills posibles;
+        ver entorno.ComponentesLibres; requiere backend "lista" o "array")
+    avance_rapido: cuando ningún agente se movió en el tick anterior y no toca paso de
+    monstruos, calcula sobre el mundo congelado hasta qué tick todos los robots solo
+    rotan y salta esos ticks de una vez (estado y memorias idénticos al tick a tick; ver
+    avance_rapido.py). Solo con motor_robots="secuencial" y sin verbose, métricas ni
+    repetición.
+    motor_robots: "secuencial" (Robot.tick uno por uno) o "flota" (RobotFleet, reglas
+    en bloque con arreglos; requiere backend "array").
+    memoria_capacidad / memoria_muestreo: acotan la memoria episódica de cada robot
+    (buffer circular de las últimas filas / solo ticks múltiplos), ver MemoriaRobot.
+    exportar: ver EXPORTACIONES. En los modos continuos se vuelca cada `volcar_cada`
+    ticks y la memoria en RAM de cada robot queda acotada a un buffer circular de al
+    menos `volcar_cada` filas (el registro completo queda en disco).
+    render / render_cada / render_fps: salida del modo verbose (ver render.Renderizador):
+    "completo" (cubo entero), "diferencial" (solo celdas cambiadas) o "resumen" (solo
+    estado de robots y monstruos), dibujando cada `render_cada` ticks y a lo sumo
+    `render_fps` frames por segundo.
+    cache_mundos: una cache_mundos.CacheMundos de la que tomar (o en la que guardar) el
+    terreno y la colocación; el resultado de la corrida es el mismo que sin caché.
+    punto_control / punto_control_cada / punto_control_senal: archivo donde guardar el
+    estado completo al final de cada tick múltiplo de `punto_control_cada` y/o al recibir
+    la señal `punto_control_senal` (p. ej. signal.SIGUSR1), ver puntos_control.
+    reanudar_desde: estado leído de un punto de control (usar `reanudar`); la corrida
+    sigue desde el tick siguiente y termina igual que si no se hubiera detenido.
+    metricas: True o una instrumentacion.MetricasSimulacion para medir el tiempo de cada
+    fase del tick, las reglas aplicadas y los movimientos/fusiones de monstruos (con su
+    volcado periódico, si se configuró); queda en ResultadoSimulacion.metricas. Sin
+    instrumentación el bucle no mide nada.
+    repeticion / repeticion_clave_cada: archivo donde grabar la corrida para verla después
+    sin re-simular: el mundo inicial, un delta compacto por tick y un fotograma clave cada
+    `repeticion_clave_cada` ticks (ver repeticion.LectorRepeticion, que reconstruye
+    cualquier tick desde el fotograma clave anterior). Requiere backend "lista" o "array".
+    campo_monstruos: mantiene un entorno.CampoMonstruos (2·N³ bytes) para que el
+    monstroscopio de los robots lea un contador por celda en lugar de sondear las 5
+    caras en el cubo; conviene con muchos robots. El resultado es el mismo con o sin
+    campo. Requiere backend "lista" o "array".
+    Cada corrida usa sus propios generadores (FlujosRNG derivados de params.seed) y no
+    toca el `random` global: varias corridas pueden ejecutarse a la vez en el mismo
+    proceso (hilos o asyncio) con el mismo resultado que en serie.
+    Devuelve (cubo, robots_vivos); con con_resultado=True, (cubo, robots_vivos, ResultadoSimulacion).
+    """
+    # opciones de la corrida, tal como se guardan en los puntos de control
+    opciones = dict(
+        T_MAX=T_MAX, verbose=verbose, S_ESTASIS=S_ESTASIS, P_CICLO=P_CICLO,
+        motor_robots=motor_robots, memoria_capacidad=memoria_capacidad,
+        memoria_muestreo=memoria_muestreo, exportar=exportar, carpeta_memorias=carpeta_memorias,
+        volcar_cada=volcar_cada, con_resultado=con_resultado, render=render,
+        render_cada=render_cada, render_fps=render_fps,
+        punto_control=punto_control, punto_control_cada=punto_control_cada,
+        detectar_inalcanzable=detectar_inalcanzable, avance_rapido=avance_rapido,
+        repeticion=repeticion, repeticion_clave_cada=repeticion_clave_cada,
+        campo_monstruos=campo_monstruos,
+    )
+    _validar(params, opciones, punto_control_senal)
+    return _agotar(_simulacion(params, opciones, cache_mundos, punto_control_senal, reanudar_desde, metricas))
+
+
+# ----- Deltas por tick (iterar) -----
+def _foto(robots: List[Robot], flota, indice: IndiceOcupacion) -> tuple:
+    """Lo mínimo del estado previo a un tick para armar su DeltaTick (sin tocar el cubo)."""
+    if flota is None:
+        return list(robots), [(r.x, r.y, r.z) for r in robots], set(indice.monstruos)
+    act = flota.vivo.nonzero()[0]
+    pos = list(zip(flota.x[act].tolist(), flota.y[act].tolist(), flota.z[act].tolist()))
+    return act.tolist(), pos, set(indice.monstruos)
+
+
+def _delta(t: int, previo: tuple, ids: dict, flota, indice: IndiceOcupacion, fusiones: int) -> DeltaTick:
+    activos, posiciones, monstruos = previo
+    movidos, destruidos = [], []
+    cuenta = [0] * len(REGLAS)
+    if flota is None:
+        pares = ((ids[id(r)], r.ultima_regla, (r.x, r.y, r.z)) for r in activos)
+    else:
+        x, y, z = flota.x.tolist(), flota.y.tolist(), flota.z.tolist()
+        pares = ((i, rg, (x[i], y[i], z[i])) for i, rg in zip(activos, flota.reglas.tolist()))
+    for (i, rg, pos), pos0 in zip(pares, posiciones):
+        cuenta[rg] += 1
+        if rg == R_MONSTRUO_EN_MI_CELDA:
+            destruidos.append(i)
+        elif pos != pos0:
+            movidos.append((i, pos0, pos))
+    ahora = indice.monstruos
+    return DeltaTick(
+        t=t,
+        robots_movidos=movidos,
+        robots_destruidos=destruidos,
+        monstruos_quitados=sorted(monstruos - ahora),
+        monstruos_agregados=sorted(ahora - monstruos),
+        kills=len(destruidos),
+        fusiones=fusiones,
+        reglas=tuple(cuenta),
+        robots_vivos=len(activos) - len(destruidos),
+        monstruos=len(ahora),
+    )
+
+
+def _delta_vacio(t: int, robots: List[Robot], flota, indice: IndiceOcupacion) -> DeltaTick:
+    """DeltaTick sin cambios: lleva el motivo de una parada que ocurre entre ticks."""
+    vivos = len(robots) if flota is None else int(flota.vivo.sum())
+    return DeltaTick(t=t, robots_movidos=[], robots_destruidos=[], monstruos_quitados=[],
+                     monstruos_agregados=[], kills=0, fusiones=0, reglas=(0,) * len(REGLAS),
+                     robots_vivos=vivos, monstruos=indice.n_monstruos())
+
+
+# ----- Avance rápido -----
+def _toca_monstruos(params: ParamEntorno, t: int) -> bool:
+    return params.K_monstruo > 0 and params.p_monstruo > 0.0 and t % params.K_monstruo == 0
+
+
+def _proximo_multiplo(t: int, k: int | None) -> int | None:
+    return None if k is None else -(-t // k) * k
+
+
+def _saltar(params: ParamEntorno, t: int, T_MAX: int, cubo, indice: IndiceOcupacion,
+            robots: List[Robot], estasis: DetectorEstasis, volcar_cada: int | None,
+            punto_control_cada: int | None):
+    """
+    Intenta avanzar de una vez desde el tick t. El salto termina antes del próximo paso de
+    monstruos y a más tardar en el próximo volcado o punto de control periódico (que se
+    hacen en ese tick). Devuelve (último tick aplicado, hubo estasis) o None.
+    """
+    limites = [T_MAX, _proximo_multiplo(t, volcar_cada), _proximo_multiplo(t, punto_control_cada)]
+    if params.K_monstruo > 0 and params.p_monstruo > 0.0:
+        limites.append(_proximo_multiplo(t, params.K_monstruo) - 1)
+    v = avance_rapido.ventana(robots, cubo, indice, t, min(x for x in limites if x is not None))
+    if v is None:
+        return None
+    t_fin, trayectorias = v
+    # con el mundo congelado la huella no cambia: solo la estasis puede cortar antes
+    parado = False
+    for tt in range(t, t_fin + 1):
+        if estasis.registrar(indice.huella):
+            t_fin, parado = tt, True
+            break
+    avance_rapido.avanzar(robots, trayectorias, t, t_fin)
+    return t_fin, parado
+
+
+def _validar(params: ParamEntorno, opciones: dict, punto_control_senal: int | None):
+    if opciones["motor_robots"] not in ("secuencial", "flota"):
+        raise ValueError("motor_robots debe ser 'secuencial' o 'flota'.")
+    if punto_control_senal is not None and opciones["punto_control"] is None:
+        raise ValueError("punto_control_senal requiere un archivo punto_control.")
+    if opciones["exportar"] not in EXPORTACIONES:
+        raise ValueError(f"exportar debe ser uno de {EXPORTACIONES}.")
+    if opciones["motor_robots"] == "flota" and params.backend != "array":
+        raise ValueError("El motor de robots 'flota' requiere backend 'array'.")
+    if opciones["detectar_inalcanzable"] and params.backend == "perezoso":
+        raise ValueError("detectar_inalcanzable requiere backend 'lista' o 'array'.")
+    if opciones["repeticion"] is not None and params.backend == "perezoso":
+        raise ValueError("repeticion requiere backend 'lista' o 'array'.")
+    if opciones["campo_monstruos"] and params.backend == "perezoso":
+        raise ValueError("campo_monstruos requiere backend 'lista' o 'array'.")
+
+
+def _agotar(corrida):
+    """Corre un generador de _simulacion hasta el final y devuelve su valor de retorno."""
+    try:
+        while True:
+            next(corrida)
+    except StopIteration as fin:
+        return fin.value
+
+
+def _simulacion(params: ParamEntorno, opciones: dict, cache_mundos=None,
+                punto_control_senal: int | None = None,
+                reanudar_desde: EstadoSimulacion | None = None,
+                metricas: MetricasSimulacion | bool | None = None,
+                emitir: bool = False, cancelacion: threading.Event | None = None):
+    """
+    Cuerpo de simular como generador: con emitir=True entrega un DeltaTick por tick;
+    si no, no entrega nada y solo devuelve (con StopIteration) lo mismo que simular.
+    `cancelacion` se consulta al inicio de cada tick (motivo de parada "cancelada").
     """
+    (T_MAX, verbose, S_ESTASIS, P_CICLO, motor_robots, memoria_capacidad, memoria_muestreo,
+     exportar, carpeta_memorias, volcar_cada, con_resultado, render, render_cada, render_fps,
+     punto_control, punto_control_cada, detectar_inalcanzable, saltar, repeticion,
+     repeticion_clave_cada, campo_monstruos) = (opciones[k] for k in OPCIONES)
+    continuo = exportar in ("binario", "csv_continuo")
+    if continuo:
+        memoria_capacidad = max(memoria_capacidad or 0, volcar_cada)
 
-    # 1) Construir mundo y poblar
-    cubo = construir_entorno(params)
-    colocar_agentes(cubo, params)
+    # 1) Construir mundo y poblar (el índice evita recorrer el cubo en cada tick)
+    estado = reanudar_desde
+    flujos = estado.flujos if estado is not None else FlujosRNG.desde_semilla(params.seed)
+    # el campo de proximidad ocupa 2·N³ bytes: solo si se pidió
+    campo = CampoMonstruos(params.N) if campo_monstruos else None
+    if estado is not None:
+        cubo = estado.cubo
+        indice = IndiceOcupacion(set(estado.robots_pos), set(estado.monstruos_pos), campo=campo)
+    elif cache_mundos is not None:
+        cubo, indice = cache_mundos.mundo(params, flujos, campo)
+    else:
+        cubo = construir_entorno(params, flujos.generacion)
+        indice = IndiceOcupacion(campo=campo)
+        colocar_agentes(cubo, params, indice, flujos.colocacion)
+    if detectar_inalcanzable:
+        # las ZV no cambian salvo por aniquilaciones: se etiqueta el cubo ya poblado
+        indice.usar_componentes(ComponentesLibres(cubo))
+
+    # 2) Instanciar Robots desde el índice (mismo orden que el recorrido del cubo)
+    if estado is not None:
+        todos = estado.todos
+        robots = [r for r, vivo in zip(todos, estado.vivos) if vivo]
+        flota = estado.flota
+    else:
+        robots: List[Robot] = [
+            Robot(x, y, z, orientacion="X+",
+                  memoria=MemoriaRobot(memoria_capacidad, memoria_muestreo))
+            for (x, y, z) in sorted(indice.robots)
+        ]
+        todos = list(robots)   # en orden de registro, incluidos los que se destruyan
+        flota = None
+        if motor_robots == "flota":
+            from flota import RobotFleet
+            flota = RobotFleet.desde_robots(robots, capacidad=memoria_capacidad,
+                                            muestreo=memoria_muestreo)
+
+    exportador = None
+    if continuo:
+        previo = estado.exportador if estado is not None else None
+        exportador = ExportadorMemorias(carpeta_memorias, "binario" if exportar == "binario" else "csv",
+                                        estado=previo)
+        if flota is not None:
+            exportador.registrar_flota(flota)
+        else:
+            exportador.registrar_robots(todos)
+        if previo is not None:
+            exportador.restaurar_cursores(previo)
 
-    # 2) Instanciar Robots desde el cubo
-    robots: List[Robot] = [
-        Robot(x, y, z, orientacion="X+")
-        for (x, y, z) in obtener_posiciones(cubo, ROBOT)
-    ]
+    escritor = None
+    if punto_control is not None:
+        mismo_archivo = estado is not None and Path(estado.ruta).resolve() == Path(punto_control).resolve()
+        escritor = EscritorPuntosControl(punto_control, params, opciones, punto_control_cada,
+                                         continuar=estado if mismo_archivo else None)
+        indice.tocadas = escritor.tocadas
+        if punto_control_senal is not None:
+            escritor.escuchar(punto_control_senal)
+
+    grabador = None
+    if repeticion is not None:
+        grabador = GrabadorRepeticion(repeticion, params, repeticion_clave_cada)
+        indice.cambios = grabador.cambios
+        grabador.iniciar(estado.t if estado is not None else 0, cubo, todos, robots, flota)
+
+    def resumen_robots() -> list:
+        if flota is not None:
+            return flota.resumen()
+        return [(r.x, r.y, r.z, r.orientacion) for r in robots]
 
     def contar_monstruos() -> int:
-        return len(obtener_posiciones(cubo, MONSTRUO))
+        return indice.n_monstruos()
 
+    renderizador = Renderizador(render, render_cada, render_fps) if verbose else None
     if verbose:
-        print("=== Estado inicial ===")
-        imprimir_capas(cubo)
-        print("Robots iniciales:", [(r.x, r.y, r.z, r.orientacion) for r in robots])
-        print("Monstruos iniciales:", contar_monstruos())
+        titulo = "=== Estado inicial ===" if estado is None else f"=== Reanudando tras el tick {estado.t} ==="
+        renderizador.frame(cubo, titulo, [
+            f"Robots iniciales: {resumen_robots()}",
+            f"Monstruos iniciales: {contar_monstruos()}",
+        ], indice=indice, forzar=True)
 
     # 3) Bucle principal
-    estasis_contador = 0
-    prev_snap = snapshot_estado(cubo)
+    estasis = DetectorEstasis(S_ESTASIS, P_CICLO)
+    estasis.iniciar(indice.huella)
+    if estado is not None:
+        estasis.restaurar(estado.estasis)
+    motivo = "t_max"
+    ticks = estado.t if estado is not None else 0
+    med = MetricasSimulacion() if metricas is True else (metricas or None)
+    delta = None
+    if emitir:
+        ids = {id(r): i for i, r in enumerate(todos)}
+    # el avance rápido necesita que nadie observe los ticks salteados uno por uno
+    saltar = saltar and flota is None and not verbose and med is None and not emitir and grabador is None
+    huella_previa = None
+    saltado_hasta = 0
+    proximo_intento, espera = 0, 1   # tras un intento fallido se espera el doble (hasta 64)
 
-    for t in range(1, T_MAX + 1):
+    for t in range(ticks + 1, T_MAX + 1):
+        if cancelacion is not None and cancelacion.is_set():
+            motivo = "cancelada"
+            if emitir:
+                # el tick anterior ya se entregó: un delta vacío (con t del último tick
+                # completo) lleva el motivo
+                delta = _delta_vacio(ticks, robots, flota, indice)
+            break
+        if t <= saltado_hasta:
+            continue
+        if saltar:
+            quieto = indice.huella == huella_previa
+            huella_previa = indice.huella
+            if quieto and t >= proximo_intento and not _toca_monstruos(params, t):
+                fin = _saltar(params, t, T_MAX, cubo, indice, robots, estasis,
+                              volcar_cada if exportador is not None else None,
+                              escritor.cada if escritor is not None else None)
+                if fin is None:
+                    proximo_intento, espera = t + espera, min(2 * espera, 64)
+                else:
+                    espera = 1
+                    ticks, parado = fin
+                    if exportador is not None and ticks % volcar_cada == 0:
+                        exportador.volcar()
+                    if parado:
+                        motivo = "estasis" if estasis.periodo == 1 else "ciclo"
+                        break
+                    if escritor is not None and escritor.toca(ticks):
+                        escritor.guardar(ticks, cubo, indice, todos, robots, flota, flujos,
+                                         estasis.estado(), exportador)
+                    saltado_hasta = ticks
+                    continue
+        ticks = t
+        if med is not None:
+            med.iniciar_tick(t, indice.n_monstruos())
+        if emitir:
+            previo = _foto(robots, flota, indice)
+        if grabador is not None:
+            n_previo = indice.n_monstruos()
+        if med is not None:
+            med.marca(F_DELTAS)
         # 3.1) Dinámica del mundo (monstruos)
-        step_entorno(cubo, params, iteracion=t)
+        movidos = step_entorno(cubo, params, iteracion=t, indice=indice, rng=flujos.dinamica)
+        if med is not None:
+            med.monstruos(movidos, indice.n_monstruos())
+            med.marca(F_ENTORNO)
+        if emitir:
+            fusiones = len(previo[2]) - indice.n_monstruos()
+        if grabador is not None:
+            fusiones_tick = n_previo - indice.n_monstruos()
 
         # 3.2) Ticks de robots (reglas R1..R8 con logging)
-        robots = [r for r in robots if r.tick(cubo, t)]
+        if flota is None:
+            if med is None:
+                robots = [r for r in robots if r.tick(cubo, t, indice)]
+            else:
+                robots = med.tick_robots(robots, cubo, t, indice)
+        elif flota.tick(cubo, t, indice) == 0:
+            robots = []
+        if med is not None:
+            if flota is not None:
+                med.contar_reglas(flota.reglas)
+            med.marca(F_ROBOTS)
+        if emitir:
+            delta = _delta(t, previo, ids, flota, indice, fusiones)
+        if grabador is not None:
+            grabador.tick(t, cubo, fusiones_tick, robots)
+        if med is not None:
+            med.marca(F_DELTAS)
 
-        # 3.3) Salida por iteración
-        if verbose:
-            print(f"\n--- Iteración {t} ---")
-            imprimir_capas(cubo)
-            print("Robots vivos:", [(r.x, r.y, r.z, r.orientacion) for r in robots])
-            print("Monstruos:", contar_monstruos())
+        if exportador is not None and t % volcar_cada == 0:
+            exportador.volcar()
+            if med is not None:
+                med.marca(F_VOLCADO)
+
+        # 3.3) Salida por iteración (un buffer por frame, con límite de frames)
+        if verbose and renderizador.toca(t):
+            renderizador.frame(cubo, f"\n--- Iteración {t} ---", [
+                f"Robots vivos: {resumen_robots()}",
+                f"Monstruos: {contar_monstruos()}",
+            ], t=t, indice=indice)
+            if med is not None:
+                med.marca(F_RENDER)
 
         # 3.4) Paradas globales
         if not robots:
-            if verbose:
-                print("\n⛔ No quedan robots.")
+            motivo = "sin_robots"
             break
 
         if contar_monstruos() == 0:
-            if verbose:
-                print("\n✅ No quedan monstruos.")
+            motivo = "sin_monstruos"
             break
 
-        # Estasis: comparar snapshot del estado
-        snap = snapshot_estado(cubo)
-        if snap == prev_snap:
-            estasis_contador += 1
-        else:
-            estasis_contador = 0
-            prev_snap = snap
+        if detectar_inalcanzable and indice.componentes.activas == 0:
+            motivo = "inalcanzable"
+            break
+        if med is not None:
+            med.marca(F_PARADAS)
 
-        if estasis_contador >= S_ESTASIS:
-            if verbose:
-                print(f"\n⚠️ Estasis detectada por {S_ESTASIS} ticks. Deteniendo simulación.")
+        # Estasis: comparar la huella Zobrist del estado (entero de 64 bits)
+        if estasis.registrar(indice.huella):
+            motivo = "estasis" if estasis.periodo == 1 else "ciclo"
             break
+        if med is not None:
+            med.marca(F_ESTASIS)
+
+        # 3.5) Punto de control (estado completo al final del tick)
+        if escritor is not None and escritor.toca(t):
+            escritor.guardar(t, cubo, indice, todos, robots, flota, flujos, estasis.estado(), exportador)
+            if med is not None:
+                med.marca(F_PUNTO_CONTROL)
+
+        if emitir:
+            if t == T_MAX:
+                delta.motivo = motivo
+            yield delta
+            delta = None
+
+    if delta is not None:
+        # el tick que disparó una parada global no se entregó dentro del bucle
+        delta.motivo = motivo
+        yield delta
+    if med is not None:
+        med.terminar()
+    if escritor is not None:
+        escritor.cerrar()
+    if grabador is not None:
+        grabador.cerrar()
+
+    if verbose:
+        # el último tick siempre se muestra, aunque el límite de frames lo haya salteado
+        if ticks and renderizador.ultimo_t != ticks:
+            renderizador.frame(cubo, f"\n--- Iteración {ticks} ---", [
+                f"Robots vivos: {resumen_robots()}",
+                f"Monstruos: {contar_monstruos()}",
+            ], t=ticks, indice=indice, forzar=True)
+        if motivo == "sin_robots":
+            print("\n⛔ No quedan robots.")
+        elif motivo == "sin_monstruos":
+            print("\n✅ No quedan monstruos.")
+        elif motivo == "estasis":
+            print(f"\n⚠️ Estasis detectada por {S_ESTASIS} ticks. Deteniendo simulación.")
+        elif motivo == "ciclo":
+            print(f"\n⚠️ Ciclo de periodo {estasis.periodo} detectado por {S_ESTASIS} ticks. Deteniendo simulación.")
+        elif motivo == "inalcanzable":
+            print("\n🚫 Ningún robot comparte región libre con un monstruo. Deteniendo simulación.")
 
     # 4) Exportar memorias y calcular métricas
-    rutas = [exportar_memoria_robot(r) for r in robots]
+    if flota is not None:
+        robots = flota.a_robots()
+    rutas = []
+    if exportar == "csv":
+        rutas = [exportar_memoria_robot(r, carpeta_memorias) for r in robots]
+    elif exportador is not None:
+        rutas = [exportador.cerrar(robots)]
     total_kills = sum(r.kills for r in robots)
     n_monstruos_ini = params.Nmonstruos
     n_robots_ini = params.Nrobot if params.Nrobot > 0 else 1
@@ -146,4 +641,115 @@ def simular(
         print(f"Eficiencia media por robot:   {eficiencia_media_por_robot:.3f}")
         print("\n=== Fin de la simulación ===")
 
+    if con_resultado:
+        resultado = ResultadoSimulacion(
+            kills=total_kills,
+            eficiencia_pct=eficiencia_pct,
+            eficiencia_media_por_robot=eficiencia_media_por_robot,
+            ticks=ticks,
+            motivo_parada=motivo,
+            robots_vivos=len(robots),
+            monstruos_restantes=contar_monstruos(),
+            metricas=med,
+        )
+        return cubo, robots, resultado
     return cubo, robots
+
+
+def reanudar(ruta: str, t: int | None = None, **cambios):
+    """
+    Sigue una corrida desde el último punto de control guardado en `ruta` (o el último
+    con tick ≤ t), con los mismos parámetros y opciones de simular salvo los indicados
+    en `cambios` (p. ej. verbose=False o un T_MAX mayor). Si la corrida guardaba puntos
+    de control en `ruta`, los sigue agregando ahí (descartando los posteriores a t).
+    """
+    estado = leer_punto_control(ruta, t)
+    return simular(estado.params, reanudar_desde=estado, **{**estado.opciones, **cambios})
+
+
+# ----- Corrida tick a tick -----
+class Corrida:
+    """
+    Una corrida de simular consumible tick a tick (ver `iterar`): cada paso entrega el
+    DeltaTick del tick; el último trae `motivo`. Al terminar, `resultado` tiene lo que
+    devuelve simular(..., con_resultado=True).
+
+    - Iteración: `for delta in corrida` o, desde asyncio, `async for delta in corrida`
+      (cede el bucle de eventos entre ticks; con en_hilo=True cada tick corre en el
+      executor por defecto y el bucle queda libre mientras tanto).
+    - cancelar(): la corrida termina antes del próximo tick con motivo "cancelada" (se
+      puede llamar desde otro hilo); el último paso es entonces un DeltaTick sin cambios
+      con el t del último tick completo. Como contexto (`with`), al salir se cancela y se
+      termina ordenadamente: se cierran exportador y puntos de control.
+    """
+
+    def __init__(self, generador, cancelacion: threading.Event, en_hilo: bool = False):
+        self._gen = generador
+        self._cancelacion = cancelacion
+        self.en_hilo = en_hilo
+        self.resultado = None
+        self.terminada = False
+
+    def cancelar(self):
+        self._cancelacion.set()
+
+    def agotar(self):
+        """Corre los ticks que falten y devuelve `resultado`."""
+        for _ in self:
+            pass
+        return self.resultado
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> DeltaTick:
+        if self.terminada:
+            raise StopIteration
+        try:
+            return next(self._gen)
+        except StopIteration as fin:
+            self.terminada = True
+            self.resultado = fin.value
+            raise StopIteration from None
+
+    def _siguiente(self):
+        return next(self, None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> DeltaTick:
+        if self.en_hilo:
+            delta = await asyncio.get_running_loop().run_in_executor(None, self._siguiente)
+        else:
+            delta = self._siguiente()
+            await asyncio.sleep(0)
+        if delta is None:
+            raise StopAsyncIteration
+        return delta
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cancelar()
+        self.agotar()
+        return False
+
+
+def iterar(params: ParamEntorno, en_hilo: bool = False, **opciones) -> Corrida:
+    """
+    Como simular(params, **opciones), pero devuelve una Corrida que avanza un tick por
+    paso y entrega su DeltaTick (agentes movidos, kills, fusiones, reglas y, al final, el
+    motivo de parada). La corrida es la misma que la de simular con esas opciones.
+    """
+    ligados = inspect.signature(simular).bind(params, **opciones)
+    ligados.apply_defaults()
+    a = ligados.arguments
+    opciones = {k: a[k] for k in OPCIONES}
+    opciones["con_resultado"] = True
+    _validar(params, opciones, a["punto_control_senal"])
+    cancelacion = threading.Event()
+    generador = _simulacion(params, opciones, a["cache_mundos"], a["punto_control_senal"],
+                            a["reanudar_desde"], a["metricas"], emitir=True, cancelacion=cancelacion)
+    return Corrida(generador, cancelacion, en_hilo)
@@ -0,0 +1,217 @@
+# =====================================================
+# terreno.py — Terreno procedural perezoso (backend "perezoso")
+# =====================================================
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # sin numpy, los chunks se generan celda por celda
+    np = None
+
+# --- Debe concordar con entorno.py ---
+ZV = 0
+ZL = 1
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_M1 = 0xBF58476D1CE4E5B9
+_M2 = 0x94D049BB133111EB
+
+
+def hash_celda(semilla: int, i: int) -> int:
+    """splitmix64 en el contador i + 1 (índice plano de la celda): función pura de (semilla, celda)."""
+    h = (semilla + (i + 1) * _GOLDEN) & _MASK64
+    h = ((h ^ (h >> 30)) * _M1) & _MASK64
+    h = ((h ^ (h >> 27)) * _M2) & _MASK64
+    return h ^ (h >> 31)
+
+
+def _hash_np(semilla: int, i):
+    """hash_celda vectorizado (la aritmética uint64 de numpy ya es módulo 2**64)."""
+    u = np.uint64
+    h = u(semilla) + (i + u(1)) * u(_GOLDEN)
+    h = (h ^ (h >> u(30))) * u(_M1)
+    h = (h ^ (h >> u(27))) * u(_M2)
+    return h ^ (h >> u(31))
+
+
+class _Columna:
+    __slots__ = ("_c", "_x", "_y")
+
+    def __init__(self, cubo, x, y):
+        self._c, self._x, self._y = cubo, x, y
+
+    def __len__(self):
+        return self._c.N
+
+    def __getitem__(self, z):
+        if not 0 <= z < self._c.N:
+            raise IndexError("z fuera del cubo")
+        return self._c.valor(self._x, self._y, z)
+
+    def __setitem__(self, z, v):
+        if not 0 <= z < self._c.N:
+            raise IndexError("z fuera del cubo")
+        self._c.poner(self._x, self._y, z, v)
+
+
+class _Fila:
+    __slots__ = ("_c", "_x")
+
+    def __init__(self, cubo, x):
+        self._c, self._x = cubo, x
+
+    def __len__(self):
+        return self._c.N
+
+    def __getitem__(self, y):
+        if not 0 <= y < self._c.N:
+            raise IndexError("y fuera del cubo")
+        return _Columna(self._c, self._x, y)
+
+
+class CuboPerezoso:
+    """
+    Cubo N×N×N cuyas celdas se generan al primer acceso: el estado ZL/ZV de (x, y, z)
+    es ZL si hash_celda(semilla, (x*N + y)*N + z) cae por debajo de Pfree, así que no
+    depende del orden en que se visiten las celdas. Se materializa por chunks de
+    lado `lado_chunk` (potencia de 2), guardados como bytearray en un dict; la
+    memoria crece con la región que recorren robots y monstruos, no con N³.
+
+    Acceso:
+      - cubo[x][y][z] (lectura y escritura), len(cubo) == N, como el backend "lista";
+      - valor(x, y, z) / poner(x, y, z, v) sin objetos intermedios;
+      - item(i) con índice plano, como ndarray.item (lo usan los sensores de agente.py).
+    """
+
+    def __init__(self, N: int, Pfree: float = 1.0, semilla: int = 0, lado_chunk: int = 16):
+        assert lado_chunk > 0 and lado_chunk & (lado_chunk - 1) == 0, "lado_chunk debe ser potencia de 2."
+        self.N = N
+        self.lado_chunk = lado_chunk
+        self._s = lado_chunk.bit_length() - 1
+        self._m = lado_chunk - 1
+        self._M = -(-N // lado_chunk)          # chunks por eje
+        self.sembrar(semilla, Pfree)
+
+    def sembrar(self, semilla: int, Pfree: float):
+        """Fija la función de generación y descarta lo materializado."""
+        self.semilla = semilla & _MASK64
+        self.Pfree = Pfree
+        self._umbral = int(Pfree * (1 << 53))   # ZL si (hash >> 11) < umbral
+        self._chunks: Dict[int, bytearray] = {}
+
+    # ----- Generación -----
+    def estado_inicial(self, x: int, y: int, z: int) -> int:
+        """ZL/ZV generado para la celda (sin mirar lo que se escribió después)."""
+        i = (x * self.N + y) * self.N + z
+        return ZL if (hash_celda(self.semilla, i) >> 11) < self._umbral else ZV
+
+    def _generar(self, k: int, guardar: bool = True) -> bytearray:
+        M, C, N = self._M, self.lado_chunk, self.N
+        cx, r = divmod(k, M * M)
+        cy, cz = divmod(r, M)
+        x0, y0, z0 = cx * C, cy * C, cz * C
+        if np is not None:
+            loc = np.arange(C, dtype=np.uint64)
+            xs, ys, zs = loc + np.uint64(x0), loc + np.uint64(y0), loc + np.uint64(z0)
+            i = (xs[:, None, None] * np.uint64(N) + ys[None, :, None]) * np.uint64(N) + zs[None, None, :]
+            libres = (_hash_np(self.semilla, i) >> np.uint64(11)) < np.uint64(self._umbral)
+            chunk = bytearray(np.where(libres, ZL, ZV).astype(np.uint8).tobytes())
+        else:
+            chunk = bytearray(C * C * C)
+            j = 0
+            for x in range(x0, x0 + C):
+                for y in range(y0, y0 + C):
+                    base = (x * N + y) * N
+                    for z in range(z0, z0 + C):
+                        if (hash_celda(self.semilla, base + z) >> 11) < self._umbral:
+                            chunk[j] = ZL
+                        j += 1
+        if guardar:
+            self._chunks[k] = chunk
+        return chunk
+
+    # ----- Acceso -----
+    def valor(self, x: int, y: int, z: int) -> int:
+        s, m, M = self._s, self._m, self._M
+        k = ((x >> s) * M + (y >> s)) * M + (z >> s)
+        chunk = self._chunks.get(k)
+        if chunk is None:
+            chunk = self._generar(k)
+        return chunk[(((x & m) << s) | (y & m)) << s | (z & m)]
+
+    def poner(self, x: int, y: int, z: int, v: int):
+        s, m, M = self._s, self._m, self._M
+        k = ((x >> s) * M + (y >> s)) * M + (z >> s)
+        chunk = self._chunks.get(k)
+        if chunk is None:
+            chunk = self._generar(k)
+        chunk[(((x & m) << s) | (y & m)) << s | (z & m)] = v
+
+    def item(self, i: int) -> int:
+        x, r = divmod(i, self.N * self.N)
+        y, z = divmod(r, self.N)
+        return self.valor(x, y, z)
+
+    def __len__(self) -> int:
+        return self.N
+
+    def __getitem__(self, x: int) -> _Fila:
+        if not 0 <= x < self.N:
+            raise IndexError("x fuera del cubo")
+        return _Fila(self, x)
+
+    # ----- Consultas -----
+    def _en_chunk(self, k: int, chunk: bytearray, valor: int) -> List[Tuple[int, int, int]]:
+        M, C, N, s, m = self._M, self.lado_chunk, self.N, self._s, self._m
+        cx, r = divmod(k, M * M)
+        cy, cz = divmod(r, M)
+        out = []
+        j = chunk.find(valor)
+        while j >= 0:
+            x = cx * C + (j >> (2 * s))
+            y = cy * C + ((j >> s) & m)
+            z = cz * C + (j & m)
+            if x < N and y < N and z < N:
+                out.append((x, y, z))
+            j = chunk.find(valor, j + 1)
+        return out
+
+    def posiciones(self, valor: int, solo_tocadas: bool = False) -> List[Tuple[int, int, int]]:
+        """
+        Celdas con `valor`, en orden (x, y, z). Con solo_tocadas=True recorre solo los
+        chunks materializados (alcanza para ROBOT/MONSTRUO: los agentes solo existen en
+        celdas escritas); si no, materializa el cubo entero.
+        """
+        M = self._M
+        claves = sorted(self._chunks) if solo_tocadas else range(M * M * M)
+        out = []
+        for k in claves:
+            chunk = self._chunks.get(k)
+            if chunk is None:
+                chunk = self._generar(k)
+            if valor in chunk:
+                out.extend(self._en_chunk(k, chunk, valor))
+        out.sort()
+        return out
+
+    def recorrer(self, valor: int, desde: int = 0) -> Iterator[Tuple[int, int, int]]:
+        """
+        Celdas con `valor`, chunk por chunk, empezando por el chunk `desde` (módulo la
+        cantidad de chunks) y dando la vuelta. Es perezoso (se puede cortar en cualquier momento) y los chunks que no
+        estaban materializados se generan para mirarlos pero no se guardan.
+        """
+        total = self._M ** 3
+        for j in range(total):
+            k = (desde + j) % total
+            chunk = self._chunks.get(k)
+            if chunk is None:
+                chunk = self._generar(k, guardar=False)
+            if valor in chunk:
+                yield from self._en_chunk(k, chunk, valor)
+
+    def n_chunks(self) -> int:
+        return len(self._chunks)
+
+    def nbytes(self) -> int:
+        return sum(len(c) for c in self._chunks.values())
@@ -0,0 +1,77 @@
+# =====================================================
+# test_agente.py — Memoria episódica y orientaciones de agente.py (correr con pytest)
+# =====================================================
+from array import array
+
+import pytest
+
+from agente import MemoriaRobot, rotar_90
+
+
+def _fila(t: int) -> tuple:
+    """Fila de códigos distinguible por t (regla 6 = R7, frontal 0 = ZL, orientación 0 = X+)."""
+    return (t, 6, 0, t % 2, t, 0, 0, 0, t + 1, 0, 0, 0, t // 3)
+
+
+def _memoria(n: int, capacidad: int | None = None, muestreo: int = 1) -> MemoriaRobot:
+    mem = MemoriaRobot(capacidad, muestreo)
+    for t in range(n):
+        mem.registrar(*_fila(t))
+    return mem
+
+
+# ----- Buffer circular (user-006) -----
+@pytest.mark.parametrize("capacidad", [None, 4])
+def test_buffer_circular_conserva_las_ultimas_filas(capacidad):
+    mem = _memoria(11, capacidad)
+    quedan = list(range(11))[-capacidad:] if capacidad else list(range(11))
+    assert len(mem) == len(quedan) and mem.total == 11
+    assert [f["t"] for f in mem] == quedan
+    assert mem.columna("t") == quedan
+    assert mem[0]["pos_post"] == (quedan[0] + 1, 0, 0)
+
+
+def test_indices_negativos_y_fuera_de_rango():
+    mem = _memoria(7, capacidad=3)          # quedan t = 4, 5, 6 con el inicio corrido
+    assert [mem[i]["t"] for i in (-1, -2, -3)] == [6, 5, 4]
+    with pytest.raises(IndexError):
+        mem[3]
+    with pytest.raises(IndexError):
+        mem[-4]
+
+
+@pytest.mark.parametrize("capacidad", [None, 5])
+def test_rebanadas_devuelven_listas_de_filas(capacidad):
+    mem = _memoria(9, capacidad)
+    ts = [f["t"] for f in mem]
+    for rebanada in (slice(-3, None), slice(None, 2), slice(1, -1, 2), slice(None, None, -1), slice(20, 30)):
+        assert [f["t"] for f in mem[rebanada]] == ts[rebanada]
+    assert mem[-3:] == list(mem)[-3:]
+
+
+def test_muestreo_guarda_solo_multiplos():
+    mem = _memoria(10, capacidad=3, muestreo=4)
+    assert [f["t"] for f in mem] == [0, 4, 8] and mem.total == 3
+
+
+def test_desde_columnas_igual_a_extender():
+    filas = [_fila(t) for t in range(10)]
+    columnas = {nombre: [f[k] for f in filas] for k, (nombre, _) in enumerate(MemoriaRobot.COLUMNAS)}
+    for capacidad in (None, 4, 16):
+        a = MemoriaRobot(capacidad)
+        a.extender(columnas)
+        b = MemoriaRobot.desde_columnas(
+            {nombre: array(tipo, columnas[nombre]) for nombre, tipo in MemoriaRobot.COLUMNAS}, capacidad)
+        assert a == b and a.total == b.total and a.cols == b.cols
+
+
+def test_columnas_desde_informa_perdidas():
+    mem = _memoria(10, capacidad=4)
+    columnas, perdidas = mem.columnas_desde(3)
+    assert perdidas == 3 and list(columnas["t"]) == [6, 7, 8, 9]
+
+
+# ----- Orientaciones (user-011) -----
+def test_rotar_90_acepta_orientacion_en_texto():
+    assert rotar_90("X+", 0) == ("Y+", 1)
+    assert rotar_90(0, 0) == (2, 1)
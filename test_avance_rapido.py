@@ -0,0 +1,17 @@
+# =====================================================
+# test_avance_rapido.py — Salto de ticks con el mundo congelado (correr con pytest)
+# =====================================================
+import pytest
+
+from apoyo_pruebas import params, correr
+
+
+# ----- Avance rápido (user-020) -----
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("opciones", [{}, {"memoria_muestreo": 3}, {"P_CICLO": 4, "S_ESTASIS": 30}])
+def test_avance_rapido_igual_al_tick_a_tick(seed, opciones):
+    pf = 0.3 if seed % 2 else 0.5
+    p = params(N=6, Pfree=pf, Psoft=1 - pf, Nrobot=5, Nmonstruos=4, seed=seed,
+                K_monstruo=7 * (seed % 3 != 0), p_monstruo=0.5 if seed % 3 else 0.0)
+    kw = dict(T_MAX=300, **opciones)
+    assert correr(p, avance_rapido=True, **kw) == correr(p, **kw)
@@ -0,0 +1,55 @@
+# =====================================================
+# test_barrido.py — Barridos de parámetros y su reanudación (correr con pytest)
+# =====================================================
+import csv
+
+import pytest
+
+from barrido import barrer, grilla, COLUMNAS
+from apoyo_pruebas import params
+
+
+def _filas(ruta) -> list:
+    with open(ruta, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+# ----- Reanudación (user-008) -----
+def test_reanudar_saltea_solo_lo_hecho_con_las_mismas_opciones(tmp_path):
+    salida = str(tmp_path / "barrido.csv")
+    puntos = grilla(params(N=5, Nrobot=2, Nmonstruos=3), Pfree=[0.6, 0.8])
+    kw = dict(semillas=2, procesos=1, salida=salida, T_MAX=30)
+
+    corrida = barrer(puntos, **kw)
+    primeras = [next(corrida), next(corrida)]
+    corrida.close()                       # barrido interrumpido
+    hechas = len(_filas(salida))
+    assert hechas >= len(primeras)
+
+    nuevas = list(barrer(puntos, **kw))
+    assert hechas + len(nuevas) == 4 and len(_filas(salida)) == 4
+    assert list(barrer(puntos, **kw)) == []
+
+    # otras opciones de simular: las corridas son otras y no se saltean
+    assert len(list(barrer(puntos, **{**kw, "T_MAX": 40}))) == 4
+    assert len(list(barrer(puntos, **{**kw, "P_CICLO": 3}))) == 4
+    # pasar explícitamente el valor por defecto es lo mismo que no pasarlo
+    assert list(barrer(puntos, S_ESTASIS=20, **kw)) == []
+    filas = _filas(salida)
+    assert len(filas) == 12 and list(filas[0]) == COLUMNAS
+
+
+def test_opciones_fijas_y_desconocidas_se_rechazan(tmp_path):
+    puntos = [params()]
+    for fija in ("verbose", "exportar", "con_resultado"):
+        with pytest.raises(ValueError, match=fija):
+            next(barrer(puntos, procesos=1, **{fija: False}))
+    with pytest.raises(TypeError, match="TMAX"):
+        next(barrer(puntos, procesos=1, TMAX=3))
+
+
+def test_csv_con_otras_columnas_no_se_mezcla(tmp_path):
+    salida = tmp_path / "viejo.csv"
+    salida.write_text("punto,N,seed\n0,5,0\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="otras columnas"):
+        next(barrer([params()], procesos=1, salida=str(salida)))
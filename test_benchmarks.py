@@ -0,0 +1,22 @@
+# =====================================================
+# test_benchmarks.py — Matriz de casos de benchmarks.py (correr con pytest)
+# =====================================================
+from benchmarks import matriz, separar_validos, main
+from apoyo_pruebas import params
+
+
+# ----- Combinaciones no soportadas (user-016) -----
+def test_matriz_omite_motores_sin_backend_array():
+    casos = matriz(params(), backend=["lista", "array"], motor_monstruos=["secuencial", "lote"])
+    validos, omitidos = separar_validos(casos)
+    assert [(p.backend, p.motor_monstruos) for p in validos] == [
+        ("lista", "secuencial"), ("array", "secuencial"), ("array", "lote")]
+    assert [(p.backend, p.motor_monstruos) for p, _ in omitidos] == [("lista", "lote")]
+
+
+def test_campo_monstruos_omite_el_backend_perezoso(capsys):
+    codigo = main(["correr", "--N", "6", "--backend", "perezoso", "lista", "--benchmarks", "robot_tick",
+                   "--ticks", "2", "--repeticiones", "1", "--campo-monstruos"])
+    salida = capsys.readouterr().out
+    assert codigo == 0
+    assert "omitido: N=6 backend=perezoso" in salida and "1 casos omitidos" in salida
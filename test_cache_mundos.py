@@ -0,0 +1,90 @@
+# =====================================================
+# test_cache_mundos.py — Caché de mundos generados (correr con pytest)
+# =====================================================
+import pytest
+
+from cache_mundos import CacheMundos
+from entorno import FlujosRNG, CampoMonstruos, IndiceOcupacion, ROBOT, ZV, construir_entorno, colocar_agentes
+from simulacion import simular
+from apoyo_pruebas import con_numpy, params, estado, correr
+
+
+def _fresco(p):
+    flujos = FlujosRNG.desde_semilla(p.seed)
+    cubo = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion()
+    colocar_agentes(cubo, p, indice, flujos.colocacion)
+    return cubo, indice
+
+
+# ----- Aciertos y aislamiento (user-014) -----
+@pytest.mark.parametrize("backend", ["lista", pytest.param("array", marks=con_numpy)])
+def test_acierto_igual_a_construir(backend):
+    p = params(backend=backend)
+    cache = CacheMundos()
+    ref_cubo, ref_indice = _fresco(p)
+    for _ in range(2):
+        cubo, indice = cache.mundo(p)
+        assert estado(cubo, []) == estado(ref_cubo, []) and indice == ref_indice
+    assert (cache.aciertos, cache.fallos) == (1, 1)
+
+
+@pytest.mark.parametrize("backend", ["lista", pytest.param("array", marks=con_numpy)])
+def test_corrida_con_cache_igual_a_sin_cache(backend):
+    p = params(backend=backend)
+    cache = CacheMundos()
+    ref = correr(p)
+    assert correr(p, cache_mundos=cache) == ref
+    assert correr(p, cache_mundos=cache) == ref   # acierto: el mundo guardado no se tocó
+    assert cache.aciertos == 1
+
+
+def test_entregas_en_memoria_son_copias():
+    p = params()
+    cache = CacheMundos()
+    cubo, indice = cache.mundo(p)
+    x, y, z = next(iter(indice.robots))
+    cubo[x][y][z] = ZV
+    otra, _ = cache.mundo(p)
+    assert otra[x][y][z] == ROBOT
+
+
+def test_lru_y_campo():
+    cache = CacheMundos(capacidad=2)
+    for seed in (1, 2, 3):
+        cache.mundo(params(seed=seed))
+    assert len(cache) == 2
+    cache.mundo(params(seed=1))
+    assert cache.fallos == 4
+    campo = CampoMonstruos(9)
+    _, indice = cache.mundo(params(seed=1), campo=campo)
+    assert indice.campo is campo and sum(campo.hay) == len(indice.monstruos)
+
+
+@con_numpy
+def test_disco_mmap_copy_on_write_aislado(tmp_path):
+    p = params(backend="array")
+    ref_cubo, _ = _fresco(p)
+    CacheMundos(carpeta=str(tmp_path)).mundo(p)            # escribe el .npy
+    cache = CacheMundos(carpeta=str(tmp_path))              # otro proceso: solo disco
+    a, indice = cache.mundo(p)
+    b, _ = cache.mundo(p)
+    assert cache.aciertos == 2 and cache.fallos == 0
+    x, y, z = next(iter(indice.robots))
+    a[:] = ZV
+    # la escritura queda privada de `a`: ni la otra entrega ni el archivo cambian
+    assert b[x, y, z] == ROBOT and (b == ref_cubo).all()
+    c, _ = CacheMundos(carpeta=str(tmp_path)).mundo(p)
+    assert (c == ref_cubo).all()
+    # una corrida completa sobre el mundo mapeado tampoco lo modifica
+    simular(p, T_MAX=20, verbose=False, exportar=None, cache_mundos=cache)
+    d, _ = cache.mundo(p)
+    assert (d == ref_cubo).all()
+
+
+@con_numpy
+def test_disco_con_backend_lista(tmp_path):
+    p = params()
+    CacheMundos(carpeta=str(tmp_path)).mundo(p)
+    cache = CacheMundos(carpeta=str(tmp_path))
+    assert correr(p, cache_mundos=cache) == correr(p) and cache.aciertos == 1
@@ -0,0 +1,154 @@
+# =====================================================
+# test_entorno.py — Colocación, motores de monstruos y flujos aleatorios (correr con pytest)
+# =====================================================
+from concurrent.futures import ThreadPoolExecutor
+import random
+
+import pytest
+
+from entorno import (
+    ParamEntorno, FlujosRNG, IndiceOcupacion, CampoMonstruos, MONSTRUO, ZL, ZV, ROBOT, _DESP_6,
+    construir_entorno, colocar_agentes, mover_monstruos_lote, step_entorno, es_coord_valida, np,
+)
+from apoyo_pruebas import con_numpy, params, correr
+
+
+# ----- Colocación en el backend perezoso (user-013) -----
+def test_colocacion_en_mundo_perezoso_disperso():
+    p = params(N=60, Pfree=0.005, Psoft=0.995, Nrobot=10, Nmonstruos=10, seed=1, backend="perezoso")
+    flujos = FlujosRNG.desde_semilla(p.seed)
+    cubo = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion()
+    colocar_agentes(cubo, p, indice, flujos.colocacion)
+    assert indice.n_robots() == 10 and indice.n_monstruos() == 10
+
+
+def test_colocacion_sin_libres_falla_enseguida():
+    p = params(N=2000, Pfree=0.0, Psoft=1.0, Nrobot=1, Nmonstruos=1, backend="perezoso")
+    cubo = construir_entorno(p)
+    with pytest.raises(ValueError, match="Pfree=0"):
+        colocar_agentes(cubo, p)
+    assert cubo.n_chunks() == 0
+
+
+def test_colocacion_con_pocas_libres_falla():
+    p = params(N=64, Pfree=0.0005, Psoft=0.9995, Nrobot=2000, Nmonstruos=0, backend="perezoso")
+    cubo = construir_entorno(p)
+    with pytest.raises(ValueError, match="suficientes"):
+        colocar_agentes(cubo, p)
+
+
+# ----- Motor de monstruos en lote (user-004) -----
+def _lote_referencia(cubo, p: ParamEntorno, semilla: int):
+    """Bucle monstruo por monstruo con el orden y los sorteos que usa mover_monstruos_lote."""
+    cubo = cubo.copy()
+    N = cubo.shape[0]
+    pos = np.argwhere(cubo == MONSTRUO)
+    gen = np.random.default_rng(semilla)
+    orden = gen.permutation(len(pos))
+    intenta = gen.random(len(pos)) < p.p_monstruo
+    eleccion = gen.random(len(pos))
+    for i in np.argsort(orden):
+        x, y, z = pos[i]
+        if not intenta[i]:
+            continue
+        candidatos = [(x + dx, y + dy, z + dz) for dx, dy, dz in _DESP_6
+                      if es_coord_valida(N, x + dx, y + dy, z + dz) and cubo[x + dx, y + dy, z + dz] not in (ZV, ROBOT)]
+        if candidatos:
+            nx, ny, nz = candidatos[int(eleccion[i] * len(candidatos))]
+            cubo[x, y, z] = ZL
+            cubo[nx, ny, nz] = MONSTRUO
+    return cubo
+
+
+@con_numpy
+@pytest.mark.parametrize("seed", range(40))
+def test_lote_igual_al_bucle_secuencial(seed):
+    p = params(N=5, Nrobot=3, Nmonstruos=40, seed=seed, K_monstruo=1, p_monstruo=0.7,
+                backend="array", motor_monstruos="lote")
+    flujos = FlujosRNG.desde_semilla(seed)
+    cubo = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion()
+    colocar_agentes(cubo, p, indice, flujos.colocacion)
+    esperado = _lote_referencia(cubo, p, random.Random(seed).getrandbits(64))
+    mover_monstruos_lote(cubo, p, 1, indice, rng=random.Random(seed))
+    assert np.array_equal(cubo, esperado)
+    assert indice == IndiceOcupacion.desde_cubo(cubo)
+
+
+@con_numpy
+def test_paralelo_mantiene_el_indice():
+    p = params(N=6, Nmonstruos=60, backend="array", motor_monstruos="paralelo")
+    flujos = FlujosRNG.desde_semilla(p.seed)
+    cubo = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion()
+    colocar_agentes(cubo, p, indice, flujos.colocacion)
+    for t in range(1, 20):
+        step_entorno(cubo, p, t, indice, flujos.dinamica)
+        assert indice == IndiceOcupacion.desde_cubo(cubo)
+
+
+# ----- Flujos aleatorios por corrida (user-009) -----
+def test_flujos_independientes_entre_semillas():
+    primeros = {}
+    for seed in range(20):
+        flujos = FlujosRNG.desde_semilla(seed)
+        for etapa in ("generacion", "colocacion", "dinamica"):
+            primeros[seed, etapa] = getattr(flujos, etapa).getrandbits(64)
+    assert len(set(primeros.values())) == len(primeros)
+    assert FlujosRNG.desde_semilla(7).dinamica.getrandbits(64) == primeros[7, "dinamica"]
+
+
+def test_corridas_en_hilos_igual_que_en_serie():
+    puntos = [params(seed=s, backend="lista", K_monstruo=1 + s % 2) for s in range(6)]
+    estado_global = random.getstate()
+    serie = [correr(p) for p in puntos]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        en_hilos = list(pool.map(correr, puntos))
+    assert en_hilos == serie
+    assert random.getstate() == estado_global
+
+
+# ----- Campo de proximidad de monstruos (user-012) -----
+def _cercana_referencia(monstruos: set, N: int, pos) -> int | None:
+    """Lo que promete direccion_cercana, contado a mano sobre el conjunto de monstruos."""
+    x, y, z = pos
+    vecinas = [(cara, (x + dx, y + dy, z + dz)) for cara, (dx, dy, dz) in enumerate(_DESP_6)
+               if es_coord_valida(N, x + dx, y + dy, z + dz)]
+    for cara, v in vecinas:
+        if v in monstruos:
+            return cara
+    mejor, cuenta_mejor = None, 0
+    for cara, (vx, vy, vz) in vecinas:
+        n = sum((vx + dx, vy + dy, vz + dz) in monstruos for dx, dy, dz in _DESP_6
+                if (vx + dx, vy + dy, vz + dz) != pos)
+        if n > cuenta_mejor:
+            mejor, cuenta_mejor = cara, n
+    return mejor
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_direccion_cercana_igual_a_contar_a_mano(seed):
+    N = 6
+    rng = random.Random(seed)
+    celdas = [(x, y, z) for x in range(N) for y in range(N) for z in range(N)]
+    monstruos = set(rng.sample(celdas, 12))
+    campo = CampoMonstruos(N, monstruos)
+    # altas y bajas sueltas: el campo incremental tiene que quedar igual al recalculado
+    for pos in rng.sample(sorted(monstruos), 4):
+        campo.marcar(pos, -1)
+        monstruos.discard(pos)
+    for pos in rng.sample(celdas, 4):
+        if pos not in monstruos:
+            campo.marcar(pos, 1)
+            monstruos.add(pos)
+    nuevo = CampoMonstruos(N, monstruos)
+    assert campo.cuenta == nuevo.cuenta and campo.hay == nuevo.hay
+    for pos in celdas:
+        assert campo.direccion_cercana(*pos) == _cercana_referencia(monstruos, N, pos), pos
+
+
+def test_direccion_cercana_ignora_el_monstruo_propio():
+    campo = CampoMonstruos(5, [(2, 2, 2)])
+    assert campo.direccion_cercana(2, 2, 2) is None
+    assert campo.direccion_cercana(2, 2, 4) == 5      # Z-: la vecina (2, 2, 3) toca al monstruo
@@ -0,0 +1,91 @@
+# =====================================================
+# test_exportador.py — Exportación continua de memorias (correr con pytest)
+# =====================================================
+import csv
+
+import pytest
+
+from agente import MemoriaRobot
+import exportador
+from exportador import abrir_memorias, fila_csv
+from simulacion import simular
+from apoyo_pruebas import con_numpy, params
+
+NOMBRES = [nombre for nombre, _ in MemoriaRobot.COLUMNAS]
+
+
+def _exportar(carpeta, exportar: str, **opciones):
+    """Corrida con exportación continua en `carpeta`; devuelve los robots vivos."""
+    p = params(Nrobot=8, Nmonstruos=30, K_monstruo=1, p_monstruo=0.8, seed=2, **opciones.pop("p", {}))
+    _, robots = simular(p, T_MAX=40, S_ESTASIS=10**6, verbose=False, exportar=exportar,
+                        carpeta_memorias=str(carpeta), volcar_cada=3, **opciones)
+    return robots
+
+
+def _filas_por_robot(columnas) -> dict:
+    filas = {}
+    for k, rid in enumerate(list(columnas["id"])):
+        filas.setdefault(int(rid), []).append(tuple(int(columnas[n][k]) for n in NOMBRES))
+    return filas
+
+
+def _filas_de(memoria: MemoriaRobot) -> list:
+    return [memoria.valores(i) for i in range(len(memoria))]
+
+
+# ----- Ida y vuelta (user-007) -----
+@pytest.mark.parametrize("opciones", [
+    {},
+    {"memoria_capacidad": 4},
+    pytest.param({"p": {"backend": "array"}, "motor_robots": "flota"}, marks=con_numpy),
+])
+def test_binario_ida_y_vuelta(tmp_path, opciones):
+    robots = _exportar(tmp_path, "binario", **opciones)
+    meta, columnas = abrir_memorias(str(tmp_path))
+    assert meta["n_filas"] == len(columnas["t"])
+    filas = _filas_por_robot(columnas)
+    vivos = [r["id"] for r in meta["robots"] if r["vivo"]]
+    assert len(vivos) == len(robots)
+    for rid, robot in zip(vivos, robots):
+        # la exportación tiene todas las filas; la memoria, solo las últimas `capacidad`
+        assert filas[rid][len(filas[rid]) - len(robot.memoria):] == _filas_de(robot.memoria)
+        assert meta["robots"][rid]["pos"] == [robot.x, robot.y, robot.z]
+    assert meta["perdidas"] == 0
+
+
+def test_abrir_memorias_sin_numpy_y_con_bytes_invertidos(tmp_path, monkeypatch):
+    _exportar(tmp_path / "ref", "binario")
+    _, ref = abrir_memorias(str(tmp_path / "ref"))
+    ref = {n: [int(v) for v in col] for n, col in ref.items()}
+    monkeypatch.setattr(exportador, "np", None)
+    _, sin_numpy = abrir_memorias(str(tmp_path / "ref"))
+    assert {n: list(col) for n, col in sin_numpy.items()} == ref
+    # como en una máquina big-endian: se escribe invirtiendo y se vuelve a invertir al leer
+    monkeypatch.setattr(exportador, "_SWAP", True)
+    _exportar(tmp_path / "swap", "binario")
+    _, invertidas = abrir_memorias(str(tmp_path / "swap"))
+    assert {n: list(col) for n, col in invertidas.items()} == ref
+
+
+def test_abrir_memorias_sin_filas(tmp_path):
+    e = exportador.ExportadorMemorias(str(tmp_path))
+    e.cerrar()
+    meta, columnas = abrir_memorias(str(tmp_path))
+    assert meta["n_filas"] == 0 and all(len(c) == 0 for c in columnas.values())
+
+
+def test_csv_continuo_igual_a_las_memorias(tmp_path):
+    robots = _exportar(tmp_path, "csv_continuo")
+    _exportar(tmp_path / "bin", "binario")
+    meta, columnas = abrir_memorias(str(tmp_path / "bin"))
+    with open(tmp_path / "memorias.csv", newline="", encoding="utf-8") as f:
+        lector = csv.reader(f)
+        assert next(lector) == ["robot"] + exportador.COLUMNAS_CSV
+        por_robot = {}
+        for fila in lector:
+            por_robot.setdefault(int(fila[0]), []).append(fila[1:])
+    vivos = [r["id"] for r in meta["robots"] if r["vivo"]]
+    for rid, robot in zip(vivos, robots):
+        esperadas = [[str(v) for v in fila_csv(row)] for row in robot.memoria]
+        assert por_robot[rid][len(por_robot[rid]) - len(esperadas):] == esperadas
+    assert sum(map(len, por_robot.values())) == meta["n_filas"]
@@ -0,0 +1,61 @@
+# =====================================================
+# test_instrumentacion.py — Tiempos por fase y conteo de reglas (correr con pytest)
+# =====================================================
+import io
+import json
+import time
+
+import pytest
+
+from instrumentacion import FASES, MetricasSimulacion, REGLAS_CORTAS
+import repeticion
+from simulacion import iterar
+from apoyo_pruebas import con_numpy, params, correr
+
+
+# ----- Fases y reglas (user-017) -----
+@pytest.mark.parametrize("opciones", [
+    {},
+    pytest.param({"p": {"backend": "array"}, "motor_robots": "flota"}, marks=con_numpy),
+])
+def test_metricas_no_cambian_la_corrida_y_cuadran(opciones):
+    p = params(Nrobot=5, Nmonstruos=15, **opciones.pop("p", {}))
+    med = MetricasSimulacion()
+    sin = correr(p, T_MAX=30, **opciones)
+    con = correr(p, T_MAX=30, metricas=med, **opciones)
+    assert con == sin
+    res = con[2]
+    assert med.ticks == res.ticks == len(med.serie("t"))
+    assert all(len(med.serie(f)) == med.ticks for f in FASES)
+    assert med.total() == pytest.approx(sum(sum(med.serie(f)) for f in FASES))
+    # una regla por robot vivo al empezar cada tick
+    assert sum(med.reglas) == sum(sum(med.serie(r)) for r in REGLAS_CORTAS) >= res.ticks
+    assert med.movimientos == sum(med.serie("movimientos"))
+
+
+def test_repeticion_y_deltas_tienen_su_fase(tmp_path, monkeypatch):
+    espera = 0.004
+    original = repeticion.GrabadorRepeticion.tick
+
+    def lento(self, *args):
+        time.sleep(espera)
+        return original(self, *args)
+
+    monkeypatch.setattr(repeticion.GrabadorRepeticion, "tick", lento)
+    med = MetricasSimulacion()
+    corrida = iterar(params(), T_MAX=20, S_ESTASIS=10**6, verbose=False, exportar=None,
+                     metricas=med, repeticion=str(tmp_path / "r.rep"))
+    deltas = list(corrida)
+    ticks = len(deltas)
+    assert med.acumulado["deltas"] >= ticks * espera
+    for fase in ("volcado", "paradas", "estasis"):
+        assert med.acumulado[fase] < ticks * espera / 2, fase
+
+
+def test_volcado_periodico_en_json():
+    salida = io.StringIO()
+    med = MetricasSimulacion(por_tick=False, volcar_cada=5, destino=salida)
+    correr(params(), T_MAX=12, metricas=med)
+    lineas = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert [linea["t"] for linea in lineas] == [5, 10]
+    assert set(lineas[-1]["fases"]) == set(FASES) and med.serie("t") == []
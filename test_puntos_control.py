@@ -0,0 +1,43 @@
+# =====================================================
+# test_puntos_control.py — Reanudación desde puntos de control (correr con pytest)
+# =====================================================
+import shutil
+
+import pytest
+
+from puntos_control import puntos_disponibles
+import puntos_control
+from simulacion import reanudar
+from apoyo_pruebas import con_numpy, params, estado, correr
+
+
+# ----- Puntos de control (user-015) -----
+@pytest.mark.parametrize("backend, opciones", [
+    ("lista", {}),
+    ("perezoso", {}),
+    pytest.param("array", {"motor_robots": "flota"}, marks=con_numpy),
+    pytest.param("array", {"exportar": "binario", "volcar_cada": 8}, marks=con_numpy),
+])
+def test_reanudar_igual_que_sin_detenerse(tmp_path, monkeypatch, backend, opciones):
+    monkeypatch.chdir(tmp_path)
+    # N=20 ocupa dos bloques de grilla; el perezoso, 8 chunks
+    p = params(N=20 if backend != "perezoso" else 32, Nrobot=15, Nmonstruos=120, backend=backend)
+    ref = correr(p, **opciones)
+    assert correr(p, punto_control="pc.bin", punto_control_cada=11, **opciones) == ref
+    ticks = puntos_disponibles("pc.bin")
+    for t in (ticks[0], ticks[len(ticks) // 2], ticks[-1]):
+        shutil.copy("pc.bin", "r.bin")
+        cubo, robots, res = reanudar("r.bin", t, punto_control="r.bin", con_resultado=True)
+        assert (estado(cubo, robots), [list(r.memoria) for r in robots], res) == ref
+    # el archivo seguido desde la reanudación también se puede reanudar
+    cubo, robots, res = reanudar("r.bin", puntos_disponibles("r.bin")[-2], punto_control=None,
+                                 con_resultado=True)
+    assert (estado(cubo, robots), [list(r.memoria) for r in robots], res) == ref
+
+
+def test_error_de_escritura_del_punto_de_control(tmp_path, monkeypatch):
+    def falla(self, registro):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(puntos_control.EscritorPuntosControl, "_escribir", falla)
+    with pytest.raises(OSError):
+        correr(params(), punto_control=str(tmp_path / "pc.bin"), punto_control_cada=10)
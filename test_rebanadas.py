@@ -0,0 +1,72 @@
+# =====================================================
+# test_rebanadas.py — Mundo repartido en rebanadas (correr con pytest)
+# =====================================================
+import pytest
+
+from entorno import FlujosRNG, IndiceOcupacion, construir_entorno, colocar_agentes, np
+from apoyo_pruebas import con_numpy, params
+
+
+# ----- Rebanadas (user-021) -----
+@con_numpy
+@pytest.mark.parametrize("seed", range(3))
+def test_rebanadas_no_dependen_de_la_particion(seed):
+    from rebanadas import simular_rebanadas
+
+    def firma(salida):
+        cubo, robots, res = salida
+        return cubo.tobytes(), [(r.x, r.y, r.z, r.ori, r.lado_idx) for r in robots], res
+
+    p = params(N=12, Nrobot=30, Nmonstruos=60, Pfree=0.9, Psoft=0.1, seed=seed,
+                K_monstruo=1 + seed % 2, p_monstruo=0.5)
+    ref = firma(simular_rebanadas(p, 1, T_MAX=60, procesos=False))
+    for w in (2, 3, 5):
+        assert firma(simular_rebanadas(p, w, T_MAX=60, procesos=False)) == ref
+    if seed == 0:
+        assert firma(simular_rebanadas(p, 2, T_MAX=60, procesos=True)) == ref
+
+
+@con_numpy
+@pytest.mark.parametrize("seed", range(10))
+def test_fase_de_robots_de_rebanadas_igual_a_la_flota(seed):
+    from flota import RobotFleet
+    from rebanadas import Rebanada, limites
+
+    N = 10
+    p = params(N=N, Nrobot=120, Nmonstruos=60, Pfree=0.85, Psoft=0.15, seed=seed, backend="array")
+    flujos = FlujosRNG.desde_semilla(seed)
+    cubo = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion()
+    colocar_agentes(cubo, p, indice, flujos.colocacion)
+    pos = np.array(sorted(indice.robots)).reshape(-1, 3)
+    mp = np.array(sorted(indice.monstruos)).reshape(-1, 3)
+    monstruos = (mp[:, 0] * N + mp[:, 1]) * N + mp[:, 2]
+    ori = np.random.default_rng(seed).integers(0, 6, len(pos)).astype(np.int8)
+    for w in (2, 3, 5):
+        cubo_flota, cubo_reb = cubo.copy(), cubo.copy()
+        flota = RobotFleet(pos.tolist(), registrar=False)
+        flota.ori[:] = ori
+        rebanadas = []
+        for x0, x1 in limites(N, w):
+            s = (pos[:, 0] >= x0) & (pos[:, 0] < x1)
+            n = int(s.sum())
+            robots = {"id": np.flatnonzero(s).astype(np.int64), "x": pos[s, 0].astype(np.int64),
+                      "y": pos[s, 1].astype(np.int64), "z": pos[s, 2].astype(np.int64),
+                      "ori": ori[s].copy(), "lado": np.zeros(n, np.int8), "kills": np.zeros(n, np.int64)}
+            mx = monstruos // (N * N)
+            rebanadas.append(Rebanada(cubo_reb, x0, x1, robots, monstruos[(mx >= x0) & (mx < x1)], p, 1))
+        for t in range(1, 15):
+            flota.tick(cubo_flota, t)
+            reclamos = [rb.decidir_robots() for rb in rebanadas]
+            recibidos = [[] for _ in rebanadas]
+            for k in range(len(rebanadas)):
+                if k > 0:
+                    recibidos[k - 1].append(reclamos[k][-1])
+                if k < len(rebanadas) - 1:
+                    recibidos[k + 1].append(reclamos[k][1])
+            for rb, r in zip(rebanadas, recibidos):
+                rb.resolver_robots(r)
+        orden = np.argsort(np.concatenate([rb.r["id"] for rb in rebanadas]))
+        assert np.array_equal(cubo_flota, cubo_reb)
+        assert np.array_equal(np.concatenate([rb.r["x"] for rb in rebanadas])[orden], flota.x)
+        assert np.array_equal(np.concatenate([rb.r["ori"] for rb in rebanadas])[orden], flota.ori)
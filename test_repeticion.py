@@ -0,0 +1,60 @@
+# =====================================================
+# test_repeticion.py — Registro de repetición y lector con salto (correr con pytest)
+# =====================================================
+import pytest
+
+from simulacion import simular
+from apoyo_pruebas import con_numpy, params, estado
+
+
+# ----- Repetición (user-022) -----
+@pytest.mark.parametrize("backend, motor_robots, motor_monstruos", [
+    ("lista", "secuencial", "secuencial"),
+    pytest.param("array", "secuencial", "lote", marks=con_numpy),
+    pytest.param("array", "flota", "paralelo", marks=con_numpy),
+])
+def test_repeticion_igual_a_resimular(tmp_path, backend, motor_robots, motor_monstruos):
+    from repeticion import LectorRepeticion
+
+    p = params(Nrobot=12, Nmonstruos=25, seed=3, backend=backend, motor_monstruos=motor_monstruos)
+    kw = dict(verbose=False, exportar=None, S_ESTASIS=10**6, motor_robots=motor_robots)
+    ruta = tmp_path / "corrida.rep"
+    simular(p, T_MAX=60, repeticion=str(ruta), repeticion_clave_cada=7, **kw)
+    with LectorRepeticion(str(ruta)) as lector:
+        for t in (1, 6, 7, 8, 30, lector.t_final):
+            f = lector.fotograma(t)
+            assert estado(f.cubo, f.robots.values(), False) == estado(*simular(p, T_MAX=t, **kw), False)
+        seguidos = list(lector.recorrer())
+        assert [f.t for f in seguidos] == list(range(lector.t_inicial, lector.t_final + 1))
+
+    # un archivo truncado (sin índice) se lee hasta el último registro completo
+    datos = ruta.read_bytes()
+    truncado = tmp_path / "truncado.rep"
+    truncado.write_bytes(datos[:len(datos) // 2])
+    with LectorRepeticion(str(truncado)) as lector:
+        assert lector.t_final < 60
+        f = lector.fotograma(lector.t_final)
+        assert estado(f.cubo, f.robots.values(), False) == estado(*simular(p, T_MAX=lector.t_final, **kw), False)
+
+
+@pytest.mark.parametrize("corte", [0, 3, 12, 40])
+def test_lector_cierra_el_archivo_si_falla(tmp_path, monkeypatch, corte):
+    import builtins
+    from repeticion import LectorRepeticion
+
+    ruta = tmp_path / "corrida.rep"
+    simular(params(), T_MAX=10, verbose=False, exportar=None, repeticion=str(ruta))
+    roto = tmp_path / "roto.rep"
+    roto.write_bytes(ruta.read_bytes()[:corte] if corte else b"no es una repeticion")
+    abiertos = []
+    abrir = builtins.open
+
+    def espiar(*args, **kw):
+        f = abrir(*args, **kw)
+        abiertos.append(f)
+        return f
+
+    monkeypatch.setattr(builtins, "open", espiar)
+    with pytest.raises(ValueError):
+        LectorRepeticion(str(roto))
+    assert abiertos and all(f.closed for f in abiertos)
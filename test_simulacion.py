@@ -0,0 +1,109 @@
+# =====================================================
+# test_simulacion.py — Orquestación de la simulación (correr con pytest)
+# =====================================================
+import pytest
+
+from agente import Robot
+from entorno import (
+    FlujosRNG, IndiceOcupacion, ComponentesLibres, construir_entorno, colocar_agentes, step_entorno,
+)
+from simulacion import DetectorEstasis, iterar
+from apoyo_pruebas import params, correr
+
+
+# ----- Estasis y ciclos (user-003) -----
+def _primer_aviso(detector: DetectorEstasis, huellas) -> int | None:
+    """Número de tick (desde 1) en que el detector declara estasis, o None."""
+    detector.iniciar(huellas[0])
+    for t, h in enumerate(huellas[1:], 1):
+        if detector.registrar(h):
+            return t
+    return None
+
+
+def test_estasis_con_p_ciclo_1_es_el_criterio_original():
+    huellas = [1, 2, 3, 3, 3, 3, 3, 3]
+    d = DetectorEstasis(S_ESTASIS=4)
+    assert _primer_aviso(d, huellas) == 6 and d.periodo == 1
+    assert _primer_aviso(DetectorEstasis(4), [1, 2, 1, 2, 1, 2, 1, 2, 1, 2]) is None
+
+
+@pytest.mark.parametrize("periodo", [2, 3])
+def test_ciclo_detectado_con_su_periodo(periodo):
+    huellas = [100] + [k % periodo for k in range(20)]
+    d = DetectorEstasis(S_ESTASIS=5, P_CICLO=3)
+    # la coincidencia con `periodo` ticks atrás empieza en el tick periodo + 1
+    assert _primer_aviso(d, huellas) == periodo + 5 and d.periodo == periodo
+    assert _primer_aviso(DetectorEstasis(5, periodo - 1), huellas) is None
+
+
+def test_estado_del_detector_se_restaura():
+    d = DetectorEstasis(S_ESTASIS=6, P_CICLO=2)
+    d.iniciar(9)
+    for h in (1, 2, 1, 2):
+        d.registrar(h)
+    copia = DetectorEstasis(6, 2)
+    copia.restaurar(d.estado())
+    for h in (1, 2, 1, 2):
+        assert d.registrar(h) == copia.registrar(h)
+    assert d.periodo == copia.periodo == 2
+
+
+def test_p_ciclo_1_no_cambia_la_corrida():
+    p = params(N=6, Nrobot=3, Nmonstruos=2, K_monstruo=0)
+    assert correr(p, S_ESTASIS=15, P_CICLO=1) == correr(p, S_ESTASIS=15)
+
+
+# ----- Encuentros inalcanzables (user-019) -----
+@pytest.mark.parametrize("seed", range(4))
+def test_componentes_incrementales_igual_a_recontar(seed):
+    p = params(N=7, Pfree=0.55, Psoft=0.45, Nrobot=6, Nmonstruos=10, seed=seed, K_monstruo=1)
+    flujos = FlujosRNG.desde_semilla(seed)
+    cubo = construir_entorno(p, flujos.generacion)
+    indice = IndiceOcupacion()
+    colocar_agentes(cubo, p, indice, flujos.colocacion)
+    indice.usar_componentes(ComponentesLibres(cubo))
+    robots = [Robot(*pos) for pos in sorted(indice.robots)]
+    for t in range(1, 40):
+        step_entorno(cubo, p, t, indice, flujos.dinamica)
+        robots = [r for r in robots if r.tick(cubo, t, indice)]
+        comp = indice.componentes
+        r = [0] * comp.n
+        m = [0] * comp.n
+        for pos in indice.robots:
+            r[comp.componente(pos)] += 1
+        for pos in indice.monstruos:
+            m[comp.componente(pos)] += 1
+        assert (comp.robots, comp.monstruos) == (r, m)
+        assert comp.activas == sum(1 for a, b in zip(r, m) if a and b)
+        # las etiquetas no se rehacen: solo pueden sobrestimar los encuentros posibles
+        fresco = ComponentesLibres(cubo)
+        IndiceOcupacion(set(indice.robots), set(indice.monstruos)).usar_componentes(fresco)
+        assert fresco.activas <= comp.activas
+
+
+def test_inalcanzable_no_pierde_kills():
+    paradas = 0
+    for seed in range(12):
+        pf = 0.3 + 0.05 * (seed % 3)
+        p = params(N=8, Pfree=pf, Psoft=1 - pf, Nrobot=3, Nmonstruos=6, seed=seed, K_monstruo=1)
+        _, _, corta = correr(p, T_MAX=300, detectar_inalcanzable=True)
+        _, _, larga = correr(p, T_MAX=300)
+        if corta.motivo_parada == "inalcanzable":
+            paradas += 1
+            assert corta.ticks <= larga.ticks and corta.kills == larga.kills
+        else:
+            assert corta == larga
+    assert paradas > 0
+
+
+# ----- Cancelación (user-018) -----
+def test_cancelar_entrega_el_motivo():
+    corrida = iterar(params(), verbose=False, exportar=None, T_MAX=100, S_ESTASIS=10**6)
+    deltas = []
+    for delta in corrida:
+        deltas.append(delta)
+        if delta.t == 5:
+            corrida.cancelar()
+    assert deltas[-1].motivo == "cancelada" and deltas[-1].t == 5
+    assert corrida.resultado[2].motivo_parada == "cancelada"